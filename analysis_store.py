@@ -0,0 +1,81 @@
+# analysis_store.py - 모든 세션이 공유하는 채용 공고 분석 결과 저장소
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# 줄 앞의 글머리 기호, 번호 없는 목록 표시, 마크다운 제목 표시
+LINE_MARKER = re.compile(r"^(?:[-*+•·▪▫■□◆◇○●※>#]+\s*)+")
+# 마크다운 강조/코드 표시
+INLINE_MARKUP = re.compile(r"[*_`]+")
+# 폭이 없는 문자 (복사/붙여넣기 과정에서 섞여 들어오는 경우가 많음)
+ZERO_WIDTH = re.compile("[\u200b-\u200d\u2060\ufeff]")
+
+
+def normalize_posting(text):
+    """공백, 글머리 기호, 마크다운 강조 등 사소한 서식 차이를 없앤 채용 공고 텍스트 반환"""
+    text = ZERO_WIDTH.sub("", unicodedata.normalize("NFKC", text or ""))
+    lines = []
+    for line in text.splitlines():
+        line = INLINE_MARKUP.sub("", LINE_MARKER.sub("", line.strip()))
+        line = " ".join(line.split()).lower()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def posting_key(job_content, model):
+    """정규화한 채용 공고 내용과 모델로부터 공유 저장소 키(SHA-256) 생성"""
+    payload = model + "\x00" + normalize_posting(job_content)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SharedAnalysisStore:
+    """프로세스 전체가 공유하는 분석 결과 저장소
+
+    메모리에는 최근 사용한 max_entries개만 두고(LRU), backend(get/set을 지원하는 객체,
+    예: ResponseCache)를 지정하면 디스크에도 저장하여 서버 재시작 후에도 재사용합니다.
+    """
+
+    def __init__(self, max_entries=500, backend=None):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, job_content, model):
+        """저장된 분석 결과 반환 (없으면 None)"""
+        key = posting_key(job_content, model)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        analysis = self.backend.get(key) if self.backend else None
+        with self._lock:
+            if analysis is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, analysis)
+        return analysis
+
+    def set(self, job_content, model, analysis):
+        key = posting_key(job_content, model)
+        with self._lock:
+            self._remember(key, analysis)
+        if self.backend:
+            self.backend.set(key, analysis, model=model)
+
+    def _remember(self, key, analysis):
+        self._entries[key] = analysis
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
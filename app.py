@@ -1,9 +1,27 @@
 # app.py - requests를 사용하는 이력서 맞춤화 Streamlit 앱
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import hashlib
+import io
 import json
+import math
 import os
-import requests
+import re
+import threading
 import time
+import uuid
+import zipfile
+
+from bulk_import import ON_DUPLICATE, DuplicateIndexCache, import_documents
+from data_store import DataStore
+from job_queue import CANCELLED, DONE, JobQueue
+from match_scoring import score_matrix
+from parallel import run_parallel
+from prompt_assembly import DEFAULT_RESUME_TOKEN_BUDGET, assemble_resume_context
+from rate_limiter import BACKGROUND
+from resume_parser import DEFAULT_MIN_CONFIDENCE
+from job_analysis import format_analysis, skill_index
+from tailor_core import RECONSTRUCTION_FIELDS, SECTION_UPDATE_FIELDS, TailorCore, build_job_context
 
 # 페이지 설정
 st.set_page_config(
@@ -59,14 +77,6 @@ st.markdown("""
 st.markdown("<h1 class='main-header'>이력서 자동 맞춤화 시스템</h1>", unsafe_allow_html=True)
 
 # 초기 상태 설정
-if 'resume_versions' not in st.session_state:
-    st.session_state.resume_versions = {}
-if 'job_postings' not in st.session_state:
-    st.session_state.job_postings = {}
-if 'job_analyses' not in st.session_state:
-    st.session_state.job_analyses = {}
-if 'customization_settings' not in st.session_state:
-    st.session_state.customization_settings = {}
 if 'api_key' not in st.session_state:
     st.session_state.api_key = ""
 if 'selected_model' not in st.session_state:
@@ -75,76 +85,426 @@ if 'resume_sections' not in st.session_state:
     st.session_state.resume_sections = None
 if 'tailored_result' not in st.session_state:
     st.session_state.tailored_result = None
+# 맞춤화 결과를 만든 채용 공고 ID (섹션 수정과 재구성에 같은 공고의 접두부를 씀)
+if 'tailored_job_id' not in st.session_state:
+    st.session_state.tailored_job_id = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'tailor_job' not in st.session_state:
+    st.session_state.tailor_job = None
+if 'reconstruct_job' not in st.session_state:
+    st.session_state.reconstruct_job = None
+if 'use_response_cache' not in st.session_state:
+    st.session_state.use_response_cache = True
+if 'stream_output' not in st.session_state:
+    st.session_state.stream_output = True
+if 'last_usage' not in st.session_state:
+    st.session_state.last_usage = None
+if 'resume_token_budget' not in st.session_state:
+    st.session_state.resume_token_budget = DEFAULT_RESUME_TOKEN_BUDGET
+if 'tailor_by_section' not in st.session_state:
+    st.session_state.tailor_by_section = False
+
+# 공유 맞춤화 파이프라인 (API 클라이언트, 요청 제한기, 응답 캐시, 공유 분석 결과, 호출 통계를 재실행과 세션 사이에서 공유)
+@st.cache_resource(show_spinner=False)
+def get_core():
+    return TailorCore.from_env()
+
+# 백그라운드 생성 작업 큐 (스크립트가 다시 실행되어도 작업이 계속 진행됨)
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    return JobQueue(max_workers=int(os.environ.get("GENERATION_WORKERS", 4)))
+
+# 저장한 채용 공고를 미리 분석하는 작업 큐 (요청 제한기에서는 사용자가 기다리는 요청에 양보)
+@st.cache_resource(show_spinner=False)
+def get_prefetch_queue():
+    return JobQueue(max_workers=int(os.environ.get("PREFETCH_WORKERS", 2)), keep_seconds=600)
+
+# 공유 데이터 저장소 (이력서, 채용 공고, 분석 결과, 설정, 맞춤화 결과)
+@st.cache_resource(show_spinner=False)
+def get_data_store():
+    data_dir = os.environ.get(
+        "RESUME_TAILOR_DATA_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    )
+    return DataStore(os.path.join(data_dir, "resume_tailor.sqlite3"))
+
+# 채용 공고 중복 검사 색인 (작업 공간별로 한 번 만들고 공고를 하나씩 저장할 때마다 이어서 씀)
+@st.cache_resource(show_spinner=False)
+def get_duplicate_indexes():
+    return DuplicateIndexCache()
+
+# 작업 공간
+# 기본값은 세션마다 새로 만든 개인 작업 공간이며, ID는 추측할 수 없고 주소의 ?workspace=로만 다시 열 수 있습니다.
+# 다른 사용자와 데이터를 함께 쓰려면 RESUME_TAILOR_SHARED_WORKSPACES(쉼표로 구분한 이름)에 공유 작업 공간을 명시해야 하고,
+# RESUME_TAILOR_WORKSPACE를 지정하면 모든 세션이 그 작업 공간 하나를 사용합니다 (혼자 쓰는 설치용).
+PRIVATE_WORKSPACE = re.compile(r"^private-[0-9a-f]{32}$")
+PRIVATE_WORKSPACE_LABEL = "개인 작업 공간"
+FIXED_WORKSPACE = os.environ.get("RESUME_TAILOR_WORKSPACE", "").strip()
+SHARED_WORKSPACES = [
+    name.strip() for name in os.environ.get("RESUME_TAILOR_SHARED_WORKSPACES", "").split(",")
+    if name.strip() and name.strip() != PRIVATE_WORKSPACE_LABEL and not PRIVATE_WORKSPACE.match(name.strip())
+]
+
+if 'private_workspace' not in st.session_state:
+    requested = st.query_params.get("workspace", "")
+    st.session_state.private_workspace = requested if PRIVATE_WORKSPACE.match(requested) else f"private-{uuid.uuid4().hex}"
+    if requested in SHARED_WORKSPACES:
+        st.session_state.workspace_choice = requested
+if FIXED_WORKSPACE:
+    st.session_state.workspace = FIXED_WORKSPACE
+elif st.session_state.get("workspace_choice") in SHARED_WORKSPACES:
+    st.session_state.workspace = st.session_state.workspace_choice
+else:
+    st.session_state.workspace = st.session_state.private_workspace
+workspace = st.session_state.workspace
+if not FIXED_WORKSPACE and st.query_params.get("workspace") != workspace:
+    # 새로 고침이나 북마크로 같은 작업 공간을 다시 열 수 있도록 주소에 기록
+    st.query_params["workspace"] = workspace
+
+# 현재 작업 공간의 테이블을 세션 상태에 연결 (값은 필요할 때만 저장소에서 읽음)
+st.session_state.resume_versions = get_data_store().table("resumes", workspace)
+st.session_state.job_postings = get_data_store().table("job_postings", workspace)
+st.session_state.job_analyses = get_data_store().table("job_analyses", workspace)
+st.session_state.customization_settings = get_data_store().table("customization_settings", workspace)
+st.session_state.batch_results = get_data_store().table("tailored_outputs", workspace)
+
+# 작업 스레드 초기화 함수 생성
+def script_context_initializer():
+    """작업 스레드에 현재 스크립트 실행 컨텍스트를 연결하는 초기화 함수 반환
+
+    st.cache_resource로 만든 공유 자원을 작업 스레드에서도 경고 없이 가져오기 위해 사용합니다.
+    """
+    ctx = get_script_run_ctx()
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
 
 #Anthropic API 호출 함수
-def call_anthropic_api(prompt, model="claude-3-haiku-20240307", max_tokens=4000, temperature=0.3, system=""):
-    api_key = st.session_state.api_key
+def call_anthropic_api(prompt, model="claude-3-haiku-20240307", max_tokens=4000, temperature=0.3, system="",
+                       timeout=None, deadline=None, use_cache=None, force_refresh=False, on_delta=None, api_key=None,
+                       cached_prefix="", caller=""):
+    """API 호출 (동일한 요청은 응답 캐시에서 반환, 자세한 동작은 TailorCore.call 참고)
+
+    temperature 0.0 호출은 항상 캐시하고, 그 외 호출은 use_cache(기본값: 사이드바 설정)에 따릅니다.
+    최종 결과 텍스트를 반환하며, 토큰 사용량은 st.session_state.last_usage에 저장됩니다.
+    api_key를 직접 지정하면 세션 상태에 접근하지 않으므로 작업 스레드에서도 호출할 수 있습니다.
+    """
+    return with_session_defaults(
+        lambda api_key, use_cache: get_core().call(
+            prompt, model, api_key, max_tokens=max_tokens, temperature=temperature, system=system,
+            timeout=timeout, deadline=deadline, use_cache=use_cache, force_refresh=force_refresh,
+            on_delta=on_delta, cached_prefix=cached_prefix, caller=caller, owner=current_owner()
+        ),
+        api_key, use_cache
+    )
+
+# 요청 제한기 대기열의 소유자 (작업 스레드도 세션 컨텍스트를 가짐)
+def current_owner():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+# 세션 기본값 적용 후 파이프라인 호출
+def with_session_defaults(fn, api_key, use_cache):
+    """api_key가 없으면 세션 상태의 API 키와 캐시 설정으로 fn(api_key, use_cache)를 호출하고
+    토큰 사용량을 st.session_state.last_usage에 저장 (api_key를 지정하면 세션 상태에 접근하지 않음)"""
+    in_session = api_key is None
+    if in_session:
+        api_key = st.session_state.api_key
+    if use_cache is None:
+        use_cache = st.session_state.use_response_cache if in_session else True
+    result = fn(api_key, use_cache)
+    if in_session and get_core().last_usage() is not None:
+        st.session_state.last_usage = get_core().last_usage()
+    return result
+
+# 파이프라인 단계 표시 이름
+STAGE_LABELS = {
+    "analysis": "공고 분석",
+    "tailoring": "맞춤화",
+    "section_tailoring": "섹션별 맞춤화",
+    "consistency": "일관성 검토",
+    "split": "섹션 분리",
+    "section_update": "섹션 수정",
+    "reconstruction": "재구성"
+}
+
+# 로컬 적합도 점수 (입력이 같으면 다시 계산하지 않음)
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_score_matrix(resume_texts, postings):
+    return score_matrix(resume_texts, postings)
+
+# 프롬프트용 이력서 내용 정리 (미리보기용, 입력이 같으면 다시 계산하지 않음)
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_resume_context(resume_versions, job_content, analysis, token_budget):
+    return assemble_resume_context(resume_versions, job_content, analysis, token_budget)
+
+# 적합도 점수 표 행 생성
+def score_row(label, score):
+    def percent(value):
+        return f"{value * 100:.0f}%" if value is not None else "-"
+    return {
+        "이력서": label,
+        "적합도": score["score"],
+        "키워드 포함률": percent(score["keyword_coverage"]),
+        "요구사항 충족률": percent(score["requirement_coverage"]),
+        "유사도": percent(score["similarity"]),
+        "누락 키워드": ", ".join(score["missing_keywords"])
+    }
+
+# 결과 영역 HTML
+def result_area_html(text):
+    return "<div class='result-area'>" + text.replace('\n', '<br>') + "</div>"
+
+# 저장된 결과 영역 HTML (완성된 결과는 재실행마다 다시 변환하지 않음)
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_result_area_html(text):
+    return result_area_html(text)
+
+# 채용 공고 제목 → ID (공고가 바뀔 때만 저장소에서 다시 읽음)
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_job_options(workspace, revision):
+    titles = get_data_store().table("job_postings", workspace).column('title')
+    return {title: job_id for job_id, title in titles.items()}
+
+# 작업 공간의 모든 이력서와 채용 공고 하나의 적합도 점수 (이력서, 공고, 분석 결과가 바뀔 때만 다시 계산)
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_resume_scores(workspace, revisions, job_id):
+    store = get_data_store()
+    posting = {
+        job_id: {
+            "content": store.table("job_postings", workspace)[job_id]['content'],
+            "analysis": store.table("job_analyses", workspace).get(job_id)
+        }
+    }
+    return score_matrix(dict(store.table("resumes", workspace).items()), posting)
+
+# 기술/키워드 → 공고 ID 집합 (분석 결과가 바뀔 때만 다시 만듦, 여러 공고에 나온 기술부터)
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_skill_index(workspace, revision):
+    index = skill_index(dict(get_data_store().table("job_analyses", workspace).items()))
+    entries = sorted(index.values(), key=lambda entry: (-len(entry[1]), entry[0].lower()))
+    return {skill: job_ids for skill, job_ids in entries}
+
+# 일괄 맞춤화 결과 압축 파일 (결과가 바뀔 때만 다시 생성)
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_batch_zip(workspace, revision):
+    return build_batch_zip(get_data_store().table("tailored_outputs", workspace))
+
+# 목록 한 페이지에 표시할 항목 수
+LIST_PAGE_SIZE = 20
+
+# 목록 검색과 페이지 선택
+def paged_items(labels, key):
+    """{키: 표시 이름}에서 검색어에 맞는 항목 중 현재 페이지의 (키, 표시 이름) 목록을 반환"""
+    query = st.text_input("검색", key=f"{key}_query", placeholder="이름으로 검색", label_visibility="collapsed")
+    items = [(item_key, label) for item_key, label in labels.items() if query.strip().lower() in label.lower()]
+    pages = max(1, math.ceil(len(items) / LIST_PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"페이지 (전체 {pages}쪽)", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (page - 1) * LIST_PAGE_SIZE
+    st.caption(f"{len(items)}개 중 {min(len(items), start + 1)}-{min(len(items), start + LIST_PAGE_SIZE)}번째")
+    return items[start:start + LIST_PAGE_SIZE]
+
+# 파일에서 여러 문서 가져오기 (폴더/JSONL/CSV 형식, 같거나 유사한 문서는 합치거나 표시)
+def bulk_import_form(kind, noun):
+    uploaded_files = st.file_uploader(
+        f"{noun} 파일 (.jsonl, .csv, .txt, .md)", type=["jsonl", "csv", "txt", "md"],
+        accept_multiple_files=True, key=f"bulk_import_{kind}",
+        help="JSONL/CSV는 한 줄(행)이 문서 하나이며 title(또는 name)과 content 필드를 읽습니다. 텍스트 파일은 파일 하나가 문서 하나입니다."
+    )
+    duplicate_labels = {
+        "merge": f"유사한 {noun}는 기존 {noun}로 합치기 (저장하지 않음)",
+        "flag": f"유사한 {noun}도 저장하고 목록에 표시 (기존 분석 결과 재사용)"
+    }
+    on_duplicate = st.radio(
+        "중복 처리", options=list(ON_DUPLICATE), format_func=duplicate_labels.get, key=f"bulk_duplicate_{kind}"
+    )
+    if st.button(f"{noun} 가져오기", use_container_width=True, disabled=not uploaded_files, key=f"bulk_button_{kind}"):
+        progress = st.empty()
+        try:
+            report = import_documents(
+                get_data_store(), workspace, kind, uploaded_files, on_duplicate=on_duplicate,
+                on_progress=lambda read: progress.caption(f"{read}개 읽는 중...")
+            )
+        except Exception as e:
+            st.error(f"가져오기 중 오류가 발생했습니다: {str(e)}")
+            return
+        progress.empty()
+        st.success(
+            f"{report['read']}개 중 {report['added']}개 추가, {report['updated']}개 갱신, "
+            f"{len(report['merged'])}개 중복으로 합침, {len(report['flagged'])}개 유사 문서로 표시"
+        )
+        if report['merged'] or report['flagged']:
+            st.dataframe(
+                [
+                    {"위치": source, "제목": title, "기존 문서": existing, "처리": action, "차이(비트)": distance}
+                    for action, entries in (("합침", report['merged']), ("표시", report['flagged']))
+                    for source, title, existing, distance in entries
+                ],
+                use_container_width=True, hide_index=True
+            )
+        for source, error in report['errors'][:20]:
+            st.error(f"{source}: {error}")
+
+# 저장된 이력서 목록 (목록 조작은 이 부분만 다시 실행되고, 내용은 '내용 보기'를 켰을 때만 읽음)
+@st.experimental_fragment
+def resume_list():
+    names = list(st.session_state.resume_versions)
+    for version, _ in paged_items({name: name for name in names}, "resume_list"):
+        with st.expander(f"📄 {version}"):
+            if st.toggle("내용 보기", key=f"show_resume_{version}"):
+                st.text_area("내용", value=st.session_state.resume_versions.get(version, ""), height=200,
+                             key=f"resume_{version}", disabled=True)
+            if st.button("삭제", key=f"delete_{version}"):
+                del st.session_state.resume_versions[version]
+                st.success(f"'{version}' 이력서가 삭제되었습니다.")
+                st.experimental_rerun()
+
+# 저장된 채용 공고 목록 (목록 조작은 이 부분만 다시 실행되고, 내용은 '내용 보기'를 켰을 때만 읽음)
+@st.experimental_fragment
+def job_posting_list():
+    titles = st.session_state.job_postings.column('title')
+    skills = cached_skill_index(workspace, st.session_state.job_analyses.revision)
+    if skills:
+        selected_skills = st.multiselect(
+            "기술로 필터", options=list(skills), key="job_skill_filter",
+            help="분석된 공고의 필수/우대 기술과 주요 키워드로 공고를 거릅니다. 여러 개를 고르면 모두 포함한 공고만 표시합니다."
+        )
+        for skill in selected_skills:
+            titles = {job_id: title for job_id, title in titles.items() if job_id in skills[skill]}
+    for job_id, title in paged_items(titles, "job_list"):
+        with st.expander(f"📄 {title}"):
+            if st.toggle("내용 보기", key=f"show_job_{job_id}"):
+                job_data = st.session_state.job_postings.get(job_id) or {'content': ""}
+                st.text_area("내용", value=job_data['content'], height=200, key=f"job_{job_id}", disabled=True)
+            if st.button("삭제", key=f"delete_job_{job_id}"):
+                cancel_prefetch(job_id)
+                del st.session_state.job_postings[job_id]
+                if job_id in st.session_state.job_analyses:
+                    del st.session_state.job_analyses[job_id]
+                if job_id in st.session_state.customization_settings:
+                    del st.session_state.customization_settings[job_id]
+                st.session_state.batch_results.pop(job_id, None)
+                st.success(f"'{title}' 채용 공고가 삭제되었습니다.")
+                st.experimental_rerun()
+
+# 스트리밍 출력 콜백 생성
+def make_stream_renderer(placeholder, min_interval=0.05):
+    """생성 중인 텍스트를 placeholder의 결과 영역에 점진적으로 표시하는 on_delta 콜백 반환
+
+    사이드바에서 스트리밍 출력을 끈 경우 None을 반환하여 일반 호출을 사용합니다.
+    """
+    if not st.session_state.stream_output:
+        return None
     
-    if not api_key:
-        raise Exception("API 키가 설정되지 않았습니다.")
+    chunks = []
+    last_render = [0.0]
     
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
+    def on_delta(delta):
+        chunks.append(delta)
+        now = time.monotonic()
+        # 너무 잦은 화면 갱신을 피하기 위해 일정 간격으로만 다시 그림
+        if now - last_render[0] >= min_interval:
+            last_render[0] = now
+            placeholder.markdown(result_area_html("".join(chunks)), unsafe_allow_html=True)
     
-    data = {
-        "model": model,
-        "max_tokens": max_tokens,
-        "temperature": temperature,
-        "messages": [{"role": "user", "content": prompt}]
-    }
+    return on_delta
+
+# 채용 공고 분석 실행 함수 (세션 상태에 접근하지 않음)
+def run_job_analysis(job_content, model, api_key=None, use_cache=None, force_refresh=False, on_delta=None,
+                     priority=None):
+    """채용 공고 내용을 분석한 결과를 반환 (TailorCore.analyze_job 참고)"""
+    return with_session_defaults(
+        lambda api_key, use_cache: get_core().analyze_job(
+            job_content, model, api_key, use_cache=use_cache, force_refresh=force_refresh,
+            on_delta=on_delta, owner=current_owner(), priority=priority
+        ),
+        api_key, use_cache
+    )
+
+# 미리 분석 작업의 소유자 (같은 작업 공간의 모든 세션이 진행 상황을 보고 취소할 수 있음)
+def prefetch_owner():
+    return f"prefetch:{workspace}"
+
+# 채용 공고 미리 분석 함수
+def prefetch_analysis(job_id):
+    """저장한 채용 공고의 분석을 낮은 우선순위로 백그라운드에서 실행하여 job_analyses에 저장
+
+    API 키가 없거나 이미 분석된 공고는 건너뜁니다. 공고가 삭제되면 cancel_prefetch로 취소합니다.
+    """
+    api_key = st.session_state.api_key
+    if not api_key or job_id in st.session_state.job_analyses:
+        return None
     
-    if system:
-        data["system"] = system
+    # 작업 스레드에서는 세션 상태를 읽을 수 없으므로 필요한 값을 미리 꺼내둠
+    job_content = st.session_state.job_postings[job_id]['content']
+    model = st.session_state.selected_model
+    use_cache = st.session_state.use_response_cache
+    job_postings = st.session_state.job_postings
+    job_analyses = st.session_state.job_analyses
     
-    try:
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"API 오류: {response.status_code} - {response.text}")
-        
-        return response.json()["content"][0]["text"]
-    except Exception as e:
-        raise Exception(f"API 호출 오류: {str(e)}")
+    def task(job):
+        analysis = run_job_analysis(job_content, model, api_key=api_key, use_cache=use_cache, priority=BACKGROUND)
+        # 분석하는 동안 취소되었거나 삭제된 공고에는 저장하지 않음
+        if job.cancelled or job_id not in job_postings:
+            return None
+        job_analyses[job_id] = analysis
+        if job_id not in job_postings:
+            job_analyses.pop(job_id, None)
+        return analysis
+    
+    return get_prefetch_queue().submit(
+        prefetch_owner(), task, label="채용 공고 미리 분석", meta={"job_id": job_id},
+        initializer=script_context_initializer()
+    )
+
+# 진행 중인 미리 분석 작업 (공고 ID → 작업)
+def pending_prefetches():
+    jobs = {}
+    for job in get_prefetch_queue().jobs_for(prefetch_owner()):
+        if not job.finished and not job.cancelled:
+            jobs.setdefault(job.meta["job_id"], job)
+    return jobs
+
+# 미리 분석 취소 (대기 중인 작업은 실행하지 않고, 실행 중인 작업은 결과를 저장하지 않음)
+def cancel_prefetch(job_id):
+    job = pending_prefetches().get(job_id)
+    if job:
+        job.cancel()
+
+# 사용자가 직접 분석을 요청한 공고의 미리 분석 처리
+def take_over_prefetch(job_id):
+    """아직 시작하지 않은 미리 분석은 취소 (진행 중이면 사용자의 분석 요청이 그 결과를 함께 받음)"""
+    job = pending_prefetches().get(job_id)
+    if job is not None and job.started_at is None:
+        job.cancel()
+
+# 미리 분석 진행 상황 (2초마다 이 부분만 다시 그리고, 모두 끝나면 전체 화면을 다시 그려 결과를 반영)
+@st.experimental_fragment(run_every=2)
+def prefetch_progress():
+    pending = pending_prefetches()
+    if not pending:
+        if get_script_run_ctx().fragment_ids_this_run:
+            st.rerun()
+        return
+    titles = st.session_state.job_postings.column('title')
+    st.caption(
+        f"🔄 채용 공고 {len(pending)}개를 백그라운드에서 미리 분석하는 중입니다: "
+        + ", ".join(titles.get(job_id, job_id) for job_id in pending)
+    )
 
 # 채용 공고 분석 함수
-def analyze_job_posting(job_id):
+def analyze_job_posting(job_id, force_refresh=False, on_delta=None):
     """채용 공고를 분석하여 주요 요구사항, 키워드, 우대사항 등을 추출"""
     job_content = st.session_state.job_postings[job_id]['content']
+    take_over_prefetch(job_id)
     
     try:
-        # 프롬프트 구성
-        prompt = f"""
-        당신은 채용 공고 분석 전문가입니다. 다음 채용 공고를 분석하여 구직자가 이력서를 최적화하는 데 필요한 정보를 추출해주세요.
-        
-        ## 채용 공고:
-        {job_content}
-        
-        다음 형식으로 분석 결과를 제공해주세요:
-        
-        1. 직무 요약: [직무에 대한 간략한 요약]
-        2. 핵심 요구사항: [필수적인 기술, 경험, 자격 요건을 항목별로 나열]
-        3. 우대사항: [우대하는 기술, 경험, 자격 요건을 항목별로 나열]
-        4. 주요 키워드: [이력서에 포함되면 좋을 핵심 키워드 10-15개 나열]
-        5. 회사 가치관/문화: [회사가 중요시하는 가치나 문화적 특성]
-        6. 이력서 최적화 전략: [이 채용 공고에 맞게 이력서를 최적화하는 구체적인 전략과 조언]
-        
-        각 섹션을 상세하게 작성해주시고, 채용 공고에서 명시적으로 언급되지 않았지만 해당 직무에서 중요할 수 있는 요소도 포함해주세요.
-        """
-        
-        # API 호출
-        analysis_result = call_anthropic_api(
-            prompt=prompt,
-            model=st.session_state.selected_model,
-            max_tokens=4000,
-            temperature=0.3,
-            system="당신은 채용 공고 분석 전문가입니다. 구직자가 이력서를 최적화할 수 있도록 채용 공고의 핵심 내용을 분석해주세요."
+        analysis_result = run_job_analysis(
+            job_content,
+            st.session_state.selected_model,
+            force_refresh=force_refresh,
+            on_delta=on_delta
         )
         
         # 분석 결과 저장
@@ -155,156 +515,221 @@ def analyze_job_posting(job_id):
     except Exception as e:
         raise Exception(f"채용 공고 분석 중 오류 발생: {str(e)}")
 
+# 여러 채용 공고 일괄 분석 함수
+def analyze_job_postings_bulk(job_ids, max_workers=8, on_progress=None):
+    """여러 채용 공고를 제한된 스레드 풀에서 동시에 분석
+
+    완료되는 순서대로 결과를 job_analyses에 저장하고 on_progress(완료 수, 전체 수, job_id, 오류)를 호출합니다.
+    실패한 공고가 있어도 나머지는 계속 분석하며, {job_id: 오류 메시지}를 반환합니다.
+    """
+    # 작업 스레드에서는 세션 상태를 읽을 수 없으므로 필요한 값을 미리 꺼내둠
+    api_key = st.session_state.api_key
+    model = st.session_state.selected_model
+    use_cache = st.session_state.use_response_cache
+    if not api_key:
+        raise Exception("API 키가 설정되지 않았습니다.")
+    
+    tasks = [
+        (job_id, lambda content=st.session_state.job_postings[job_id]['content']: run_job_analysis(
+            content, model, api_key=api_key, use_cache=use_cache
+        ))
+        for job_id in job_ids
+    ]
+    
+    errors = {}
+    for done, (job_id, analysis_result, error) in enumerate(run_parallel(tasks, max_workers=max_workers, initializer=script_context_initializer()), start=1):
+        if error is None:
+            st.session_state.job_analyses[job_id] = analysis_result
+        else:
+            errors[job_id] = str(error)
+        if on_progress:
+            on_progress(done, len(tasks), job_id, error)
+    
+    return errors
+
+# 이력서 맞춤화 실행 함수 (세션 상태에 접근하지 않음)
+def run_tailoring(job_title, job_content, analysis, resume_versions, custom_settings, model,
+                  token_budget=DEFAULT_RESUME_TOKEN_BUDGET, api_key=None, use_cache=None, force_refresh=False,
+                  on_delta=None, by_section=False):
+    """채용 공고, 분석 결과, 맞춤화 설정을 적용하여 맞춤화된 이력서 텍스트를 반환 (TailorCore.tailor 참고)
+
+    by_section=True이면 섹션별로 나누어 동시에 생성합니다 (TailorCore.tailor_by_section 참고).
+    """
+    tailor = get_core().tailor_by_section if by_section else get_core().tailor
+    return with_session_defaults(
+        lambda api_key, use_cache: tailor(
+            job_title, job_content, analysis, resume_versions, custom_settings, model, api_key,
+            token_budget=token_budget, use_cache=use_cache, force_refresh=force_refresh,
+            on_delta=on_delta, owner=current_owner()
+        ),
+        api_key, use_cache
+    )
+
 # 고급 이력서 맞춤화 함수
-def tailor_resume_advanced(job_id, selected_resume_names):
+def tailor_resume_advanced(job_id, selected_resume_names, force_refresh=False, on_delta=None, by_section=False):
     """채용 공고, 분석 결과, 맞춤화 설정을 적용하여 이력서 최적화"""
+    return tailoring_task(job_id, selected_resume_names, force_refresh=force_refresh, by_section=by_section)(on_delta)
+
+# 이력서 맞춤화 작업 생성 함수
+def tailoring_task(job_id, selected_resume_names, force_refresh=False, by_section=False):
+    """필요한 값을 세션 상태에서 미리 꺼내, 작업 스레드에서도 실행할 수 있는 task(on_delta) 함수를 반환"""
     job_content = st.session_state.job_postings[job_id]['content']
     job_title = st.session_state.job_postings[job_id]['title']
     
     # 선택된 이력서 내용 가져오기
-    selected_contents = [st.session_state.resume_versions[name] for name in selected_resume_names]
+    selected_versions = {name: st.session_state.resume_versions[name] for name in selected_resume_names}
     
     # 맞춤화 설정 가져오기
     custom_settings = st.session_state.customization_settings.get(job_id, {})
-    emphasis = custom_settings.get('emphasis_skills', '')
-    deemphasis = custom_settings.get('deemphasize_skills', '')
-    
-    tone_map = {
-        'professional': '전문적/공식적',
-        'creative': '창의적/활기찬',
-        'balanced': '균형잡힌/중립적',
-        'results_driven': '성과 중심적',
-        'collaborative': '협업 중심적'
-    }
     
-    tone = tone_map.get(custom_settings.get('tone', 'professional'), '전문적/공식적')
-    length_val = custom_settings.get('length', 2)
-    length_desc = ['간결한', '표준', '상세한'][length_val-1]
+    # 분석 결과 가져오기 (없으면 맞춤화 전에 분석)
+    analysis = st.session_state.job_analyses.get(job_id)
+    job_analyses = st.session_state.job_analyses
     
-    # 분석 결과 가져오기
-    analysis = st.session_state.job_analyses.get(job_id, '아직 분석되지 않았습니다.')
+    if analysis is None:
+        take_over_prefetch(job_id)
     
-    try:
-        # 프롬프트 구성
-        prompt = f"""
-        당신은 전문 이력서 맞춤화 전문가입니다. 다음 이력서 버전들을 참고하여 
-        제공된 채용 공고에 최적화된 새로운 이력서를 작성해 주세요.
-        
-        ## 채용 공고: {job_title}
-        {job_content}
-        
-        ## 채용 공고 분석 결과:
-        {analysis}
-        
-        ## 이력서 버전들:
-        {selected_contents}
-        
-        ## 맞춤화 설정:
-        - 강조할 기술/경험: {emphasis}
-        - 약화할 기술/경험: {deemphasis}
-        - 이력서 톤: {tone}
-        - 이력서 길이: {length_desc}
-        
-        다음 지침에 따라 이력서를 맞춤화해주세요:
-        1. 채용 공고의 요구사항과 일치하는 기술, 경험, 성과를 강조하세요.
-        2. 관련성이 낮은 내용은 줄이거나 제외하세요.
-        3. 위에서 지정한 '강조할 기술/경험'을 특별히 부각시키세요.
-        4. '약화할 기술/경험'은 최소화하거나 더 관련성 있는 다른 기술로 대체하세요.
-        5. 지정된 톤({tone})에 맞게 문체를 조정하세요.
-        6. 이력서 길이는 {length_desc} 수준으로 조정하세요.
-        7. 이력서 형식과 구조는 원본 이력서를 따라주세요.
-        8. 채용 공고 분석 결과의 주요 키워드와 핵심 요구사항을 반영하세요.
-        
-        최종 이력서는 구직자가 이 특정 채용 공고에 가장 적합한 후보자로 보이도록 맞춤화되어야 합니다.
-        """
-        
-        # API 호출
-        result = call_anthropic_api(
-            prompt=prompt,
-            model=st.session_state.selected_model,
-            max_tokens=4000,
-            temperature=0.3,
-            system="당신은 전문 이력서 맞춤화 전문가입니다. 채용 공고에 가장 적합한 이력서를 작성해 주세요."
-        )
+    api_key = st.session_state.api_key
+    model = st.session_state.selected_model
+    token_budget = st.session_state.resume_token_budget
+    use_cache = st.session_state.use_response_cache
+    if not api_key:
+        raise Exception("API 키가 설정되지 않았습니다.")
+    
+    def task(on_delta=None):
+        try:
+            job_analysis = analysis
+            if job_analysis is None:
+                job_analysis = run_job_analysis(job_content, model, api_key=api_key, use_cache=use_cache)
+                job_analyses[job_id] = job_analysis
+            return run_tailoring(
+                job_title, job_content, job_analysis, selected_versions, custom_settings,
+                model,
+                token_budget=token_budget,
+                api_key=api_key,
+                use_cache=use_cache,
+                force_refresh=force_refresh,
+                on_delta=on_delta,
+                by_section=by_section
+            )
         
-        # 결과 반환
-        return result
+        except Exception as e:
+            raise Exception(f"이력서 맞춤화 중 오류 발생: {str(e)}")
     
-    except Exception as e:
-        raise Exception(f"이력서 맞춤화 중 오류 발생: {str(e)}")
+    return task
+
+# 일괄 맞춤화 입력 지문 계산
+def tailoring_fingerprint(job_posting, analysis, resume_versions, custom_settings, model, token_budget):
+    """입력이 같으면 같은 값을 반환하여 변경되지 않은 조합을 건너뛸 수 있게 함"""
+    payload = json.dumps(
+        [job_posting['title'], job_posting['content'], analysis, resume_versions, custom_settings, model, token_budget],
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# 여러 채용 공고 일괄 맞춤화 함수
+def tailor_resumes_batch(job_ids, selected_resume_names, max_workers=4, on_progress=None):
+    """선택한 이력서들을 여러 채용 공고에 대해 동시에 맞춤화하여 batch_results에 저장
+
+    분석되지 않은 공고는 먼저 분석하고(응답 캐시 재사용), 입력이 이전 실행과 같은 공고는 건너뜁니다.
+    반환값: (건너뛴 job_id 목록, {job_id: 오류 메시지})
+    """
+    # 작업 스레드에서는 세션 상태를 읽을 수 없으므로 필요한 값을 미리 꺼내둠
+    api_key = st.session_state.api_key
+    model = st.session_state.selected_model
+    use_cache = st.session_state.use_response_cache
+    if not api_key:
+        raise Exception("API 키가 설정되지 않았습니다.")
+    
+    token_budget = st.session_state.resume_token_budget
+    resume_versions = {name: st.session_state.resume_versions[name] for name in selected_resume_names}
+    
+    def tailor_one(job_posting, analysis, custom_settings):
+        if analysis is None:
+            analysis = run_job_analysis(job_posting['content'], model, api_key=api_key, use_cache=use_cache)
+        result = run_tailoring(
+            job_posting['title'], job_posting['content'], analysis, resume_versions, custom_settings,
+            model, token_budget=token_budget, api_key=api_key, use_cache=use_cache
+        )
+        return analysis, result
+    
+    tasks, skipped = [], []
+    for job_id in job_ids:
+        job_posting = st.session_state.job_postings[job_id]
+        analysis = st.session_state.job_analyses.get(job_id)
+        custom_settings = st.session_state.customization_settings.get(job_id, {})
+        previous = st.session_state.batch_results.get(job_id)
+        if analysis is not None and previous and previous['fingerprint'] == tailoring_fingerprint(
+                job_posting, analysis, resume_versions, custom_settings, model, token_budget):
+            skipped.append(job_id)
+            continue
+        tasks.append((job_id, lambda p=job_posting, a=analysis, c=custom_settings: tailor_one(p, a, c)))
+    
+    errors = {}
+    for done, (job_id, output, error) in enumerate(run_parallel(tasks, max_workers=max_workers, initializer=script_context_initializer()), start=1):
+        if error is None:
+            analysis, result = output
+            job_posting = st.session_state.job_postings[job_id]
+            custom_settings = st.session_state.customization_settings.get(job_id, {})
+            st.session_state.job_analyses[job_id] = analysis
+            st.session_state.batch_results[job_id] = {
+                'title': job_posting['title'],
+                'resumes': list(selected_resume_names),
+                'result': result,
+                'fingerprint': tailoring_fingerprint(
+                    job_posting, analysis, resume_versions, custom_settings, model, token_budget
+                ),
+                'created_at': time.time()
+            }
+        else:
+            errors[job_id] = str(error)
+        if on_progress:
+            on_progress(done, len(tasks), job_id, error)
+    
+    return skipped, errors
+
+# 일괄 맞춤화 결과 압축 파일 생성
+def build_batch_zip(batch_results):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for job_id, entry in batch_results.items():
+            zf.writestr(f"맞춤화된_이력서_{job_id}.txt", entry['result'])
+    return buffer.getvalue()
 
 # 이력서 섹션 분리 함수 추가
-def split_resume_sections(resume_text):
-    """이력서를 섹션별로 분리"""
+def split_resume_sections(resume_text, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """이력서를 섹션별로 분리 (로컬 파서의 신뢰도가 낮을 때만 LLM 사용)"""
     try:
-        sections = call_anthropic_api(
-            prompt=f"""
-            다음 이력서를 주요 섹션으로 분리해주세요:
-            
-            {resume_text}
-            
-            다음 형식으로 분리된 섹션들을 JSON 형식으로 반환해주세요:
-            {{
-              "professional_summary": "전문 요약 내용...",
-              "work_experience": [
-                {{"title": "직위1", "company": "회사1", "content": "상세 내용..."}},
-                {{"title": "직위2", "company": "회사2", "content": "상세 내용..."}}
-              ],
-              "education": [
-                {{"degree": "학위1", "institution": "학교1", "content": "상세 내용..."}},
-                {{"degree": "학위2", "institution": "학교2", "content": "상세 내용..."}}
-              ],
-              "skills": ["기술1", "기술2", "기술3"],
-              "projects": [
-                {{"name": "프로젝트1", "content": "상세 내용..."}},
-                {{"name": "프로젝트2", "content": "상세 내용..."}}
-              ],
-              "additional_sections": [
-                {{"title": "섹션 제목1", "content": "상세 내용..."}},
-                {{"title": "섹션 제목2", "content": "상세 내용..."}}
-              ]
-            }}
-            
-            JSON 형식만 출력해주세요.
-            """,
-            model=st.session_state.selected_model,
-            temperature=0.0
+        return with_session_defaults(
+            lambda api_key, use_cache: get_core().split_sections(
+                resume_text, st.session_state.selected_model, api_key,
+                min_confidence=min_confidence, owner=current_owner()
+            ),
+            None, None
         )
-        
-        # JSON 문자열에서 실제 JSON 객체로 변환
-        import json
-        cleaned_json = sections.strip('```json').strip('```').strip()
-        return json.loads(cleaned_json)
     except Exception as e:
         st.error(f"이력서 섹션 분리 중 오류 발생: {str(e)}")
         return None
 
+# 섹션 수정 실행 함수 (세션 상태에 접근하지 않음)
+def run_section_update(section_type, section_content, feedback, job_context, model,
+                       api_key=None, use_cache=None):
+    """사용자 피드백을 반영해 다시 작성한 섹션 텍스트를 반환 (job_context는 build_job_context 결과)"""
+    return with_session_defaults(
+        lambda api_key, use_cache: get_core().update_section(
+            section_type, section_content, feedback, job_context, model, api_key,
+            use_cache=use_cache, owner=current_owner()
+        ),
+        api_key, use_cache
+    )
+
 # 섹션별 수정 함수 추가
-def update_resume_section(section_type, section_content, feedback, job_description, job_analysis):
+def update_resume_section(section_type, section_content, feedback, job_context):
     """사용자 피드백에 따라 특정 섹션만 수정"""
     try:
-        updated_section = call_anthropic_api(
-            prompt=f"""
-            다음은 이력서의 '{section_type}' 섹션입니다:
-            
-            {section_content}
-            
-            사용자가 이 섹션에 대해 다음과 같은 피드백을 제공했습니다:
-            
-            {feedback}
-            
-            관련 채용 공고:
-            {job_description}
-            
-            채용 공고 분석:
-            {job_analysis}
-            
-            사용자의 피드백을 반영하여 이 섹션을 다시 작성해주세요. 
-            원래 섹션의 핵심 정보는 유지하되, 피드백에 따라 내용, 표현, 강조점을 조정해주세요.
-            피드백에 언급된 사항만 수정하고, 그 외 부분은 가능한 유지해주세요.
-            """,
-            model=st.session_state.selected_model,
-            temperature=0.3
+        updated_section = run_section_update(
+            section_type, section_content, feedback, job_context,
+            st.session_state.selected_model
         )
         
         return updated_section
@@ -312,6 +737,102 @@ def update_resume_section(section_type, section_content, feedback, job_descripti
         st.error(f"섹션 수정 중 오류 발생: {str(e)}")
         return None
 
+# 여러 섹션 동시 수정 함수
+def update_resume_sections_parallel(section_updates, job_context, max_workers=8):
+    """피드백이 있는 섹션들을 동시에 수정
+
+    section_updates: [(키, 섹션 종류, 섹션 내용, 피드백), ...]
+    반환값: ({키: 수정된 섹션}, {키: 오류 메시지})
+    """
+    # 작업 스레드에서는 세션 상태를 읽을 수 없으므로 필요한 값을 미리 꺼내둠
+    api_key = st.session_state.api_key
+    model = st.session_state.selected_model
+    use_cache = st.session_state.use_response_cache
+    if not api_key:
+        raise Exception("API 키가 설정되지 않았습니다.")
+    
+    tasks = [
+        (key, lambda t=section_type, c=content, f=feedback: run_section_update(
+            t, c, f, job_context, model, api_key=api_key, use_cache=use_cache
+        ))
+        for key, section_type, content, feedback in section_updates
+    ]
+    
+    updated, errors = {}, {}
+    for key, result, error in run_parallel(tasks, max_workers=max_workers, initializer=script_context_initializer()):
+        if error is None:
+            updated[key] = result
+        else:
+            errors[key] = str(error)
+    return updated, errors
+
+# 이력서 재구성 실행 함수 (세션 상태에 접근하지 않음)
+def run_reconstruction(resume_sections, job_context, model, api_key=None, use_cache=None, on_delta=None):
+    """수정된 섹션들을 합쳐 완성된 이력서 텍스트를 반환 (job_context는 build_job_context 결과)"""
+    return with_session_defaults(
+        lambda api_key, use_cache: get_core().reconstruct(
+            resume_sections, job_context, model, api_key, use_cache=use_cache,
+            on_delta=on_delta, owner=current_owner()
+        ),
+        api_key, use_cache
+    )
+
+# 백그라운드 생성 작업 제출 함수
+def submit_generation(slot, label, task, meta=None):
+    """task(on_delta)를 작업 큐에 넣고 세션 상태 slot에 작업 ID를 기록
+
+    같은 slot에서 진행 중이던 이전 작업은 취소합니다.
+    """
+    previous = get_job_queue().get(st.session_state[slot]) if st.session_state[slot] else None
+    if previous:
+        previous.cancel()
+    
+    stream = st.session_state.stream_output
+    job = get_job_queue().submit(
+        st.session_state.session_id,
+        lambda job: task(job.append_text if stream else None),
+        label=label,
+        meta=meta,
+        initializer=script_context_initializer()
+    )
+    st.session_state[slot] = job.id
+    return job
+
+# 끝난 생성 작업 가져오기
+def pop_finished_generation(slot):
+    """slot의 작업이 끝났으면 큐에서 꺼내 반환하고 slot을 비움 (진행 중이거나 없으면 None)"""
+    job = get_job_queue().get(st.session_state[slot]) if st.session_state[slot] else None
+    if job is None:
+        st.session_state[slot] = None
+        return None
+    if not job.finished:
+        return None
+    st.session_state[slot] = None
+    get_job_queue().discard(job.id)
+    return job
+
+# 생성 작업 진행 상황 표시 (1초마다 이 부분만 다시 그림)
+@st.experimental_fragment(run_every=1)
+def generation_progress(slot):
+    job = get_job_queue().get(st.session_state[slot]) if st.session_state[slot] else None
+    if job is None or job.finished:
+        # 작업이 끝나면 전체 화면을 다시 그려 결과를 반영 (전체 실행 중이면 다음 주기에 반영)
+        if get_script_run_ctx().fragment_ids_this_run:
+            st.rerun()
+        st.info("작업이 끝났습니다. 결과를 불러오는 중...")
+        return
+    
+    if job.started_at is None:
+        st.info(f"{job.label} 대기 중... 다른 작업을 계속하셔도 됩니다.")
+    else:
+        st.info(f"{job.label} 진행 중... ({job.elapsed():.0f}초) 다른 작업을 계속하셔도 됩니다.")
+    partial_text = job.partial_text
+    if partial_text:
+        st.markdown(result_area_html(partial_text), unsafe_allow_html=True)
+    if st.button("취소", key=f"cancel_{slot}"):
+        job.cancel()
+        st.warning("취소를 요청했습니다.")
+
 # 사이드바에 API 키 설정
 with st.sidebar:
     st.header("🔑 API 설정")
@@ -333,17 +854,137 @@ with st.sidebar:
     selected_model = st.selectbox("AI 모델 선택", list(models.keys()))
     st.session_state.selected_model = models[selected_model]
     
+    # 단계별 모델 (분석, 섹션 분리/수정, 재구성은 빠른 모델로 시작하고 검증에 실패하면 선택한 모델로 다시 시도)
+    model_names = {model_id: name for name, model_id in models.items()}
+    stage_reports = get_core().router.reports(current_owner())
+    with st.expander("단계별 모델", expanded=False):
+        rows = []
+        for stage, stage_label in STAGE_LABELS.items():
+            cascade = get_core().router.models(stage, st.session_state.selected_model)
+            budget = get_core().router.budget(stage)
+            report = stage_reports.get(stage)
+            row = {
+                "단계": stage_label,
+                "모델": " → ".join(model_names.get(model, model) for model in cascade),
+                "예산": f"{budget:.0f}초" if budget else "-",
+                "최근 사용": "-"
+            }
+            if report:
+                if report["model"] is None:
+                    row["최근 사용"] = "로컬 파서"
+                else:
+                    row["최근 사용"] = model_names.get(report["model"], report["model"])
+                    if report["escalated"]:
+                        row["최근 사용"] += " (상향)"
+                    if report["error"]:
+                        row["최근 사용"] += " (실패)"
+            rows.append(row)
+        st.dataframe(rows, hide_index=True)
+        escalations = get_core().router.stats()["escalations"]
+        if escalations:
+            st.caption("상위 모델로 다시 시도: " + ", ".join(
+                f"{STAGE_LABELS.get(stage, stage)} {count}회" for stage, count in escalations.items()
+            ))
+        for stage, report in stage_reports.items():
+            for model, reason in report["escalated"]:
+                st.caption(f"{STAGE_LABELS.get(stage, stage)}: {model_names.get(model, model)} 실패로 상향 - {reason[:120]}")
+    st.session_state.stream_output = st.checkbox(
+        "생성 중인 결과 실시간 표시 (스트리밍)",
+        value=st.session_state.stream_output
+    )
+    limiter_stats = get_core().rate_limiter.stats().get(st.session_state.selected_model)
+    if limiter_stats and (limiter_stats["waiting"] or limiter_stats["throttled"]):
+        st.caption(
+            f"요청 제한: 동시 실행 {limiter_stats['in_flight']}/{limiter_stats['concurrency']}, "
+            f"대기 {limiter_stats['waiting']}건 (누적 대기 {limiter_stats['throttled']}건)"
+        )
+    if st.session_state.last_usage:
+        usage = st.session_state.last_usage
+        if usage.get("cached"):
+            st.caption("마지막 호출: 캐시된 응답 사용")
+        elif usage.get("coalesced"):
+            st.caption("마지막 호출: 진행 중이던 동일 요청의 결과 사용")
+        else:
+            st.caption(f"마지막 호출 토큰: 입력 {usage.get('input_tokens', 0)} / 출력 {usage.get('output_tokens', 0)}")
+            if usage.get('sections'):
+                st.caption(f"섹션 {usage['sections']}개를 동시에 생성")
+            if usage.get('failed_sections'):
+                st.caption(f"⚠️ 맞춤화에 실패해 원래 내용을 그대로 쓴 섹션: {', '.join(usage['failed_sections'])}")
+            if usage.get('continuations'):
+                st.caption(f"출력 한도에 닿아 {usage['continuations']}번 이어서 생성")
+            if usage.get('truncated'):
+                st.caption("⚠️ 이어서 생성한 뒤에도 출력 한도에 닿아 결과가 잘렸을 수 있습니다.")
+            if usage.get('cache_read_input_tokens') or usage.get('cache_creation_input_tokens'):
+                st.caption(
+                    f"프롬프트 캐시: 읽기 {usage.get('cache_read_input_tokens', 0)} / "
+                    f"쓰기 {usage.get('cache_creation_input_tokens', 0)} 토큰"
+                )
+    
+    # 응답 캐시 설정
+    st.header("⚡ 응답 캐시")
+    st.session_state.use_response_cache = st.checkbox(
+        "동일한 요청은 저장된 응답 재사용",
+        value=st.session_state.use_response_cache,
+        help="같은 모델, 프롬프트, 설정으로 다시 요청하면 API를 호출하지 않고 저장된 결과를 사용합니다. (temperature 0 호출은 항상 캐시됩니다)"
+    )
+    cache_stats = get_core().response_cache.stats()
+    st.caption(f"저장된 응답: {cache_stats['entries']}개 ({cache_stats['bytes'] / 1024 / 1024:.1f} MB)")
+    shared_stats = get_core().shared_analyses.stats()
+    st.caption(f"공유 분석 결과: {shared_stats['entries']}개 (재사용 {shared_stats['hits']}회)")
+    if st.button("캐시 비우기"):
+        get_core().response_cache.clear()
+        st.success("응답 캐시를 비웠습니다.")
+    
+    # LLM 호출 통계
+    st.header("📊 호출 통계")
+    telemetry_summary = get_core().telemetry.summary()
+    if not telemetry_summary:
+        st.caption("아직 기록된 호출이 없습니다.")
+    else:
+        def seconds(value):
+            return f"{value:.1f}초" if value is not None else "-"
+        st.dataframe(
+            [
+                {
+                    "모델": model,
+                    "API 호출": stats["api_calls"],
+                    "캐시/공유": stats["cached"],
+                    "오류": stats["errors"],
+                    "p50": seconds(stats["p50"]),
+                    "p95": seconds(stats["p95"]),
+                    "첫 응답 p50": seconds(stats["ttfb_p50"]),
+                    "입력 토큰": stats["input_tokens"] + stats["cache_creation_input_tokens"] + stats["cache_read_input_tokens"],
+                    "출력 토큰": stats["output_tokens"],
+                    "비용($)": round(stats["cost_usd"], 4)
+                }
+                for model, stats in telemetry_summary.items()
+            ],
+            hide_index=True
+        )
+        st.caption(f"총 예상 비용: ${sum(stats['cost_usd'] for stats in telemetry_summary.values()):.4f} (최근 호출 기준)")
+    
     # 데이터 저장 및 불러오기
     st.header("💾 데이터 관리")
     
-    # 데이터 저장
+    # 작업 공간 (개인 작업 공간과 서버에 명시된 공유 작업 공간 중에서만 선택)
+    if FIXED_WORKSPACE:
+        st.caption(f"작업 공간: {FIXED_WORKSPACE} (서버 설정)")
+    else:
+        if SHARED_WORKSPACES:
+            st.selectbox(
+                "작업 공간",
+                [PRIVATE_WORKSPACE_LABEL] + SHARED_WORKSPACES,
+                key="workspace_choice",
+                help="개인 작업 공간 외의 항목은 공유 작업 공간으로, 선택한 모든 사용자가 데이터를 보고 수정할 수 있습니다."
+            )
+        st.caption(
+            "모든 데이터는 서버의 로컬 저장소에 자동으로 저장됩니다. 개인 작업 공간은 지금 주소(?workspace=...)로만 "
+            "다시 열 수 있으니 북마크해두고, 주소를 다른 사람과 공유하지 마세요."
+        )
+    
+    # 데이터 백업 (JSON 파일로 내보내기)
     if st.button("모든 데이터 저장"):
-        data = {
-            "resume_versions": st.session_state.resume_versions,
-            "job_postings": st.session_state.job_postings,
-            "job_analyses": st.session_state.job_analyses,
-            "customization_settings": st.session_state.customization_settings
-        }
+        data = get_data_store().export_data(workspace)
         
         # JSON으로 변환
         json_data = json.dumps(data, ensure_ascii=False, indent=2)
@@ -356,18 +997,45 @@ with st.sidebar:
             mime="application/json"
         )
     
-    # 데이터 불러오기
+    # 데이터 불러오기 (백업 파일의 내용을 현재 작업 공간에 병합)
     uploaded_file = st.file_uploader("데이터 파일 업로드", type="json")
-    if uploaded_file:
+    if uploaded_file and st.session_state.get('imported_file_id') != uploaded_file.file_id:
         try:
             data = json.load(uploaded_file)
-            st.session_state.resume_versions = data.get("resume_versions", {})
-            st.session_state.job_postings = data.get("job_postings", {})
-            st.session_state.job_analyses = data.get("job_analyses", {})
-            st.session_state.customization_settings = data.get("customization_settings", {})
+            get_data_store().import_data(workspace, data)
+            st.session_state.imported_file_id = uploaded_file.file_id
             st.success(f"데이터를 성공적으로 불러왔습니다!")
         except Exception as e:
             st.error(f"데이터 불러오기 오류: {e}")
+    
+    # 미리 분석 중인 채용 공고 표시 (사이드바 맨 아래에 두어 나타나거나 사라져도 본문 위젯의 위치가 바뀌지 않음)
+    if pending_prefetches():
+        prefetch_progress()
+
+# 끝난 백그라운드 생성 작업의 결과 반영
+tailor_job = pop_finished_generation("tailor_job")
+if tailor_job:
+    if tailor_job.status == DONE:
+        st.session_state.tailored_result = tailor_job.result
+        st.session_state.tailored_title = tailor_job.meta.get("title", "")
+        st.session_state.tailored_job_id = tailor_job.meta.get("job_id")
+        # 새 결과이므로 이전 결과의 섹션 분리와 재구성 결과는 버림
+        st.session_state.resume_sections = None
+        st.session_state.reconstructed = False
+    elif tailor_job.status == CANCELLED:
+        st.info("이력서 맞춤화가 취소되었습니다.")
+    else:
+        st.error(f"맞춤화 중 오류가 발생했습니다: {tailor_job.error}")
+
+reconstruct_job = pop_finished_generation("reconstruct_job")
+if reconstruct_job:
+    if reconstruct_job.status == DONE:
+        st.session_state.tailored_result = reconstruct_job.result
+        st.session_state.reconstructed = True
+    elif reconstruct_job.status == CANCELLED:
+        st.info("이력서 재구성이 취소되었습니다.")
+    else:
+        st.error(f"이력서 재구성 중 오류가 발생했습니다: {reconstruct_job.error}")
 
 # 탭 생성
 tabs = st.tabs(["이력서 관리", "채용 공고 관리", "채용 공고 분석", "이력서 맞춤화"])
@@ -393,21 +1061,16 @@ with tabs[0]:
             else:
                 st.error("이력서 이름과 내용을 모두 입력해주세요.")
     
+    with st.expander("파일에서 여러 이력서 가져오기", expanded=False):
+        bulk_import_form("resumes", "이력서")
+    
     # 저장된 이력서 목록
     st.markdown("<h3 class='subsection-header'>저장된 이력서 목록</h3>", unsafe_allow_html=True)
     
     if not st.session_state.resume_versions:
         st.info("저장된 이력서가 없습니다. 위에서 이력서를 추가해보세요.")
     else:
-        for version, content in st.session_state.resume_versions.items():
-            with st.expander(f"📄 {version}"):
-                st.text_area("내용", value=content, height=200, key=f"resume_{version}", disabled=True)
-                col1, col2 = st.columns([1, 5])
-                with col1:
-                    if st.button("삭제", key=f"delete_{version}"):
-                        del st.session_state.resume_versions[version]
-                        st.success(f"'{version}' 이력서가 삭제되었습니다.")
-                        st.experimental_rerun()
+        resume_list()
 
 # 2. 채용 공고 관리 탭
 with tabs[1]:
@@ -423,40 +1086,39 @@ with tabs[1]:
         
         if st.button("채용 공고 저장", use_container_width=True):
             if job_title and job_content:
-                # 채용 공고 ID 생성
-                job_id = f"{job_title.replace(' ', '_')}_{int(time.time())}"
+                # 채용 공고 저장 (같거나 유사한 공고가 이미 있으면 새로 만들지 않음, ID는 내용으로 결정)
+                status, job_id, _ = get_duplicate_indexes().add(
+                    get_data_store(), workspace, "job_postings",
+                    {"source": "입력", "title": job_title, "content": job_content}
+                )
                 
-                # 채용 공고 저장
-                st.session_state.job_postings[job_id] = {
-                    'title': job_title,
-                    'content': job_content
-                }
-                
-                st.success(f"'{job_title}' 채용 공고가 저장되었습니다!")
-                # 입력 필드 초기화를 위한 rerun
-                st.experimental_rerun()
+                if status == "merged":
+                    st.warning(f"이미 저장된 '{st.session_state.job_postings[job_id]['title']}' 공고와 같거나 거의 같은 공고입니다. 새로 저장하지 않았습니다.")
+                    prefetch_analysis(job_id)
+                else:
+                    # 다른 세션에서 이미 분석한 공고면 분석 결과를 바로 연결하고, 아니면 백그라운드에서 미리 분석
+                    shared = get_core().shared_analysis(job_content, st.session_state.selected_model)
+                    if shared is not None:
+                        st.session_state.job_analyses[job_id] = shared
+                    else:
+                        prefetch_analysis(job_id)
+                    
+                    st.success(f"'{job_title}' 채용 공고가 저장되었습니다!")
+                    # 입력 필드 초기화를 위한 rerun
+                    st.experimental_rerun()
             else:
                 st.error("채용 공고 제목과 내용을 모두 입력해주세요.")
     
+    with st.expander("파일에서 여러 채용 공고 가져오기", expanded=False):
+        bulk_import_form("job_postings", "채용 공고")
+    
     # 저장된 채용 공고 목록
     st.markdown("<h3 class='subsection-header'>저장된 채용 공고 목록</h3>", unsafe_allow_html=True)
     
     if not st.session_state.job_postings:
         st.info("저장된 채용 공고가 없습니다. 위에서 채용 공고를 추가해보세요.")
     else:
-        for job_id, job_data in st.session_state.job_postings.items():
-            with st.expander(f"📄 {job_data['title']}"):
-                st.text_area("내용", value=job_data['content'], height=200, key=f"job_{job_id}", disabled=True)
-                col1, col2 = st.columns([1, 5])
-                with col1:
-                    if st.button("삭제", key=f"delete_job_{job_id}"):
-                        del st.session_state.job_postings[job_id]
-                        if job_id in st.session_state.job_analyses:
-                            del st.session_state.job_analyses[job_id]
-                        if job_id in st.session_state.customization_settings:
-                            del st.session_state.customization_settings[job_id]
-                        st.success(f"'{job_data['title']}' 채용 공고가 삭제되었습니다.")
-                        st.experimental_rerun()
+        job_posting_list()
 
 # 3. 채용 공고 분석 탭
 with tabs[2]:
@@ -470,32 +1132,68 @@ with tabs[2]:
     if not st.session_state.job_postings:
         st.info("저장된 채용 공고가 없습니다. '채용 공고 관리' 탭에서 채용 공고를 추가해주세요.")
     else:
-        job_options = {job_data['title']: job_id for job_id, job_data in st.session_state.job_postings.items()}
+        # 미분석 공고 일괄 분석
+        analyzed_ids = set(st.session_state.job_analyses)
+        unanalyzed_ids = [job_id for job_id in st.session_state.job_postings if job_id not in analyzed_ids]
+        with st.expander(f"미분석 공고 일괄 분석 ({len(unanalyzed_ids)}개)", expanded=False):
+            max_workers = st.slider("동시 분석 수", min_value=1, max_value=16, value=8,
+                                    help="동시에 보낼 API 요청 수입니다. 요청 제한 오류가 잦으면 줄여주세요.")
+            if st.button("미분석 공고 모두 분석", use_container_width=True, disabled=not unanalyzed_ids):
+                progress_bar = st.progress(0.0, text="일괄 분석을 시작합니다...")
+                
+                def show_progress(done, total, job_id, error):
+                    title = st.session_state.job_postings[job_id]['title']
+                    status = "실패" if error else "완료"
+                    progress_bar.progress(done / total, text=f"{done}/{total} 처리됨 - '{title}' {status}")
+                
+                try:
+                    errors = analyze_job_postings_bulk(unanalyzed_ids, max_workers=max_workers, on_progress=show_progress)
+                    st.success(f"{len(unanalyzed_ids) - len(errors)}개 채용 공고 분석이 완료되었습니다!")
+                    for job_id, error in errors.items():
+                        st.error(f"'{st.session_state.job_postings[job_id]['title']}' 분석 실패: {error}")
+                except Exception as e:
+                    st.error(f"일괄 분석 중 오류가 발생했습니다: {str(e)}")
+        
+        job_options = cached_job_options(workspace, st.session_state.job_postings.revision)
         selected_job_title = st.selectbox("분석할 채용 공고 선택", options=list(job_options.keys()))
         selected_job_id = job_options[selected_job_title]
         
         # 이미 분석된 경우 결과 표시
         if selected_job_id in st.session_state.job_analyses:
             st.markdown("<div class='info-message'>이 채용 공고는 이미 분석되었습니다. 다시 분석하려면 아래 버튼을 클릭하세요.</div>", unsafe_allow_html=True)
+            force_reanalyze = st.checkbox("저장된 응답을 사용하지 않고 새로 분석", key="force_reanalyze")
             if st.button("다시 분석", use_container_width=True):
+                stream_area = st.empty()
                 with st.spinner("채용 공고를 분석하는 중..."):
                     try:
-                        analysis_result = analyze_job_posting(selected_job_id)
+                        analysis_result = analyze_job_posting(
+                            selected_job_id, force_refresh=force_reanalyze,
+                            on_delta=make_stream_renderer(stream_area)
+                        )
                         st.success("채용 공고 분석이 완료되었습니다!")
                         st.experimental_rerun()
                     except Exception as e:
                         st.error(f"분석 중 오류가 발생했습니다: {str(e)}")
             
             st.markdown("<h3 class='subsection-header'>분석 결과</h3>", unsafe_allow_html=True)
-            st.markdown("<div class='result-area'>" + st.session_state.job_analyses[selected_job_id].replace('\n', '<br>') + "</div>", unsafe_allow_html=True)
+            st.markdown(
+                cached_result_area_html(format_analysis(st.session_state.job_analyses[selected_job_id])),
+                unsafe_allow_html=True
+            )
             
         else:
-            st.info("이 채용 공고는 아직 분석되지 않았습니다.")
+            if selected_job_id in pending_prefetches():
+                st.info("이 채용 공고는 백그라운드에서 분석하고 있습니다. 끝나면 결과가 자동으로 표시됩니다.")
+            else:
+                st.info("이 채용 공고는 아직 분석되지 않았습니다.")
             
             if st.button("채용 공고 분석", use_container_width=True):
+                stream_area = st.empty()
                 with st.spinner("채용 공고를 분석하는 중..."):
                     try:
-                        analysis_result = analyze_job_posting(selected_job_id)
+                        analysis_result = analyze_job_posting(
+                            selected_job_id, on_delta=make_stream_renderer(stream_area)
+                        )
                         st.success("채용 공고 분석이 완료되었습니다!")
                         st.experimental_rerun()
                     except Exception as e:
@@ -518,19 +1216,119 @@ with tabs[3]:
     
     if st.session_state.resume_versions and st.session_state.job_postings:
         # 채용 공고 선택
-        job_options = {job_data['title']: job_id for job_id, job_data in st.session_state.job_postings.items()}
+        job_options = cached_job_options(workspace, st.session_state.job_postings.revision)
         selected_job_title = st.selectbox("맞춤화할 채용 공고 선택", options=list(job_options.keys()), key="customize_job")
         selected_job_id = job_options[selected_job_title]
         
         # 분석 결과 확인 및 분석 권장
         if selected_job_id not in st.session_state.job_analyses:
-            st.info("이 채용 공고는 아직 분석되지 않았습니다. '채용 공고 분석' 탭에서 먼저 분석하는 것을 권장합니다.")
+            if selected_job_id in pending_prefetches():
+                st.info("이 채용 공고는 백그라운드에서 분석하고 있습니다. 지금 맞춤화를 시작하면 분석이 끝난 뒤 그 결과를 사용합니다.")
+            else:
+                st.info("이 채용 공고는 아직 분석되지 않았습니다. 맞춤화를 시작하면 먼저 채용 공고를 분석합니다.")
         
         # 이력서 버전 선택
         st.markdown("<h3 class='subsection-header'>사용할 이력서 버전 선택</h3>", unsafe_allow_html=True)
         resume_options = list(st.session_state.resume_versions.keys())
         selected_resumes = st.multiselect("이력서 버전", options=resume_options)
         
+        # 로컬 적합도 점수 (API 호출 없음)
+        selected_posting = {
+            selected_job_id: {
+                "content": st.session_state.job_postings[selected_job_id]['content'],
+                "analysis": st.session_state.job_analyses.get(selected_job_id)
+            }
+        }
+        with st.expander("이력서별 적합도 점수 (API 비용 없음)", expanded=False):
+            scores = cached_resume_scores(
+                workspace, get_data_store().revision("resumes", "job_postings", "job_analyses", workspace=workspace),
+                selected_job_id
+            )
+            rows = sorted(
+                (score_row(name, score) for (name, _), score in scores.items()),
+                key=lambda row: row["적합도"], reverse=True
+            )
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+            if selected_job_id not in st.session_state.job_analyses:
+                st.caption("채용 공고를 분석하면 주요 키워드와 핵심 요구사항 기준의 점수도 함께 계산됩니다.")
+        
+        # 프롬프트에 들어갈 이력서 내용 (중복 제거 + 관련성 순 정리)
+        st.session_state.resume_token_budget = st.number_input(
+            "이력서 입력 토큰 한도",
+            min_value=500, max_value=50000, step=500,
+            value=st.session_state.resume_token_budget,
+            help="여러 버전에서 중복되는 문단은 한 번만 넣고, 채용 공고와 관련성이 높은 문단부터 이 한도 안에서 포함합니다."
+        )
+        if selected_resumes:
+            resume_context = cached_resume_context(
+                {name: st.session_state.resume_versions[name] for name in selected_resumes},
+                st.session_state.job_postings[selected_job_id]['content'],
+                st.session_state.job_analyses.get(selected_job_id),
+                st.session_state.resume_token_budget
+            )
+            st.caption(
+                f"예상 이력서 입력 토큰: 원본 약 {resume_context['original_tokens']:,} → 정리 후 약 {resume_context['estimated_tokens']:,} "
+                f"(중복 문단 {resume_context['duplicates_removed']}개 제거, 관련성 낮은 문단 {resume_context['dropped']}개 제외)"
+            )
+            with st.expander("프롬프트에 포함될 이력서 내용 미리보기", expanded=False):
+                st.text(resume_context['text'])
+        
+        # 여러 채용 공고 일괄 맞춤화
+        with st.expander("여러 채용 공고에 일괄 맞춤화", expanded=False):
+            st.caption("선택한 이력서 버전으로 여러 채용 공고를 동시에 맞춤화합니다. 각 공고에 저장된 맞춤화 설정이 적용되며, 입력이 바뀌지 않은 공고는 건너뜁니다.")
+            batch_job_titles = st.multiselect("맞춤화할 채용 공고들", options=list(job_options.keys()), key="batch_jobs")
+            batch_workers = st.slider("동시 맞춤화 수", min_value=1, max_value=8, value=4, key="batch_workers")
+            
+            if st.button("선택한 공고 일괄 맞춤화", use_container_width=True):
+                if not selected_resumes:
+                    st.error("최소한 하나의 이력서 버전을 선택해주세요.")
+                elif not batch_job_titles:
+                    st.error("맞춤화할 채용 공고를 선택해주세요.")
+                else:
+                    progress_bar = st.progress(0.0, text="일괄 맞춤화를 시작합니다...")
+                    
+                    def show_batch_progress(done, total, job_id, error):
+                        title = st.session_state.job_postings[job_id]['title']
+                        status = "실패" if error else "완료"
+                        progress_bar.progress(done / total, text=f"{done}/{total} 처리됨 - '{title}' {status}")
+                    
+                    try:
+                        skipped, errors = tailor_resumes_batch(
+                            [job_options[title] for title in batch_job_titles],
+                            selected_resumes,
+                            max_workers=batch_workers,
+                            on_progress=show_batch_progress
+                        )
+                        progress_bar.progress(1.0, text="일괄 맞춤화가 끝났습니다.")
+                        if skipped:
+                            st.info(f"입력이 바뀌지 않은 {len(skipped)}개 공고는 이전 결과를 그대로 사용합니다.")
+                        for job_id, error in errors.items():
+                            st.error(f"'{st.session_state.job_postings[job_id]['title']}' 맞춤화 실패: {error}")
+                    except Exception as e:
+                        st.error(f"일괄 맞춤화 중 오류가 발생했습니다: {str(e)}")
+            
+            if st.session_state.batch_results:
+                batch_titles = st.session_state.batch_results.column('title')
+                batch_resumes = st.session_state.batch_results.column('resumes')
+                st.markdown(f"**일괄 맞춤화 결과: {len(batch_titles)}개**")
+                for job_id, title in batch_titles.items():
+                    st.caption(f"📄 {title} ← {', '.join(batch_resumes[job_id])}")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="모든 결과 다운로드 (zip)",
+                        data=cached_batch_zip(workspace, st.session_state.batch_results.revision),
+                        file_name="맞춤화된_이력서_모음.zip",
+                        mime="application/zip",
+                        use_container_width=True
+                    )
+                with col2:
+                    if st.button("모든 결과를 이력서 버전으로 저장", use_container_width=True):
+                        for entry in st.session_state.batch_results.values():
+                            st.session_state.resume_versions[f"맞춤화된 이력서 - {entry['title']}"] = entry['result']
+                        st.success(f"{len(st.session_state.batch_results)}개 이력서 버전이 저장되었습니다!")
+        
         # 맞춤화 설정
         st.markdown("<h3 class='subsection-header'>맞춤화 설정</h3>", unsafe_allow_html=True)
         
@@ -591,36 +1389,78 @@ with tabs[3]:
             st.success("맞춤화 설정이 저장되었습니다!")
         
         # 이력서 맞춤화 실행
+        force_regenerate = st.checkbox("저장된 응답을 사용하지 않고 새로 생성", key="force_regenerate")
+        st.session_state.tailor_by_section = st.checkbox(
+            "섹션별로 나누어 동시에 생성",
+            value=st.session_state.tailor_by_section,
+            help="이력서를 섹션별로 나누어 동시에 맞춤화한 뒤 합치고 섹션 사이의 불일치를 검토합니다. 긴 이력서일수록 결과가 빨리 나옵니다."
+        )
         if st.button("이력서 맞춤화 시작", use_container_width=True, type="primary"):
             if not selected_resumes:
                 st.error("최소한 하나의 이력서 버전을 선택해주세요.")
             else:
-                with st.spinner("이력서를 맞춤화하는 중... 잠시만 기다려주세요."):
-                    try:
-                        st.session_state.tailored_result = tailor_resume_advanced(selected_job_id, selected_resumes)
-                        result = st.session_state.tailored_result
-                        
-                        st.markdown("<h3 class='subsection-header'>맞춤화된 이력서 결과</h3>", unsafe_allow_html=True)
-                        st.markdown("<div class='result-area'>" + result.replace('\n', '<br>') + "</div>", unsafe_allow_html=True)
-                        
-                        # 결과 다운로드
-                        st.download_button(
-                            label="결과 다운로드",
-                            data=result,
-                            file_name=f"맞춤화된_이력서_{selected_job_title.replace(' ', '_')}.txt",
-                            mime="text/plain"
-                        )
-                        
-                        # 새 버전으로 저장
-                        new_version_name = st.text_input("새 이력서 버전 이름", value=f"맞춤화된 이력서 - {selected_job_title}")
-                        if st.button("새 버전으로 저장"):
-                            if new_version_name:
-                                st.session_state.resume_versions[new_version_name] = result
-                                st.success(f"'{new_version_name}' 이름으로 새 이력서가 저장되었습니다!")
-                            else:
-                                st.error("이력서 버전 이름을 입력해주세요.")
-                    except Exception as e:
-                        st.error(f"맞춤화 중 오류가 발생했습니다: {str(e)}")
+                try:
+                    # 백그라운드에서 실행하므로 다른 위젯을 조작해도 결과가 사라지지 않음
+                    submit_generation(
+                        "tailor_job", "이력서 맞춤화",
+                        tailoring_task(
+                            selected_job_id, selected_resumes, force_refresh=force_regenerate,
+                            by_section=st.session_state.tailor_by_section
+                        ),
+                        meta={"title": selected_job_title, "job_id": selected_job_id}
+                    )
+                except Exception as e:
+                    st.error(f"맞춤화 중 오류가 발생했습니다: {str(e)}")
+        
+        if st.session_state.tailor_job:
+            st.markdown("<h3 class='subsection-header'>맞춤화된 이력서 결과</h3>", unsafe_allow_html=True)
+            generation_progress("tailor_job")
+        elif st.session_state.tailored_result:
+            st.markdown("<h3 class='subsection-header'>맞춤화된 이력서 결과</h3>", unsafe_allow_html=True)
+            result = st.session_state.tailored_result
+            tailored_title = st.session_state.get("tailored_title") or selected_job_title
+            
+            st.markdown(cached_result_area_html(result), unsafe_allow_html=True)
+            
+            # 결과 다운로드
+            st.download_button(
+                label="결과 다운로드",
+                data=result,
+                file_name=f"맞춤화된_이력서_{tailored_title.replace(' ', '_')}.txt",
+                mime="text/plain"
+            )
+            
+            # 새 버전으로 저장
+            new_version_name = st.text_input("새 이력서 버전 이름", value=f"맞춤화된 이력서 - {tailored_title}")
+            if st.button("새 버전으로 저장"):
+                if new_version_name:
+                    st.session_state.resume_versions[new_version_name] = result
+                    st.success(f"'{new_version_name}' 이름으로 새 이력서가 저장되었습니다!")
+                else:
+                    st.error("이력서 버전 이름을 입력해주세요.")
+        
+        # 맞춤화 전후 적합도 비교
+        if st.session_state.tailored_result:
+            st.markdown("<h3 class='subsection-header'>맞춤화 전후 적합도</h3>", unsafe_allow_html=True)
+            compare_texts = {name: st.session_state.resume_versions[name] for name in selected_resumes}
+            compare_texts["__tailored__"] = st.session_state.tailored_result
+            compare_scores = cached_score_matrix(compare_texts, selected_posting)
+            tailored_score = compare_scores[("__tailored__", selected_job_id)]
+            best_before = max((compare_scores[(name, selected_job_id)]["score"] for name in selected_resumes), default=None)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric(
+                    "맞춤화된 이력서 적합도",
+                    f"{tailored_score['score']:.1f}",
+                    delta=f"{tailored_score['score'] - best_before:+.1f}" if best_before is not None else None,
+                    help="선택한 원본 이력서 중 가장 높은 점수와 비교한 값입니다."
+                )
+            with col2:
+                if tailored_score["missing_keywords"]:
+                    st.caption("아직 빠진 키워드: " + ", ".join(tailored_score["missing_keywords"]))
+                if tailored_score["missing_requirements"]:
+                    st.caption("보완이 필요한 요구사항: " + " / ".join(tailored_score["missing_requirements"]))
 # 섹션별 피드백 및 수정 UI 코드 추가
 if 'tailored_result' in st.session_state and st.session_state.tailored_result:
     st.markdown("<h3 class='subsection-header'>섹션별 피드백 및 수정</h3>", unsafe_allow_html=True)
@@ -631,20 +1471,35 @@ if 'tailored_result' in st.session_state and st.session_state.tailored_result:
                 st.session_state.resume_sections = split_resume_sections(st.session_state.tailored_result)
     
     if 'resume_sections' in st.session_state and st.session_state.resume_sections:
+        # 섹션 수정과 재구성 호출의 채용 공고 접두부 (결과를 만든 공고 기준, 단계마다 필요한 분석 결과 필드만 포함,
+        # 같은 단계의 호출은 프롬프트 캐시 재사용). 공고가 지워졌으면 공고 없이 섹션만 보고 수정합니다.
+        tailored_job_id = st.session_state.tailored_job_id
+        if tailored_job_id and tailored_job_id not in st.session_state.job_postings:
+            st.caption("⚠️ 이 결과를 만든 채용 공고가 삭제되어 공고 내용 없이 수정합니다.")
+        
+        def tailored_job_context(fields):
+            """버튼을 눌렀을 때만 결과를 만든 공고의 접두부를 만듦 (공고가 없으면 빈 문자열)"""
+            job = st.session_state.job_postings.get(tailored_job_id) if tailored_job_id else None
+            if job is None:
+                return ""
+            return build_job_context(
+                job['title'], job['content'], st.session_state.job_analyses.get(tailored_job_id), fields=fields
+            )
+        
         # 전문 요약 섹션 수정
         with st.expander("전문 요약 수정", expanded=False):
             summary = st.session_state.resume_sections.get("professional_summary", "")
             st.text_area("현재 전문 요약", value=summary, height=100, disabled=True)
             summary_feedback = st.text_area("수정 요청 사항", 
-                placeholder="예: 리더십 역량을 더 강조해주세요. AI 관련 경험을 추가해주세요.")
+                placeholder="예: 리더십 역량을 더 강조해주세요. AI 관련 경험을 추가해주세요.",
+                key="summary_feedback")
             if st.button("전문 요약 업데이트"):
                 with st.spinner("전문 요약을 수정하는 중..."):
                     updated_summary = update_resume_section(
                         "전문 요약", 
                         summary,
                         summary_feedback,
-                        st.session_state.job_postings[selected_job_id]['content'],
-                        st.session_state.job_analyses.get(selected_job_id, "")
+                        tailored_job_context(SECTION_UPDATE_FIELDS)
                     )
                     if updated_summary:
                         st.session_state.resume_sections["professional_summary"] = updated_summary
@@ -666,8 +1521,7 @@ if 'tailored_result' in st.session_state and st.session_state.tailored_result:
                             "직무 경험", 
                             exp.get('content', ""),
                             exp_feedback,
-                            st.session_state.job_postings[selected_job_id]['content'],
-                            st.session_state.job_analyses.get(selected_job_id, "")
+                            tailored_job_context(SECTION_UPDATE_FIELDS)
                         )
                         if updated_exp:
                             st.session_state.resume_sections["work_experience"][i]["content"] = updated_exp
@@ -675,24 +1529,65 @@ if 'tailored_result' in st.session_state and st.session_state.tailored_result:
                             st.text_area(f"수정된 내용", value=updated_exp, height=150)
                 st.divider()
         
+        # 모든 피드백 한 번에 적용
+        if st.button("입력한 모든 피드백 적용", use_container_width=True):
+            section_updates = []
+            if st.session_state.get("summary_feedback", "").strip():
+                section_updates.append((
+                    "professional_summary", "전문 요약",
+                    st.session_state.resume_sections.get("professional_summary", ""),
+                    st.session_state.summary_feedback
+                ))
+            for i, exp in enumerate(st.session_state.resume_sections.get("work_experience", [])):
+                if st.session_state.get(f"exp_feedback_{i}", "").strip():
+                    section_updates.append((i, "직무 경험", exp.get('content', ""), st.session_state[f"exp_feedback_{i}"]))
+            
+            if not section_updates:
+                st.warning("입력된 수정 요청 사항이 없습니다.")
+            else:
+                with st.spinner(f"{len(section_updates)}개 섹션을 동시에 수정하는 중..."):
+                    try:
+                        updated, errors = update_resume_sections_parallel(
+                            section_updates,
+                            tailored_job_context(SECTION_UPDATE_FIELDS)
+                        )
+                        # 결과를 한 번에 반영
+                        for key, content in updated.items():
+                            if key == "professional_summary":
+                                st.session_state.resume_sections["professional_summary"] = content
+                            else:
+                                st.session_state.resume_sections["work_experience"][key]["content"] = content
+                        if updated:
+                            st.success(f"{len(updated)}개 섹션이 업데이트되었습니다!")
+                        for key, error in errors.items():
+                            label = "전문 요약" if key == "professional_summary" else f"직무 경험 #{key + 1}"
+                            st.error(f"{label} 수정 중 오류 발생: {error}")
+                    except Exception as e:
+                        st.error(f"섹션 수정 중 오류 발생: {str(e)}")
+        
         # 최종 이력서 재구성 버튼
         if st.button("업데이트된 섹션으로 이력서 재구성", use_container_width=True):
-            with st.spinner("이력서를 재구성하는 중..."):
-                # 수정된 섹션들을 합쳐 새 이력서 생성
-                import json
-                reconstructed_resume = call_anthropic_api(
-                    prompt=f"""
-                    다음은 이력서의 각 섹션입니다. 이 섹션들을 자연스럽게 통합하여 완성된 이력서를 만들어주세요.
-    
-                    {json.dumps(st.session_state.resume_sections, indent=2, ensure_ascii=False)}
-    
-                    원래 이력서의 형식과 구조를 최대한 유지하면서, 수정된 내용을 반영해주세요.
-                    """,
-                    model=st.session_state.selected_model,
-                    temperature=0.2
-                )    
-
-                st.session_state.tailored_result = reconstructed_resume
-                st.success("이력서가 성공적으로 재구성되었습니다!")
-                st.markdown("<h3 class='subsection-header'>최종 이력서</h3>", unsafe_allow_html=True)
-                st.markdown("<div class='result-area'>" + reconstructed_resume.replace('\n', '<br>') + "</div>", unsafe_allow_html=True)
+            if not st.session_state.api_key:
+                st.error("API 키가 설정되지 않았습니다.")
+            else:
+                # 수정된 섹션들을 합쳐 새 이력서 생성 (백그라운드 작업)
+                resume_sections = json.loads(json.dumps(st.session_state.resume_sections))
+                reconstruction_job_context = tailored_job_context(RECONSTRUCTION_FIELDS)
+                model = st.session_state.selected_model
+                api_key = st.session_state.api_key
+                use_cache = st.session_state.use_response_cache
+                submit_generation(
+                    "reconstruct_job", "이력서 재구성",
+                    lambda on_delta: run_reconstruction(
+                        resume_sections, reconstruction_job_context, model,
+                        api_key=api_key, use_cache=use_cache, on_delta=on_delta
+                    )
+                )
+        
+        if st.session_state.reconstruct_job:
+            st.markdown("<h3 class='subsection-header'>최종 이력서</h3>", unsafe_allow_html=True)
+            generation_progress("reconstruct_job")
+        elif st.session_state.get("reconstructed"):
+            st.markdown("<h3 class='subsection-header'>최종 이력서</h3>", unsafe_allow_html=True)
+            st.markdown(cached_result_area_html(st.session_state.tailored_result), unsafe_allow_html=True)
+            st.success("이력서가 성공적으로 재구성되었습니다!")
@@ -0,0 +1,217 @@
+# bench_app_sessions.py - 여러 사용자가 동시에 앱을 사용할 때의 스크립트 재실행 시간, 세션당 메모리, CPU 사용량 측정
+#
+# 사용법:
+#   python bench/bench_app_sessions.py --users 8 --latency-ms 300 --tokens-per-sec 400
+#
+# 사용자마다 streamlit.testing의 AppTest 세션 하나를 스레드에서 실행하며, 각 사용자는 자기 작업 공간에서
+# 이력서 2개와 채용 공고 2개를 추가 → 공고 분석 → 맞춤화 → 결과 저장 → 섹션 분리 → 피드백 적용 → 재구성을 진행합니다.
+# 모의 API 서버는 별도 프로세스로 실행하므로 CPU 사용량에는 앱 쪽(스크립트 실행과 작업 스레드)만 포함됩니다.
+# 재실행 시간은 AppTest.run() 한 번의 소요 시간으로, 스크립트 실행과 결과 수집 시간을 함께 잽니다.
+# AppTest는 실행마다 프로세스 전역 Runtime을 바꿔 끼우므로 세션들의 스크립트 실행은 한 번에 하나씩 번갈아
+# 진행되고(실제 서버에서는 스레드로 겹쳐 실행됨), 백그라운드 생성 작업과 API 호출은 동시에 진행됩니다.
+import argparse
+import glob
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_anthropic_server import add_mock_arguments, mock_options
+from telemetry import percentile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "app.py")
+CORPUS_DIR = os.path.join(BENCH_DIR, "resume_corpus")
+
+# AppTest 실행은 동시에 하나만 가능
+RUN_LOCK = threading.Lock()
+
+
+def rss_bytes():
+    """현재 프로세스의 상주 메모리 크기 (리눅스 /proc 기준, 없으면 None)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_process(args, port):
+    """모의 API 서버를 별도 프로세스로 시작하고 응답할 때까지 기다림"""
+    command = [sys.executable, os.path.join(BENCH_DIR, "mock_anthropic_server.py"), "--port", str(port)]
+    for name, value in mock_options(args).items():
+        if value:
+            command += ["--" + name.replace("_", "-"), str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise Exception("모의 서버를 시작하지 못했습니다.")
+
+
+class SimulatedUser:
+    """AppTest 세션 하나로 사용자 한 명의 작업 흐름을 실행하며 재실행마다 소요 시간을 기록"""
+
+    def __init__(self, index, resumes, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.resumes = resumes
+        self.timeout = timeout
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.reruns = []  # (동작, 소요 시간)
+        self.errors = []
+
+    def run(self, action):
+        with RUN_LOCK:
+            started = time.perf_counter()
+            self.at.run()
+            self.reruns.append((action, time.perf_counter() - started))
+        for exception in self.at.exception:
+            self.errors.append(f"{action}: {exception.value}")
+
+    def widget(self, kind, label):
+        return next(w for w in getattr(self.at, kind) if w.label == label)
+
+    def click(self, label, action):
+        self.widget("button", label).click()
+        self.run(action)
+
+    def wait_for(self, slot, action):
+        """백그라운드 작업이 끝날 때까지 앱이 화면을 갱신하듯 주기적으로 재실행"""
+        give_up_at = time.monotonic() + self.timeout
+        while self.at.session_state[slot]:
+            if time.monotonic() > give_up_at:
+                self.errors.append(f"{action}: 작업이 {self.timeout}초 안에 끝나지 않았습니다.")
+                return
+            time.sleep(0.2)
+            self.run(action)
+
+    def scenario(self):
+        # 세션마다 개인 작업 공간이 새로 만들어짐
+        self.run("start")
+        self.at.session_state.api_key = "mock-key"
+        self.run("start")
+
+        for name, content in self.resumes.items():
+            self.widget("text_input", "이력서 버전 이름").input(name)
+            self.widget("text_area", "이력서 내용").input(content)
+            self.click("이력서 저장", "add_resume")
+
+        for i in range(2):
+            self.widget("text_input", "채용 공고 제목").input(f"백엔드 개발자 {self.index}-{i}")
+            self.widget("text_area", "채용 공고 내용").input(
+                f"[사용자 {self.index} 공고 {i}]\nPython, Kafka, AWS 기반 결제 플랫폼 백엔드 개발자를 모집합니다.\n" * 20
+            )
+            self.click("채용 공고 저장", "add_posting")
+
+        self.click("미분석 공고 모두 분석", "analyze")
+
+        self.widget("multiselect", "이력서 버전").select(next(iter(self.resumes)))
+        self.run("select_resume")
+        self.click("이력서 맞춤화 시작", "tailor")
+        self.wait_for("tailor_job", "poll")
+        self.click("새 버전으로 저장", "save_result")
+
+        self.click("이력서 섹션 분리하기", "split")
+        for text_area in self.at.text_area:
+            if text_area.key == "summary_feedback" or (text_area.key or "").startswith("exp_feedback_"):
+                text_area.input("성과를 수치로 더 강조해주세요.")
+        self.run("feedback")
+        self.click("입력한 모든 피드백 적용", "apply_feedback")
+        self.click("업데이트된 섹션으로 이력서 재구성", "reconstruct")
+        self.wait_for("reconstruct_job", "poll")
+
+    def __call__(self):
+        try:
+            self.scenario()
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit 앱 다중 세션 부하 측정")
+    parser.add_argument("--users", type=int, default=4, help="동시 사용자 수")
+    parser.add_argument("--timeout", type=float, default=120, help="재실행 하나와 백그라운드 작업의 최대 대기 시간 (초)")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="resume-tailor-load-")
+    port = free_port()
+    mock = start_mock_process(args, port)
+    os.environ.update({
+        "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{port}",
+        "RESUME_TAILOR_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "RESUME_TAILOR_DATA_DIR": os.path.join(work_dir, "data"),
+        "TELEMETRY_LOG": ""
+    })
+
+    samples = {}
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt")))[:2]:
+        with open(path, encoding="utf-8") as f:
+            samples[os.path.splitext(os.path.basename(path))[0]] = f.read()
+
+    try:
+        # 첫 세션 실행으로 모듈 import와 공유 자원 생성 비용을 측정에서 제외
+        from streamlit.testing.v1 import AppTest
+        AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+
+        rss_before = rss_bytes()
+        cpu_before = os.times()
+        started = time.perf_counter()
+
+        users = [SimulatedUser(i, samples, args.timeout) for i in range(args.users)]
+        threads = [threading.Thread(target=user, name=f"user-{user.index}") for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        wall = time.perf_counter() - started
+        cpu_after = os.times()
+        rss_after = rss_bytes()
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    cpu = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    reruns = [(action, elapsed) for user in users for action, elapsed in user.reruns]
+    print(f"사용자 {args.users}명, {wall:.2f}초, 재실행 {len(reruns)}회 ({len(reruns) / wall:.1f}회/초)")
+    print(f"CPU {cpu:.2f}초 (평균 사용률 {cpu / wall * 100:.0f}%, 재실행당 {cpu / max(1, len(reruns)) * 1000:.1f} ms)")
+    if rss_before is not None and rss_after is not None:
+        print(f"메모리 {rss_before / 2**20:.1f} → {rss_after / 2**20:.1f} MiB "
+              f"(세션당 약 {(rss_after - rss_before) / args.users / 2**20:.2f} MiB)")
+
+    print(f"\n{'동작':<16}{'횟수':>6}{'p50(ms)':>9}{'p99(ms)':>9}")
+    actions = list(dict.fromkeys(action for action, _ in reruns)) + ["all"]
+    for action in actions:
+        values = sorted(elapsed for name, elapsed in reruns if action in ("all", name))
+        print(f"{action:<16}{len(values):>6}{percentile(values, 0.5) * 1000:>9.0f}{percentile(values, 0.99) * 1000:>9.0f}")
+
+    errors = [error for user in users for error in user.errors]
+    if errors:
+        print(f"\n오류 {len(errors)}개")
+        for error in errors[:5]:
+            print(f"  {error[:200]}")
+
+
+if __name__ == "__main__":
+    main()
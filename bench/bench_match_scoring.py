@@ -0,0 +1,59 @@
+# bench_match_scoring.py - 로컬 적합도 점수 엔진의 처리 속도 측정
+#
+# 사용법:
+#   python bench/bench_match_scoring.py --resumes 100 --postings 10
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_scoring import score_matrix
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_corpus")
+
+SAMPLE_ANALYSIS = """1. 직무 요약: 결제 플랫폼 백엔드 개발
+2. 핵심 요구사항:
+- Python 또는 Go 기반 백엔드 개발 경험
+- Kafka 등 메시지 큐 운영 경험
+- AWS 클라우드 인프라 운영 경험
+3. 우대사항:
+- Kubernetes 운영 경험
+4. 주요 키워드: Python, Go, Kafka, AWS, Kubernetes, 마이크로서비스, 결제 시스템, 데이터 분석, SQL, Terraform
+5. 회사 가치관/문화: 자율과 책임
+6. 이력서 최적화 전략: 트래픽 규모와 성과를 수치로 표현
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--postings", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    samples = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            samples.append(f.read())
+
+    # 코퍼스 문단을 섞어 다양한 이력서와 공고를 만듦
+    paragraphs = [p for text in samples for p in text.split("\n\n") if p.strip()]
+    resumes = {f"resume_{i}": "\n\n".join(random.sample(paragraphs, 8)) for i in range(args.resumes)}
+    postings = {
+        f"job_{i}": {"content": "\n\n".join(random.sample(paragraphs, 3)), "analysis": SAMPLE_ANALYSIS}
+        for i in range(args.postings)
+    }
+
+    started = time.perf_counter()
+    results = score_matrix(resumes, postings)
+    elapsed = time.perf_counter() - started
+    print(f"{len(results)}개 조합 점수 계산: {elapsed * 1000:.1f} ms ({elapsed / len(results) * 1e6:.1f} µs/조합)")
+
+
+if __name__ == "__main__":
+    main()
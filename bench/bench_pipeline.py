@@ -0,0 +1,176 @@
+# bench_pipeline.py - 모의 API 서버를 상대로 맞춤화 파이프라인 전체를 동시 실행하여 처리량과 지연 시간 측정
+#
+# 사용법:
+#   python bench/bench_pipeline.py --concurrency 1,4,16 --pipelines 32 --latency-ms 800 --latency-sigma 0.4 \
+#       --tokens-per-sec 200 --output-tokens 400 --error-429 0.03 --error-529 0.01
+#
+# 파이프라인 하나는 채용 공고 분석 → 맞춤화 → 섹션 분리 → 섹션 수정 → 재구성 순서로 실행되며,
+# 동시 실행 수마다 새 모의 서버와 새 TailorCore(응답 캐시 없음)를 사용합니다.
+# --base-url을 지정하면 모의 서버 대신 그 주소(실제 API 또는 외부 모의 서버)로 보냅니다.
+# --model은 사용자가 선택한 모델이며, 단계별 모델은 --model-policy(형식은 MODEL_POLICY 환경 변수와 같음)를 따릅니다.
+# --by-section은 맞춤화를 섹션별 동시 호출로 실행하며, 출력 길이가 입력 길이를 따르도록 --output-ratio와 함께 씁니다:
+#   python bench/bench_pipeline.py --concurrency 1,4 --pipelines 8 --tokens-per-sec 60 --output-ratio 1.0 --by-section
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import AnthropicClient
+from mock_anthropic_server import add_mock_arguments, mock_options, start_server
+from model_router import ModelRouter, parse_policy
+from rate_limiter import RateLimiter
+from tailor_core import RECONSTRUCTION_FIELDS, SECTION_UPDATE_FIELDS, TailorCore, build_job_context
+from telemetry import Telemetry, percentile
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_corpus")
+
+STAGES = ("analysis", "tailoring", "split", "section_update", "reconstruction")
+
+CUSTOM_SETTINGS = {"emphasis_skills": "Python, Kafka", "deemphasize_skills": "", "tone": "results_driven", "length": 2}
+
+
+def make_inputs(count, seed):
+    """코퍼스 문단을 섞어 서로 다른 채용 공고 count개와 이력서 두 개를 만듦"""
+    rng = random.Random(seed)
+    samples = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            samples.append(f.read())
+    paragraphs = [p for text in samples for p in text.split("\n\n") if p.strip()]
+    resumes = {"기본": samples[0], "경력 중심": samples[1 % len(samples)]}
+    postings = [
+        (f"벤치마크 공고 {i}", f"[공고 {i}]\n\n" + "\n\n".join(rng.sample(paragraphs, 3)))
+        for i in range(count)
+    ]
+    return resumes, postings
+
+
+def run_pipeline(core, title, content, resumes, model, api_key, stream, by_section=False):
+    """파이프라인 하나를 실행하고 {단계: 소요 시간(초)}를 반환"""
+    timings = {}
+    on_delta = (lambda delta: None) if stream else None
+
+    def timed(stage, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[stage] = time.perf_counter() - started
+        return result
+
+    analysis = timed("analysis", lambda: core.analyze_job(content, model, api_key, use_cache=False))
+    tailor = core.tailor_by_section if by_section else core.tailor
+    tailored = timed("tailoring", lambda: tailor(
+        title, content, analysis, resumes, CUSTOM_SETTINGS, model, api_key, use_cache=False, on_delta=on_delta
+    ))
+    sections = timed("split", lambda: core.split_sections(tailored, model, api_key, min_confidence=1.1))
+    summary = sections.get("professional_summary") or tailored[:500]
+    sections["professional_summary"] = timed("section_update", lambda: core.update_section(
+        "professional_summary", summary, "성과를 수치로 더 강조해주세요.",
+        build_job_context(title, content, analysis, fields=SECTION_UPDATE_FIELDS), model, api_key, use_cache=False
+    ))
+    timed("reconstruction", lambda: core.reconstruct(
+        sections, build_job_context(title, content, analysis, fields=RECONSTRUCTION_FIELDS), model, api_key,
+        use_cache=False, on_delta=on_delta
+    ))
+    return timings
+
+
+def run_level(concurrency, args, resumes, postings):
+    """동시 실행 수 하나에 대해 모든 파이프라인을 실행하고 결과 요약을 반환"""
+    server, state = None, None
+    base_url = args.base_url
+    if not base_url:
+        server, state = start_server(**mock_options(args))
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    limiter = RateLimiter(initial_concurrency=concurrency, max_concurrency=concurrency)
+    client = AnthropicClient(base_url=base_url, pool_size=max(32, concurrency), backoff_base=args.backoff_base,
+                             rate_limiter=limiter)
+    core = TailorCore(client, telemetry=Telemetry(), max_concurrency=concurrency,
+                      router=ModelRouter(parse_policy(args.model_policy)))
+
+    timings, errors = [], []
+
+    def one(posting):
+        started = time.perf_counter()
+        try:
+            stages = run_pipeline(
+                core, posting[0], posting[1], resumes, args.model, args.api_key, args.stream, args.by_section
+            )
+        except Exception as e:
+            errors.append(str(e))
+            return
+        stages["total"] = time.perf_counter() - started
+        timings.append(stages)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, postings))
+    wall = time.perf_counter() - started
+
+    client.close()
+    if server:
+        server.shutdown()
+        server.server_close()
+
+    records = core.telemetry.records()
+    return {
+        "concurrency": concurrency,
+        "wall": wall,
+        "completed": len(timings),
+        "errors": errors,
+        "timings": timings,
+        "api_calls": sum(1 for r in records if r["source"] == "api"),
+        "coalesced": core.single_flight.coalesced,
+        "retries": sum(r["retries"] for r in records),
+        "models": sorted({r["model"] for r in records if r["source"] == "api"}),
+        "escalations": core.router.stats()["escalations"],
+        "mock_status": dict(state.status_counts) if state else {}
+    }
+
+
+def format_ms(value):
+    return f"{value * 1000:8.0f}" if value is not None else "       -"
+
+
+def report(result):
+    completed = result["completed"]
+    print(f"\n## 동시 실행 {result['concurrency']}: 파이프라인 {completed}개 완료 / 실패 {len(result['errors'])}개, "
+          f"{result['wall']:.2f}초, 처리량 {completed / result['wall']:.2f} 파이프라인/초")
+    print(f"   API 호출 {result['api_calls']}회, 합쳐진 동일 요청 {result['coalesced']}회, 재시도 {result['retries']}회, 모의 서버 응답 {result['mock_status']}")
+    print(f"   호출 모델 {', '.join(result['models'])}, 상위 모델로 다시 시도 {result['escalations'] or '없음'}")
+    print(f"   {'단계':<16}{'p50(ms)':>8}{'p99(ms)':>9}")
+    for stage in STAGES + ("total",):
+        values = sorted(t[stage] for t in result["timings"] if stage in t)
+        print(f"   {stage:<16}{format_ms(percentile(values, 0.5))} {format_ms(percentile(values, 0.99))}")
+    for error in result["errors"][:3]:
+        print(f"   오류: {error[:200]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="맞춤화 파이프라인 부하 측정")
+    parser.add_argument("--concurrency", default="1,4,16", help="쉼표로 구분한 동시 실행 수 목록")
+    parser.add_argument("--pipelines", type=int, default=16, help="동시 실행 수마다 실행할 파이프라인 수")
+    parser.add_argument("--model", default="claude-3-haiku-20240307")
+    parser.add_argument("--api-key", default=os.environ.get("ANTHROPIC_API_KEY", "mock-key"))
+    parser.add_argument("--base-url", default=None, help="지정하면 내장 모의 서버 대신 사용")
+    parser.add_argument("--model-policy", default=None, help="단계별 모델 정책 (예: split=fast:30,tailoring=selected)")
+    parser.add_argument("--stream", action="store_true", help="맞춤화와 재구성을 스트리밍 호출로 실행")
+    parser.add_argument("--by-section", action="store_true", help="맞춤화를 섹션별 동시 호출로 실행 (tailor_by_section)")
+    parser.add_argument("--backoff-base", type=float, default=0.2, help="재시도 백오프 기본 대기 시간 (초)")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    for level in levels:
+        # 공유 분석 결과나 프롬프트 캐시가 단계 사이에 재사용되지 않도록 수준마다 다른 공고를 사용
+        resumes, postings = make_inputs(args.pipelines, seed=(args.seed or 0) * 1000 + level)
+        report(run_level(level, args, resumes, postings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# bench_resume_parser.py - 로컬 이력서 섹션 파서의 속도와 기준 분리 결과와의 일치도 측정
+#
+# 기준 결과는 두 가지입니다.
+#   *.expected.json  사람이 직접 표시한 분리 결과 (LLM 응답이 아님, 코퍼스와 함께 관리)
+#   *.llm.json       --record로 LLM 분리 결과를 기록한 것 (LLM과의 일치도 확인용, 저장소에는 없음)
+#
+# 사용법:
+#   python bench/bench_resume_parser.py                   # 사람이 표시한 기준 결과와 비교
+#   python bench/bench_resume_parser.py --record          # LLM 분리 결과를 *.llm.json으로 기록 (ANTHROPIC_API_KEY 필요)
+#   python bench/bench_resume_parser.py --reference llm   # 기록한 LLM 분리 결과와 비교
+#   python bench/bench_resume_parser.py --calibrate       # 신뢰도 기준값별 일치율로 DEFAULT_MIN_CONFIDENCE 추천
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_parser import DEFAULT_MIN_CONFIDENCE, SPLIT_PROMPT_TEMPLATE, parse_resume_sections, parse_sections_json
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_corpus")
+
+# 기준 결과 종류 → 파일 확장자
+REFERENCE_SUFFIXES = {"expected": ".expected.json", "llm": ".llm.json"}
+
+
+def _norm(text):
+    return re.sub(r"[\s().,]+", "", (text or "")).lower()
+
+
+def _same(a, b):
+    a, b = _norm(a), _norm(b)
+    return a == b or (a and b and (a in b or b in a))
+
+
+def compare(parsed, expected):
+    """섹션별 일치 여부를 dict로 반환"""
+    checks = {}
+    checks["summary"] = bool(parsed["professional_summary"]) == bool(expected.get("professional_summary"))
+
+    exp_jobs, got_jobs = expected.get("work_experience", []), parsed["work_experience"]
+    checks["experience_count"] = len(exp_jobs) == len(got_jobs)
+    checks["experience_fields"] = checks["experience_count"] and all(
+        _same(g["title"], e.get("title")) and _same(g["company"], e.get("company"))
+        for g, e in zip(got_jobs, exp_jobs)
+    )
+
+    exp_edu, got_edu = expected.get("education", []), parsed["education"]
+    checks["education"] = len(exp_edu) == len(got_edu) and all(
+        _same(g["institution"], e.get("institution")) for g, e in zip(got_edu, exp_edu)
+    )
+
+    exp_skills = {_norm(s) for s in expected.get("skills", [])}
+    got_skills = {_norm(s) for s in parsed["skills"]}
+    union = exp_skills | got_skills
+    checks["skills"] = not union or len(exp_skills & got_skills) / len(union) >= 0.8
+
+    checks["projects"] = len(expected.get("projects", [])) == len(parsed["projects"])
+    checks["additional"] = len(expected.get("additional_sections", [])) == len(parsed["additional_sections"])
+    return checks
+
+
+def calibrate(results, target):
+    """신뢰도 기준값별 로컬 처리 비율과 일치율을 출력하고 추천 기준값을 반환
+
+    results는 (신뢰도, 일치 여부) 목록. 일치율이 target 이상인 가장 낮은 관측 신뢰도를 고르고,
+    그 아래 관측값과의 중간(0.05 단위)을 기준값으로 추천
+    """
+    levels = sorted({round(c, 2) for c, _ in results}, reverse=True)
+    recommended = None
+    print(f"{'기준값':>6s}  {'로컬 처리':>9s}  {'일치율':>6s}")
+    for i, level in enumerate(levels):
+        accepted = [ok for c, ok in results if c >= level - 1e-9]
+        agreement = sum(accepted) / len(accepted)
+        print(f"{level:6.2f}  {len(accepted):4d}/{len(results):<4d}  {agreement:6.0%}")
+        if agreement >= target:
+            lower = levels[i + 1] if i + 1 < len(levels) else 0.0
+            recommended = round(round((level + lower) / 2 / 0.05) * 0.05, 2)
+            recommended = min(max(recommended, lower + 0.05), level)
+    return recommended
+
+
+def record(paths, model):
+    from llm_client import AnthropicClient
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        sys.exit("ANTHROPIC_API_KEY 환경 변수가 필요합니다.")
+    client = AnthropicClient(base_url=os.environ.get("ANTHROPIC_BASE_URL", "https://api.anthropic.com"))
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            resume_text = f.read()
+        response = client.create_message(api_key, {
+            "model": model,
+            "max_tokens": 4000,
+            "temperature": 0.0,
+            "messages": [{"role": "user", "content": SPLIT_PROMPT_TEMPLATE.format(resume_text=resume_text)}]
+        })
+        sections = parse_sections_json(response["content"][0]["text"])
+        # 사람이 표시한 기준 결과(*.expected.json)는 덮어쓰지 않음
+        with open(path[:-4] + REFERENCE_SUFFIXES["llm"], "w", encoding="utf-8") as f:
+            json.dump(sections, f, ensure_ascii=False, indent=2)
+        print(f"기록됨: {os.path.basename(path)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument("--repeat", type=int, default=200, help="속도 측정 반복 횟수")
+    parser.add_argument("--record", action="store_true", help="LLM 분리 결과를 *.llm.json으로 기록")
+    parser.add_argument("--reference", choices=sorted(REFERENCE_SUFFIXES), default="expected",
+                        help="비교할 기준 결과 (expected: 사람이 표시한 결과, llm: --record로 기록한 LLM 결과)")
+    parser.add_argument("--model", default="claude-3-haiku-20240307")
+    parser.add_argument("--calibrate", action="store_true", help="신뢰도 기준값별 일치율을 출력하고 기준값 추천")
+    parser.add_argument("--target-agreement", type=float, default=0.85, help="--calibrate에서 요구하는 최소 일치율")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.txt")))
+    if args.record:
+        record(paths, args.model)
+        return
+
+    results = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            resume_text = f.read()
+        reference_path = path[:-4] + REFERENCE_SUFFIXES[args.reference]
+        if not os.path.exists(reference_path):
+            sys.exit(f"기준 결과가 없습니다: {reference_path} (LLM 결과는 --record로 먼저 기록하세요)")
+        with open(reference_path, encoding="utf-8") as f:
+            expected = json.load(f)
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            parsed, confidence = parse_resume_sections(resume_text)
+        elapsed_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        checks = compare(parsed, expected)
+        ok = all(checks.values())
+        results.append((confidence, ok))
+        detail = "" if ok else "  불일치: " + ", ".join(k for k, v in checks.items() if not v)
+        verdict = "일치" if ok else "불일치"
+        if confidence < args.min_confidence:
+            verdict = f"→ LLM 분리로 대체 (로컬 결과 {verdict})"
+            detail = ""
+        print(f"{os.path.basename(path):28s} 신뢰도 {confidence:.2f}  {elapsed_ms:6.2f} ms  {verdict}{detail}")
+
+    accepted = [ok for confidence, ok in results if confidence >= args.min_confidence]
+    failures = len(accepted) - sum(accepted)
+    print(f"\n기준값 {args.min_confidence:.2f}: 로컬 처리 {len(accepted)}/{len(results)}건, "
+          f"그중 {args.reference} 기준과 일치 {sum(accepted)}건"
+          + (f" ({sum(accepted) / len(accepted):.0%})" if accepted else ""))
+
+    if args.calibrate:
+        print()
+        recommended = calibrate(results, args.target_agreement)
+        if recommended is None:
+            print(f"\n일치율 {args.target_agreement:.0%} 이상인 기준값이 없습니다.")
+        else:
+            print(f"\n추천 기준값: {recommended:.2f} (일치율 {args.target_agreement:.0%} 이상, 현재 {DEFAULT_MIN_CONFIDENCE:.2f})")
+        return
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
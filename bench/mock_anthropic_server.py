@@ -0,0 +1,340 @@
+# mock_anthropic_server.py - 네트워크 없이 앱을 시험하기 위한 로컬 Messages API 모의 서버
+#
+# 사용법:
+#   python bench/mock_anthropic_server.py --port 8787
+#   ANTHROPIC_BASE_URL=http://127.0.0.1:8787 streamlit run app.py
+#
+# 요청의 cache_control 표시를 읽어 프롬프트 캐시를 흉내 내고, 응답 usage에
+# cache_creation_input_tokens / cache_read_input_tokens를 돌려줍니다.
+# 응답이 요청의 max_tokens를 넘으면 잘라서 stop_reason "max_tokens"로 보내고, 마지막 메시지가
+# assistant이면(이어 쓰기) 같은 응답의 그 뒤 부분을 보냅니다.
+#
+# 부하 시험용 옵션:
+#   --latency-ms 800 --latency-sigma 0.5   첫 응답까지의 지연 (로그정규 분포, 중앙값 800ms)
+#   --tokens-per-sec 60                    출력 토큰 생성 속도 (스트리밍은 조각 단위로 나눠 보냄)
+#   --output-tokens 600                    응답 길이를 이 토큰 수까지 채움
+#   --output-ratio 1.0                     응답 길이를 프롬프트에서 다시 쓸 내용 길이의 이 배수까지 채움 (--output-tokens 대신)
+#   --error-429 0.05 --error-529 0.02      요청 제한/과부하 오류를 주어진 확률로 반환
+#   --rpm 50                               분당 요청 한도 (anthropic-ratelimit-* 헤더를 보내고 넘으면 429)
+#   --invalid-json 0.2                     JSON 응답(공고 분석, 섹션 분리)을 주어진 확률로 잘린 JSON으로 반환
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_assembly import estimate_tokens
+
+
+def _blocks(content):
+    """system 또는 메시지 content를 텍스트 블록 목록으로 통일"""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return list(content or [])
+
+
+class MockState:
+    """서버 전체가 공유하는 프롬프트 캐시와 요청 기록, 지연/오류 주입 설정"""
+
+    def __init__(self, latency_ms=0, latency_sigma=0.0, tokens_per_sec=0, output_tokens=None,
+                 error_429=0.0, error_529=0.0, retry_after=1, rpm=None, invalid_json=0.0, output_ratio=0.0, seed=None):
+        self.lock = threading.Lock()
+        self.prompt_cache = set()
+        self.requests = []
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self.output_ratio = output_ratio
+        self.error_429 = error_429
+        self.error_529 = error_529
+        self.retry_after = retry_after
+        self.rpm = rpm
+        self.invalid_json = invalid_json
+        self.random = random.Random(seed)
+        self.request_times = deque()
+        self.status_counts = {}
+
+    def first_token_delay(self):
+        """첫 응답까지의 지연(초), latency_sigma가 있으면 중앙값이 latency_ms인 로그정규 분포"""
+        if not self.latency_ms:
+            return 0.0
+        with self.lock:
+            factor = self.random.lognormvariate(0, self.latency_sigma) if self.latency_sigma else 1.0
+        return self.latency_ms * factor / 1000.0
+
+    def admit(self):
+        """요청을 받을지 결정하여 (상태 코드, 오류 종류, 응답 헤더)를 반환"""
+        now = time.monotonic()
+        headers = {}
+        with self.lock:
+            status, error_type = 200, None
+            if self.rpm:
+                while self.request_times and now - self.request_times[0] >= 60:
+                    self.request_times.popleft()
+                if len(self.request_times) >= self.rpm:
+                    status, error_type = 429, "rate_limit_error"
+                    reset_in = 60 - (now - self.request_times[0])
+                else:
+                    self.request_times.append(now)
+                    reset_in = 60 - (now - self.request_times[0])
+                reset_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=reset_in)
+                headers.update({
+                    "anthropic-ratelimit-requests-limit": str(self.rpm),
+                    "anthropic-ratelimit-requests-remaining": str(self.rpm - len(self.request_times)),
+                    "anthropic-ratelimit-requests-reset": reset_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+                })
+                if status == 429:
+                    headers["retry-after"] = str(max(1, math.ceil(reset_in)))
+            if status == 200:
+                roll = self.random.random()
+                if roll < self.error_429:
+                    status, error_type = 429, "rate_limit_error"
+                    headers["retry-after"] = str(self.retry_after)
+                elif roll < self.error_429 + self.error_529:
+                    status, error_type = 529, "overloaded_error"
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        return status, error_type, headers
+
+    def pad(self, text, body):
+        """output_tokens가 지정되면 응답을 그 토큰 수까지 채움
+
+        output_ratio가 지정되면 JSON이 아닌 응답을 다시 쓸 내용(첫 사용자 메시지에서 첫 '## 제목:' 줄 뒤의
+        블록)의 토큰 수의 그 배수까지 채워, 맞춤화나 섹션 맞춤화의 출력 길이가 입력 내용의 길이를 따르게 합니다.
+        """
+        target = self.output_tokens
+        if not target and self.output_ratio and not text.startswith("{"):
+            prompt = "".join(block.get("text", "") for block in _blocks(body["messages"][0]["content"]))
+            blocks = re.split(r"\n\s*## [^\n]*:\s*\n", prompt)
+            content = blocks[1] if len(blocks) > 1 else prompt
+            target = int(estimate_tokens(content) * self.output_ratio)
+        if not target:
+            return text
+        filler = "\n- 모의 성과: 대규모 트래픽 환경에서 서비스 지연 시간을 개선했습니다."
+        missing = target - estimate_tokens(text)
+        if missing <= 0:
+            return text
+        return text + filler * math.ceil(missing / max(1, estimate_tokens(filler)))
+
+    def corrupt(self, text):
+        """invalid_json 확률로 JSON 응답을 중간에서 잘라 검증 실패를 흉내 냄"""
+        if not self.invalid_json or not text.startswith("{"):
+            return text
+        with self.lock:
+            roll = self.random.random()
+        return text[:len(text) // 2] if roll < self.invalid_json else text
+
+    def usage_for(self, body):
+        """cache_control 위치까지의 접두부를 기준으로 캐시 읽기/쓰기 토큰을 계산"""
+        blocks = _blocks(body.get("system"))
+        for message in body.get("messages", []):
+            blocks.extend(_blocks(message.get("content")))
+
+        prefix, total = body.get("model", ""), 0
+        breakpoints = []
+        for block in blocks:
+            text = block.get("text", "")
+            prefix += "\x00" + text
+            total += estimate_tokens(text)
+            if block.get("cache_control"):
+                breakpoints.append((hashlib.sha256(prefix.encode("utf-8")).hexdigest(), total))
+
+        read = creation = 0
+        with self.lock:
+            for key, tokens in breakpoints:
+                if key in self.prompt_cache:
+                    read = tokens
+                    creation = 0
+                else:
+                    creation = tokens - read
+                    self.prompt_cache.add(key)
+        return {
+            "input_tokens": total - read - creation,
+            "cache_creation_input_tokens": creation,
+            "cache_read_input_tokens": read
+        }
+
+
+def reply_text(body):
+    """요청 종류에 맞는 결정적인 모의 응답 텍스트"""
+    prompt = "".join(block.get("text", "") for block in _blocks(body["messages"][0]["content"]))
+    if '"required_skills"' in prompt:
+        # 채용 공고 분석: 공고에 나온 영문 대문자 단어(기술 이름)를 키워드로 사용
+        skills = list(dict.fromkeys(re.findall(r"\b[A-Z][A-Za-z0-9+#.]+", prompt)))[:12] or ["Python"]
+        return json.dumps({
+            "summary": "모의 직무 요약",
+            "required_skills": skills[:4], "preferred_skills": skills[4:6], "keywords": skills,
+            "culture": ["협업"], "strategy": ["모의 전략: 관련 성과를 수치로 제시"]
+        }, ensure_ascii=False)
+    if '"replacements"' in prompt:
+        # 섹션별 맞춤화의 일관성 검토: 고칠 곳 없음
+        return json.dumps({"replacements": []})
+    if "JSON 형식만" in prompt:
+        return json.dumps({
+            "professional_summary": "모의 전문 요약",
+            "work_experience": [{"title": "개발자", "company": "모의 회사", "content": "- 모의 성과"}],
+            "education": [], "skills": ["Python"], "projects": [], "additional_sections": []
+        }, ensure_ascii=False)
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    return f"모의 응답 {digest}\n- 입력 길이: {len(prompt)}자\n- 모델: {body.get('model')}"
+
+
+def continue_and_truncate(body, text):
+    """마지막 메시지가 assistant(이어 쓰기)이면 그 뒤부터 응답하고, max_tokens를 넘으면 잘라서 (텍스트, stop_reason) 반환"""
+    last = body["messages"][-1]
+    if last.get("role") == "assistant":
+        prefix = "".join(block.get("text", "") for block in _blocks(last.get("content")))
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    max_tokens = body.get("max_tokens")
+    if not max_tokens or estimate_tokens(text) <= max_tokens:
+        return text, "end_turn"
+    used = 0.0
+    for end, ch in enumerate(text):
+        used += 0.25 if ord(ch) < 128 else 1
+        if used > max_tokens:
+            return text[:end], "max_tokens"
+    return text, "end_turn"
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_event(self, event, payload):
+            data = f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/messages":
+                self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+            with state.lock:
+                state.requests.append(body)
+
+            status, error_type, headers = state.admit()
+            time.sleep(state.first_token_delay())
+            if status != 200:
+                self._send_json(status, {"type": "error", "error": {"type": error_type, "message": "모의 오류"}}, headers)
+                return
+
+            text, stop_reason = continue_and_truncate(body, state.pad(state.corrupt(reply_text(body)), body))
+            usage = state.usage_for(body)
+            usage["output_tokens"] = estimate_tokens(text)
+            # 출력 토큰 생성 속도에 맞춘 8자 조각당 대기 시간
+            chunk_delay = (estimate_tokens(text) / state.tokens_per_sec) / math.ceil(len(text) / 8) if state.tokens_per_sec else 0.0
+
+            if not body.get("stream"):
+                time.sleep(chunk_delay * math.ceil(len(text) / 8))
+                self._send_json(200, {
+                    "id": "msg_mock", "type": "message", "role": "assistant", "model": body.get("model"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": stop_reason, "stop_sequence": None, "usage": usage
+                }, headers)
+                return
+
+            self.send_response(200)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("content-type", "text/event-stream")
+            self.send_header("transfer-encoding", "chunked")
+            self.end_headers()
+            start_usage = dict(usage, output_tokens=1)
+            self._send_event("message_start", {"type": "message_start", "message": {
+                "id": "msg_mock", "type": "message", "role": "assistant", "model": body.get("model"),
+                "content": [], "stop_reason": None, "usage": start_usage
+            }})
+            self._send_event("content_block_start", {"type": "content_block_start", "index": 0,
+                                                     "content_block": {"type": "text", "text": ""}})
+            for i in range(0, len(text), 8):
+                if chunk_delay:
+                    time.sleep(chunk_delay)
+                self._send_event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                         "delta": {"type": "text_delta", "text": text[i:i + 8]}})
+            self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            self._send_event("message_delta", {"type": "message_delta",
+                                               "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                                               "usage": {"output_tokens": usage["output_tokens"]}})
+            self._send_event("message_stop", {"type": "message_stop"})
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """백그라운드 스레드에서 모의 서버를 시작하고 (서버, 상태)를 반환 (options는 MockState 설정)"""
+    state = MockState(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def add_mock_arguments(parser):
+    """지연/오류 주입 옵션을 명령줄 인자에 추가 (벤치마크 스크립트와 공유)"""
+    parser.add_argument("--latency-ms", type=float, default=0, help="첫 응답까지의 지연 중앙값 (ms)")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="지연의 로그정규 분포 sigma (0이면 고정)")
+    parser.add_argument("--tokens-per-sec", type=float, default=0, help="출력 토큰 생성 속도 (0이면 즉시)")
+    parser.add_argument("--output-tokens", type=int, default=None, help="응답을 채울 출력 토큰 수")
+    parser.add_argument("--error-429", type=float, default=0.0, help="429 응답 확률")
+    parser.add_argument("--error-529", type=float, default=0.0, help="529 응답 확률")
+    parser.add_argument("--retry-after", type=int, default=1, help="주입한 429 응답의 retry-after (초)")
+    parser.add_argument("--rpm", type=int, default=None, help="분당 요청 한도")
+    parser.add_argument("--invalid-json", type=float, default=0.0, help="JSON 응답을 잘라서 반환할 확률")
+    parser.add_argument("--output-ratio", type=float, default=0.0,
+                        help="--output-tokens 대신 응답을 프롬프트에서 다시 쓸 내용 토큰 수의 이 배수까지 채움 (JSON 응답 제외)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def mock_options(args):
+    return {
+        "latency_ms": args.latency_ms, "latency_sigma": args.latency_sigma,
+        "tokens_per_sec": args.tokens_per_sec, "output_tokens": args.output_tokens,
+        "error_429": args.error_429, "error_529": args.error_529, "retry_after": args.retry_after,
+        "rpm": args.rpm, "invalid_json": args.invalid_json, "output_ratio": args.output_ratio, "seed": args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 Anthropic Messages API 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(MockState(**mock_options(args))))
+    server.daemon_threads = True
+    print(f"모의 서버 실행 중: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+# bulk_import.py - 폴더/JSONL/CSV에서 채용 공고와 이력서를 스트리밍으로 가져오며 중복·유사 문서를 걸러내는 도구
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from analysis_store import normalize_posting
+
+# SimHash 지문 비트 수와 유사 문서로 보는 최대 해밍 거리 (채용 공고 길이의 문서에서 서로 다른 문서가
+# 우연히 이 거리 안에 들어올 확률은 무시할 만큼 작음)
+SIMHASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 6
+# 지문을 만들 때 사용하는 연속 단어 묶음 크기
+SHINGLE_SIZE = 3
+# 이 개수만큼 저장할 때마다 커밋
+COMMIT_EVERY = 500
+# DuplicateIndexCache가 메모리에 들고 있는 최대 색인 수 (작업 공간 × 종류)
+INDEX_CACHE_ENTRIES = 64
+# DuplicateIndexCache에서 같은 작업 공간의 저장을 차례로 처리하는 잠금 수
+INDEX_LOCK_STRIPES = 16
+
+TEXT_EXTENSIONS = (".txt", ".md")
+TITLE_FIELDS = ("title", "name", "job_title", "제목", "이름")
+CONTENT_FIELDS = ("content", "text", "description", "body", "내용")
+ID_FIELDS = ("id", "job_id")
+
+# 중복 처리 방식: merge(기존 문서로 합치고 저장하지 않음), flag(저장하되 유사 문서로 표시하고 분석 결과 재사용)
+ON_DUPLICATE = ("merge", "flag")
+
+# 가져오기를 지원하는 테이블 → 지문을 저장할 때 쓰는 접두부
+KINDS = ("job_postings", "resumes")
+
+
+def content_digest(text):
+    """정규화한 내용의 SHA-256 (서식만 다른 문서는 같은 값)"""
+    return hashlib.sha256(normalize_posting(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text):
+    """정규화한 텍스트의 단어 묶음(shingle)으로 64비트 SimHash 지문 계산"""
+    words = normalize_posting(text).split()
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+        dtype="<u8", count=len(shingles)
+    )
+    # 묶음별 해시의 각 비트를 +1/-1로 투표하여 과반인 비트만 1로 둠
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    value = 0
+    for position in np.flatnonzero(votes > 0):
+        value |= 1 << int(position)
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class DuplicateIndex:
+    """SimHash 지문 색인 (해밍 거리 max_distance 이하를 유사 문서로 봄)
+
+    64비트를 max_distance + 1개 구간으로 나누면 유사 문서는 적어도 한 구간이 같으므로(비둘기집 원리),
+    구간 값이 같은 후보만 비교합니다.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        widths = [SIMHASH_BITS // bands + (1 if i < SIMHASH_BITS % bands else 0) for i in range(bands)]
+        self._bands = []
+        offset = 0
+        for width in widths:
+            self._bands.append((offset, (1 << width) - 1))
+            offset += width
+        self._digests = {}
+        self._buckets = {}
+        self._keys = {}  # 키 → (digest, 지문), 내용이 바뀐 문서의 이전 항목을 지울 때 사용
+
+    def add(self, key, digest, fingerprint):
+        """문서를 색인에 추가 (같은 키가 이미 있으면 이전 내용의 항목을 지우고 바꿈)"""
+        self.remove(key)
+        self._keys[key] = (digest, fingerprint)
+        self._digests.setdefault(digest, key)
+        for band, (offset, mask) in enumerate(self._bands):
+            self._buckets.setdefault((band, (fingerprint >> offset) & mask), []).append((key, fingerprint))
+
+    def remove(self, key):
+        """문서를 색인에서 지움 (없으면 무시)"""
+        entry = self._keys.pop(key, None)
+        if entry is None:
+            return
+        digest, fingerprint = entry
+        if self._digests.get(digest) == key:
+            del self._digests[digest]
+        for band, (offset, mask) in enumerate(self._bands):
+            bucket_key = (band, (fingerprint >> offset) & mask)
+            bucket = [item for item in self._buckets.get(bucket_key, ()) if item[0] != key]
+            if bucket:
+                self._buckets[bucket_key] = bucket
+            else:
+                self._buckets.pop(bucket_key, None)
+
+    def find(self, digest, fingerprint):
+        """같거나 유사한 문서의 (키, 해밍 거리)를 반환 (없으면 None)"""
+        if digest in self._digests:
+            return self._digests[digest], 0
+        best = None
+        for band, (offset, mask) in enumerate(self._bands):
+            for key, other in self._buckets.get((band, (fingerprint >> offset) & mask), ()):
+                distance = hamming_distance(fingerprint, other)
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (key, distance)
+        return best
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def _pick(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def _record(source, title, content, doc_id=None):
+    if not content or not content.strip():
+        return {"source": source, "error": "내용이 비어 있습니다."}
+    return {"source": source, "title": (title or "").strip(), "content": content, "id": doc_id}
+
+
+def _read_rows(stream, name, ext):
+    if ext == ".jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            source = f"{name}:{line_no}"
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield {"source": source, "error": f"JSON 형식 오류: {e}"}
+                continue
+            if not isinstance(row, dict):
+                yield {"source": source, "error": "JSON 객체가 아닙니다."}
+                continue
+            yield _record(source, _pick(row, TITLE_FIELDS), _pick(row, CONTENT_FIELDS), _pick(row, ID_FIELDS))
+    elif ext == ".csv":
+        # 채용 공고 본문은 기본 필드 크기 한도(128KB)를 넘을 수 있음
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        for row_no, row in enumerate(csv.DictReader(stream), start=2):
+            yield _record(f"{name}:{row_no}", _pick(row, TITLE_FIELDS), _pick(row, CONTENT_FIELDS), _pick(row, ID_FIELDS))
+    elif ext in TEXT_EXTENSIONS:
+        # 텍스트 파일 하나가 문서 하나 (파일 이름이 제목)
+        yield _record(name, os.path.splitext(os.path.basename(name))[0], stream.read())
+    else:
+        yield {"source": name, "error": "지원하지 않는 형식입니다 (.jsonl, .csv, .txt, .md)."}
+
+
+def iter_records(source):
+    """경로(폴더, .jsonl, .csv, .txt, .md) 또는 업로드한 파일 객체에서 문서 레코드를 하나씩 읽음
+
+    레코드: {"source", "title", "content", "id"} 또는 읽지 못한 경우 {"source", "error"}
+    파일 전체를 메모리에 올리지 않고 한 줄(행)씩 읽습니다.
+    """
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            for entry in sorted(os.scandir(source), key=lambda e: e.name):
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in TEXT_EXTENSIONS + (".jsonl", ".csv"):
+                    yield from iter_records(entry.path)
+            return
+        with open(source, encoding="utf-8-sig", newline="") as stream:
+            yield from _read_rows(stream, source, os.path.splitext(source)[1].lower())
+        return
+
+    name = getattr(source, "name", "upload")
+    stream = source
+    if not isinstance(source, io.TextIOBase):
+        stream = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        yield from _read_rows(stream, name, os.path.splitext(name)[1].lower())
+    finally:
+        if stream is not source:
+            stream.detach()
+
+
+class BulkImporter:
+    """문서를 하나씩 받아 이미 저장된 문서(와 앞서 가져온 문서)와의 중복을 걸러내며 작업 공간에 저장
+
+    지문은 fingerprints 테이블에 저장해 두고, 색인을 만들 때 지문이 없거나 문서보다 오래된 항목만 다시 계산합니다.
+    index에 작업 공간의 현재 문서로 이미 만든 색인을 주면 색인을 다시 만들지 않고 그대로 이어서 씁니다.
+    """
+
+    def __init__(self, store, workspace, kind, on_duplicate="merge", max_distance=DEFAULT_MAX_DISTANCE,
+                 commit_every=COMMIT_EVERY, index=None):
+        if kind not in KINDS:
+            raise Exception(f"가져올 수 없는 종류입니다: {kind}")
+        if on_duplicate not in ON_DUPLICATE:
+            raise Exception(f"알 수 없는 중복 처리 방식입니다: {on_duplicate}")
+        self.store = store
+        self.kind = kind
+        self.on_duplicate = on_duplicate
+        self.commit_every = commit_every
+        self.view = store.table(kind, workspace)
+        self.analyses = store.table("job_analyses", workspace)
+        self.fingerprints = store.table("fingerprints", workspace)
+        self.report = {"read": 0, "added": 0, "updated": 0, "merged": [], "flagged": [], "errors": []}
+        self._pending = 0
+        if index is not None and index.max_distance == max_distance:
+            self.index = index
+        else:
+            self.index = DuplicateIndex(max_distance)
+            self._build_index()
+
+    def _doc_key(self, key):
+        return f"{self.kind}:{key}"
+
+    def _content(self, value):
+        return value["content"] if self.kind == "job_postings" else value
+
+    def _build_index(self):
+        prefix = self._doc_key("")
+        doc_updated = self.view.column("updated_at")
+        stored = {
+            doc_key[len(prefix):]: value for doc_key, value in self.fingerprints.items() if doc_key.startswith(prefix)
+        }
+        fingerprint_updated = self.fingerprints.column("updated_at")
+        for key, updated_at in doc_updated.items():
+            entry = stored.pop(key, None)
+            if entry is None or fingerprint_updated[self._doc_key(key)] < updated_at:
+                content = self._content(self.view[key])
+                entry = {"digest": content_digest(content), "simhash": format(simhash(content), "016x")}
+                self._save_fingerprint(key, entry)
+            self.index.add(key, entry["digest"], int(entry["simhash"], 16))
+        # 지워진 문서의 지문 정리
+        for key in stored:
+            del self.fingerprints[self._doc_key(key)]
+        self.flush()
+
+    def _save_fingerprint(self, key, entry):
+        self.fingerprints.set(self._doc_key(key), entry, commit=False)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.store.commit()
+            self._pending = 0
+
+    def _new_key(self, title, digest, doc_id):
+        if self.kind == "job_postings":
+            return doc_id or f"{(title or '채용 공고').replace(' ', '_')}_{digest[:10]}"
+        name = title or f"이력서_{digest[:10]}"
+        key, suffix = name, 2
+        while key in self.view:
+            key = f"{name} ({suffix})"
+            suffix += 1
+        return key
+
+    def add(self, record):
+        """레코드 하나를 저장하고 (상태, 키, 유사 문서 키)를 반환
+
+        상태: added, updated(같은 ID의 내용이 바뀜), merged(기존 문서로 합침), flagged(저장했지만 유사 문서 있음), error
+        """
+        self.report["read"] += 1
+        source = record.get("source")
+        if record.get("error"):
+            self.report["errors"].append((source, record["error"]))
+            return "error", None, None
+
+        content, title, doc_id = record["content"], record.get("title"), record.get("id")
+        digest = content_digest(content)
+        fingerprint = simhash(content)
+        match = self.index.find(digest, fingerprint)
+        # 같은 ID가 다시 들어오면 같은 문서의 새 버전으로 봄
+        updating = self.kind == "job_postings" and doc_id and doc_id in self.view
+        if updating and match is not None and match[0] == doc_id and match[1] > 0:
+            # 자기 이전 버전과 비슷한 것은 중복이 아니라 수정
+            match = None
+        if match is not None and not (updating and match[0] != doc_id):
+            existing, distance = match
+            if distance == 0 or self.on_duplicate == "merge":
+                self.report["merged"].append((source, title, existing, distance))
+                return "merged", existing, existing
+
+        key = doc_id if updating else self._new_key(title, digest, doc_id)
+        value = {"title": title or key, "content": content} if self.kind == "job_postings" else content
+        self.view.set(key, value, commit=False)
+        self._save_fingerprint(key, {"digest": digest, "simhash": format(fingerprint, "016x")})
+        self.index.add(key, digest, fingerprint)
+
+        if updating:
+            # 내용이 바뀐 공고의 이전 분석 결과는 더 이상 맞지 않음
+            if key in self.analyses:
+                del self.analyses[key]
+            self.report["updated"] += 1
+            return "updated", key, None
+        if match is not None:
+            # 유사 공고는 기존 분석 결과를 그대로 사용하여 분석 호출을 늘리지 않음
+            existing = match[0]
+            if self.kind == "job_postings" and existing in self.analyses:
+                self.analyses.set(key, self.analyses[existing], commit=False)
+            self.report["flagged"].append((source, title, existing, match[1]))
+            return "flagged", key, existing
+        self.report["added"] += 1
+        return "added", key, None
+
+    def finish(self):
+        self.flush()
+        return self.report
+
+
+class DuplicateIndexCache:
+    """작업 공간별 중복 검사 색인을 저장 사이에 재사용하는 캐시 (문서를 하나씩 저장하는 화면용)
+
+    BulkImporter는 만들 때마다 작업 공간의 모든 지문을 읽어 색인을 만듭니다 (문서 수에 비례).
+    이 캐시는 색인을 (작업 공간, 종류)별로 들고 있다가 저장소의 작업 공간별 쓰기 횟수가 그대로면 다시 쓰고,
+    저장한 문서는 색인에 바로 추가하므로 문서 하나를 저장하는 비용이 문서 수와 무관합니다.
+    다른 경로(일괄 가져오기, 삭제, 다른 세션)로 작업 공간이 바뀌면 다음 저장에서 색인을 다시 만듭니다.
+    """
+
+    def __init__(self, max_entries=INDEX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (작업 공간, 종류) → (쓰기 횟수, 색인)
+        self._key_locks = [threading.Lock() for _ in range(INDEX_LOCK_STRIPES)]
+
+    def add(self, store, workspace, kind, record, on_duplicate="merge", max_distance=DEFAULT_MAX_DISTANCE):
+        """레코드 하나를 BulkImporter.add와 같이 저장하고 (상태, 키, 유사 문서 키)를 반환"""
+        cache_key = (workspace, kind)
+        # 같은 작업 공간의 저장은 차례로 처리 (색인을 함께 고치므로), 다른 작업 공간은 대부분 서로 기다리지 않음
+        with self._key_locks[hash(cache_key) % len(self._key_locks)]:
+            with self._lock:
+                entry = self._entries.get(cache_key)
+            revision = store.revision(kind, workspace=workspace)[0]
+            index = entry[1] if entry is not None and entry[0] == revision else None
+            importer = BulkImporter(
+                store, workspace, kind, on_duplicate=on_duplicate, max_distance=max_distance, index=index
+            )
+            result = importer.add(record)
+            importer.finish()
+            # 이 저장 외의 쓰기가 끼어들지 않았을 때만 색인을 최신으로 봄
+            expected = revision + (result[0] in ("added", "updated", "flagged"))
+            with self._lock:
+                if store.revision(kind, workspace=workspace)[0] == expected:
+                    self._entries[cache_key] = (expected, importer.index)
+                    self._entries.move_to_end(cache_key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                else:
+                    self._entries.pop(cache_key, None)
+            return result
+
+
+def import_documents(store, workspace, kind, sources, on_duplicate="merge", max_distance=DEFAULT_MAX_DISTANCE,
+                     on_progress=None, progress_every=100):
+    """여러 소스의 문서를 차례로 가져오고 결과 요약을 반환
+
+    on_progress(읽은 수)는 progress_every개마다 호출됩니다.
+    """
+    importer = BulkImporter(store, workspace, kind, on_duplicate=on_duplicate, max_distance=max_distance)
+    for source in sources:
+        for record in iter_records(source):
+            importer.add(record)
+            if on_progress and importer.report["read"] % progress_every == 0:
+                on_progress(importer.report["read"])
+    return importer.finish()
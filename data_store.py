@@ -0,0 +1,250 @@
+# data_store.py - 이력서, 채용 공고, 분석 결과, 설정, 맞춤화 결과를 저장하는 SQLite 저장소
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+
+# 테이블 정의: (테이블 이름, 키 열, 값 열 목록)
+# 값 열이 하나면 값 자체를, 여러 개면 {열 이름: 값} dict를 저장/반환합니다.
+TABLES = {
+    "resumes": ("name", ["content"]),
+    "job_postings": ("job_id", ["title", "content"]),
+    "job_analyses": ("job_id", ["analysis"]),
+    "customization_settings": ("job_id", ["settings"]),
+    "tailored_outputs": ("job_id", ["title", "resumes", "result", "fingerprint", "created_at"]),
+    # 중복 검사용 문서 지문 (키: "<테이블>:<문서 키>", bulk_import 참고)
+    "fingerprints": ("doc_key", ["digest", "simhash"])
+}
+
+# JSON으로 직렬화해 저장하는 열
+JSON_COLUMNS = {"settings", "resumes", "analysis"}
+
+
+def _decode_value(column, value):
+    if column not in JSON_COLUMNS or value is None:
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        # JSON 열이 되기 전에 텍스트로 저장된 값 (예: 자유 형식 분석 결과)
+        return value
+
+
+class DataStore:
+    """작업 공간(workspace)별로 데이터를 나눠 저장하는 SQLite 저장소
+
+    모든 세션이 하나의 연결을 공유하며, 쓰기는 변경된 항목 단위로 즉시 반영됩니다.
+    테이블(과 작업 공간)마다 쓰기 횟수(revision)를 세므로, 파생 데이터를 (작업 공간, revision) 기준으로 캐시할 수 있습니다.
+    다른 프로세스(예: tailor_cli.py import)가 같은 파일에 쓴 것은 PRAGMA data_version으로 알아내어 모든 revision을 올립니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._revisions = {}
+        self._external_changes = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _create_tables(self):
+        with self._lock:
+            for table, (key, columns) in TABLES.items():
+                column_defs = ", ".join(f"{column} {'REAL' if column == 'created_at' else 'TEXT'}" for column in columns)
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    f"workspace TEXT NOT NULL, {key} TEXT NOT NULL, {column_defs}, "
+                    f"updated_at REAL NOT NULL, PRIMARY KEY (workspace, {key}))"
+                )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_updated ON {table}(workspace, updated_at)"
+                )
+            self._conn.commit()
+
+    def execute(self, sql, params=(), commit=False):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            if commit:
+                self._conn.commit()
+            return rows
+
+    def commit(self):
+        """commit=False로 모아 둔 쓰기를 반영"""
+        with self._lock:
+            self._conn.commit()
+
+    def touch(self, table, workspace=None):
+        """테이블이 바뀌었음을 기록 (작업 공간을 알면 작업 공간별 쓰기 횟수도 올림)"""
+        with self._lock:
+            self._revisions[table] = self._revisions.get(table, 0) + 1
+            if workspace is not None:
+                self._revisions[(table, workspace)] = self._revisions.get((table, workspace), 0) + 1
+
+    def revision(self, *tables, workspace=None):
+        """테이블들의 쓰기 횟수 (값이 같으면 내용도 같음)
+
+        workspace를 주면 그 작업 공간에 대한 쓰기만 셉니다. 다른 프로세스의 쓰기는 어느 테이블, 어느 작업 공간인지
+        알 수 없으므로 모든 값에 더합니다 (값은 이 프로세스 안에서만 비교할 수 있음).
+        """
+        with self._lock:
+            # data_version은 다른 연결이 커밋했을 때만 바뀜 (이 연결의 쓰기는 touch로 셈)
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._external_changes += 1
+            keys = [(table, workspace) if workspace is not None else table for table in tables]
+            return tuple(self._revisions.get(key, 0) + self._external_changes for key in keys)
+
+    def table(self, name, workspace):
+        """작업 공간의 테이블을 dict처럼 다루는 지연 로딩 뷰 반환"""
+        return TableView(self, name, workspace)
+
+    def workspaces(self):
+        rows = self.execute(
+            " UNION ".join(f"SELECT DISTINCT workspace FROM {table}" for table in TABLES) + " ORDER BY 1"
+        )
+        return [row[0] for row in rows]
+
+    def import_data(self, workspace, data):
+        """JSON 백업 형식의 데이터를 작업 공간에 병합 (같은 키는 덮어씀)"""
+        mapping = {
+            "resume_versions": "resumes",
+            "job_postings": "job_postings",
+            "job_analyses": "job_analyses",
+            "customization_settings": "customization_settings",
+            "batch_results": "tailored_outputs"
+        }
+        with self._lock:
+            for field, table in mapping.items():
+                view = self.table(table, workspace)
+                for key, value in (data.get(field) or {}).items():
+                    view.set(key, value, commit=False)
+            self._conn.commit()
+
+    def export_data(self, workspace):
+        """작업 공간의 모든 데이터를 JSON 백업 형식의 dict로 반환"""
+        return {
+            "resume_versions": dict(self.table("resumes", workspace).items()),
+            "job_postings": dict(self.table("job_postings", workspace).items()),
+            "job_analyses": dict(self.table("job_analyses", workspace).items()),
+            "customization_settings": dict(self.table("customization_settings", workspace).items()),
+            "batch_results": dict(self.table("tailored_outputs", workspace).items())
+        }
+
+
+class TableView(MutableMapping):
+    """SQLite 테이블 하나를 dict처럼 사용할 수 있게 해주는 뷰
+
+    값을 메모리에 들고 있지 않고, 조회할 때마다 필요한 행만 읽습니다.
+    반환된 값(dict)을 직접 고쳐도 저장되지 않으므로 항상 view[key] = 값 으로 다시 저장해야 합니다.
+    """
+
+    def __init__(self, store, name, workspace):
+        self.store = store
+        self.name = name
+        self.workspace = workspace
+        self.key_column, self.columns = TABLES[name]
+
+    def _decode(self, row):
+        values = [_decode_value(c, v) for c, v in zip(self.columns, row)]
+        if len(self.columns) == 1:
+            return values[0]
+        return dict(zip(self.columns, values))
+
+    def _encode(self, value):
+        if len(self.columns) == 1:
+            value = {self.columns[0]: value}
+        return [
+            json.dumps(value.get(c), ensure_ascii=False) if c in JSON_COLUMNS else value.get(c)
+            for c in self.columns
+        ]
+
+    def __getitem__(self, key):
+        rows = self.store.execute(
+            f"SELECT {', '.join(self.columns)} FROM {self.name} WHERE workspace = ? AND {self.key_column} = ?",
+            (self.workspace, key)
+        )
+        if not rows:
+            raise KeyError(key)
+        return self._decode(rows[0])
+
+    def set(self, key, value, commit=True):
+        columns = ", ".join(self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in self.columns)
+        # UPSERT는 기존 행의 rowid를 유지하므로 목록 순서(추가한 순서)가 바뀌지 않음
+        self.store.execute(
+            f"INSERT INTO {self.name} (workspace, {self.key_column}, {columns}, updated_at) "
+            f"VALUES (?, ?, {placeholders}, ?) "
+            f"ON CONFLICT (workspace, {self.key_column}) DO UPDATE SET {updates}, updated_at = excluded.updated_at",
+            [self.workspace, key] + self._encode(value) + [time.time()],
+            commit=commit
+        )
+        self.store.touch(self.name, self.workspace)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.store.execute(
+            f"DELETE FROM {self.name} WHERE workspace = ? AND {self.key_column} = ?",
+            (self.workspace, key),
+            commit=True
+        )
+        self.store.touch(self.name, self.workspace)
+
+    def __contains__(self, key):
+        return bool(self.store.execute(
+            f"SELECT 1 FROM {self.name} WHERE workspace = ? AND {self.key_column} = ?",
+            (self.workspace, key)
+        ))
+
+    def __iter__(self):
+        rows = self.store.execute(
+            f"SELECT {self.key_column} FROM {self.name} WHERE workspace = ? ORDER BY rowid",
+            (self.workspace,)
+        )
+        return iter([row[0] for row in rows])
+
+    def __len__(self):
+        return self.store.execute(
+            f"SELECT COUNT(*) FROM {self.name} WHERE workspace = ?", (self.workspace,)
+        )[0][0]
+
+    def items(self):
+        rows = self.store.execute(
+            f"SELECT {self.key_column}, {', '.join(self.columns)} FROM {self.name} WHERE workspace = ? ORDER BY rowid",
+            (self.workspace,)
+        )
+        return [(row[0], self._decode(row[1:])) for row in rows]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def column(self, name):
+        """본문 없이 특정 열만 {키: 값}으로 반환 (예: 공고 제목 목록)"""
+        rows = self.store.execute(
+            f"SELECT {self.key_column}, {name} FROM {self.name} WHERE workspace = ? ORDER BY rowid",
+            (self.workspace,)
+        )
+        return {row[0]: _decode_value(name, row[1]) for row in rows}
+
+    @property
+    def revision(self):
+        """이 작업 공간의 테이블 쓰기 횟수 (다른 프로세스의 쓰기 포함)"""
+        return self.store.revision(self.name, workspace=self.workspace)[0]
+
+    def clear(self):
+        self.store.execute(f"DELETE FROM {self.name} WHERE workspace = ?", (self.workspace,), commit=True)
+        self.store.touch(self.name, self.workspace)
+
+    def __repr__(self):
+        return f"TableView({self.name!r}, workspace={self.workspace!r}, {len(self)} items)"
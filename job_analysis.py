@@ -0,0 +1,163 @@
+# job_analysis.py - 채용 공고 분석 결과 JSON 형식, 검증, 프롬프트용 축약, 기술별 공고 색인
+import json
+
+from resume_parser import extract_json_object
+
+# 분석 결과 필드: 키 → (표시 이름, 값 형식)
+ANALYSIS_FIELDS = {
+    "summary": ("직무 요약", str),
+    "required_skills": ("핵심 요구사항", list),
+    "preferred_skills": ("우대사항", list),
+    "keywords": ("주요 키워드", list),
+    "culture": ("회사 가치관/문화", list),
+    "strategy": ("이력서 최적화 전략", list)
+}
+
+# 비어 있으면 검증에 실패하는 필드
+REQUIRED_FIELDS = ("summary", "required_skills", "keywords")
+
+# 항목 하나의 최대 길이 (넘으면 잘라냄)
+MAX_ITEM_LENGTH = 300
+
+# 기술별 공고 필터에 쓰는 필드 (프롬프트에서는 한 줄로 모아 표시)
+SKILL_FIELDS = ("required_skills", "preferred_skills", "keywords")
+
+# 필수/우대 항목은 이 단어 수 이하일 때만 기술로 색인 (예: 'Python'은 포함, '결제 시스템 개발 경험 3년 이상'은 제외)
+MAX_SKILL_WORDS = 3
+
+ANALYSIS_SYSTEM_PROMPT = "당신은 채용 공고 분석 전문가입니다. 구직자가 이력서를 최적화할 수 있도록 채용 공고의 핵심 내용을 분석해주세요."
+
+ANALYSIS_PROMPT_TEMPLATE = """
+        당신은 채용 공고 분석 전문가입니다. 다음 채용 공고를 분석하여 구직자가 이력서를 최적화하는 데 필요한 정보를 추출해주세요.
+
+        ## 채용 공고:
+        {job_content}
+
+        분석 결과를 다음 키를 가진 JSON 객체 하나로만 출력해주세요. 설명이나 코드 블록 표시는 붙이지 마세요.
+
+        {{
+          "summary": "직무에 대한 간략한 요약 (2-3문장)",
+          "required_skills": ["필수 기술, 경험, 자격 요건 (항목마다 짧게)"],
+          "preferred_skills": ["우대하는 기술, 경험, 자격 요건"],
+          "keywords": ["이력서에 포함되면 좋을 핵심 키워드 10-15개 (단어 또는 짧은 구)"],
+          "culture": ["회사가 중요시하는 가치나 문화적 특성"],
+          "strategy": ["이 채용 공고에 맞게 이력서를 최적화하는 구체적인 전략과 조언"]
+        }}
+
+        채용 공고에서 명시적으로 언급되지 않았지만 해당 직무에서 중요할 수 있는 요소도 포함해주세요.
+        """
+
+
+def _clean_items(value):
+    if isinstance(value, str):
+        value = [value]
+    items = []
+    for item in value or []:
+        if isinstance(item, dict):
+            item = ": ".join(str(v) for v in item.values() if v)
+        item = " ".join(str(item).split())[:MAX_ITEM_LENGTH]
+        if item and item not in items:
+            items.append(item)
+    return items
+
+
+def normalize_analysis(data):
+    """분석 결과 dict를 필드 형식에 맞게 정리 (모르는 키는 버리고, 없는 필드는 빈 값으로 채움)"""
+    analysis = {}
+    for key, (_, kind) in ANALYSIS_FIELDS.items():
+        value = data.get(key)
+        if kind is list:
+            analysis[key] = _clean_items(value)
+        elif isinstance(value, list):
+            analysis[key] = " ".join(str(item).strip() for item in value if item)
+        else:
+            analysis[key] = str(value or "").strip()
+    return analysis
+
+
+def parse_analysis(text):
+    """LLM 응답에서 분석 결과 JSON을 꺼내 검증한 dict를 반환 (형식이 맞지 않으면 ValueError)"""
+    data = extract_json_object(text)
+    if not isinstance(data, dict):
+        raise ValueError("분석 결과 JSON이 객체 형식이 아닙니다.")
+    analysis = normalize_analysis(data)
+    missing = [ANALYSIS_FIELDS[key][0] for key in REQUIRED_FIELDS if not analysis[key]]
+    if missing:
+        raise ValueError(f"분석 결과에 {', '.join(missing)} 항목이 없습니다.")
+    return analysis
+
+
+def load_analysis(value):
+    """저장된 분석 결과를 dict로 변환
+
+    JSON 문자열은 변환하고, 이 형식 이전에 저장된 자유 형식 분석 텍스트는 그대로 반환합니다.
+    """
+    if isinstance(value, dict):
+        return normalize_analysis(value)
+    if not value:
+        return None
+    try:
+        data = json.loads(value)
+    except ValueError:
+        return value
+    return normalize_analysis(data) if isinstance(data, dict) else value
+
+
+def dump_analysis(analysis):
+    return json.dumps(analysis, ensure_ascii=False)
+
+
+def format_analysis(analysis, fields=None):
+    """분석 결과에서 fields(기본값: 전체)만 골라 프롬프트/화면용 텍스트로 변환
+
+    자유 형식 분석 텍스트는 필드를 고를 수 없으므로 그대로 반환합니다.
+    """
+    analysis = load_analysis(analysis)
+    if not isinstance(analysis, dict):
+        return analysis or ""
+    lines = []
+    for key in fields or ANALYSIS_FIELDS:
+        label, kind = ANALYSIS_FIELDS[key]
+        value = analysis.get(key)
+        if not value:
+            continue
+        if kind is str:
+            lines.append(f"- {label}: {value}")
+        elif key in SKILL_FIELDS:
+            # 짧은 항목은 한 줄로 모아 토큰을 줄임
+            lines.append(f"- {label}: {', '.join(value)}")
+        else:
+            lines.append(f"- {label}:")
+            lines.extend(f"  - {item}" for item in value)
+    return "\n".join(lines)
+
+
+def analysis_keywords(analysis):
+    """적합도 계산에 쓰는 주요 키워드 목록 (자유 형식 분석이면 None)"""
+    analysis = load_analysis(analysis)
+    return list(analysis["keywords"]) if isinstance(analysis, dict) else None
+
+
+def analysis_requirements(analysis):
+    """적합도 계산에 쓰는 핵심 요구사항 목록 (자유 형식 분석이면 None)"""
+    analysis = load_analysis(analysis)
+    return list(analysis["required_skills"]) if isinstance(analysis, dict) else None
+
+
+def skill_index(analyses):
+    """{공고 ID: 분석 결과}에서 {기술(소문자): (표시 이름, 공고 ID 집합)} 색인 생성
+
+    주요 키워드 전체와 짧은 필수/우대 항목을 포함하며, 표시 이름은 처음 나온 표기를 사용합니다.
+    """
+    index = {}
+    for job_id, value in analyses.items():
+        analysis = load_analysis(value)
+        if not isinstance(analysis, dict):
+            continue
+        for key in SKILL_FIELDS:
+            for skill in analysis[key]:
+                if key != "keywords" and len(skill.split()) > MAX_SKILL_WORDS:
+                    continue
+                entry = index.setdefault(skill.lower(), (skill, set()))
+                entry[1].add(job_id)
+    return index
@@ -0,0 +1,132 @@
+# job_queue.py - 스크립트 재실행과 관계없이 서버 프로세스에서 계속 실행되는 생성 작업 큐
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """큐에 들어간 생성 작업 하나의 상태, 진행 상황, 결과"""
+
+    def __init__(self, owner, label, meta=None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.label = label
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    def append_text(self, delta):
+        """생성 중인 텍스트 조각 추가 (스트리밍 호출의 on_delta로 사용)"""
+        if self._cancel.is_set():
+            raise Exception("작업이 취소되었습니다.")
+        with self._lock:
+            self._chunks.append(delta)
+
+    @property
+    def partial_text(self):
+        with self._lock:
+            return "".join(self._chunks)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """취소 요청 (대기 중인 작업은 실행하지 않고, 스트리밍 중인 작업은 다음 조각에서 중단)"""
+        self._cancel.set()
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobQueue:
+    """서버 프로세스가 소유하는 작업 스레드 풀
+
+    작업은 소유자(세션) 단위로 보관되며, 끝난 작업은 keep_seconds가 지나면 정리됩니다.
+    """
+
+    def __init__(self, max_workers=4, keep_seconds=3600):
+        self.keep_seconds = keep_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generation")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner, fn, label="", meta=None, initializer=None):
+        """fn(job)을 백그라운드에서 실행하고 Job을 반환
+
+        fn은 job.append_text로 생성 중인 텍스트를, job.progress로 진행 상황을 알릴 수 있으며
+        반환값이 작업 결과가 됩니다. initializer는 실행 직전에 작업 스레드에서 호출됩니다.
+        """
+        job = Job(owner, label, meta)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, initializer)
+        return job
+
+    def _run(self, job, fn, initializer):
+        if job.cancelled:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            if initializer:
+                initializer()
+            job.result = fn(job)
+            job.status = CANCELLED if job.cancelled else DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = CANCELLED if job.cancelled else FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs_for(self, owner):
+        """소유자의 작업 목록 (최근 작업이 먼저)"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.owner == owner]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "queued": sum(1 for job in jobs if job.status == QUEUED),
+            "running": sum(1 for job in jobs if job.status == RUNNING)
+        }
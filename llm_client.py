@@ -0,0 +1,274 @@
+# llm_client.py - Anthropic Messages API용 공유 HTTP 클라이언트
+import email.utils
+import http.cookiejar
+import json
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# 재시도 대상 상태 코드 (429: 요청 제한, 529: 과부하, 5xx: 서버 오류)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+
+
+class AnthropicAPIError(Exception):
+    """API가 오류 응답을 반환했거나 재시도 후에도 실패한 경우"""
+
+    def __init__(self, message, status_code=None, response_text=""):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+
+def parse_retry_after(value):
+    """retry-after 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class MessageStream:
+    """Messages API 이벤트 스트림(SSE)을 읽어 텍스트 조각을 순서대로 내보내는 반복자
+
+    반복이 끝나면 text, usage, stop_reason, model 속성에 최종 결과가 채워지며,
+    first_token_at에는 첫 텍스트 조각을 받은 시각(time.monotonic)이 기록됩니다.
+    """
+
+    def __init__(self, response, on_close=None):
+        self._response = response
+        self._on_close = on_close
+        self.first_token_at = None
+        self.text = ""
+        self.usage = {}
+        self.stop_reason = None
+        self.model = None
+        self.done = False
+
+    def _events(self):
+        """SSE 스트림을 (이벤트 이름, 데이터) 쌍으로 분해"""
+        self._response.encoding = "utf-8"
+        event, data_lines = None, []
+        for line in self._response.iter_lines(decode_unicode=True):
+            if line:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    data_lines.append(value)
+                continue
+            # 빈 줄이 이벤트의 끝
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = None, []
+        if data_lines:
+            yield event, json.loads("\n".join(data_lines))
+
+    def __iter__(self):
+        chunks = []
+        try:
+            for event, data in self._events():
+                event_type = data.get("type", event)
+                if event_type == "message_start":
+                    message = data.get("message", {})
+                    self.model = message.get("model")
+                    self.usage.update(message.get("usage", {}))
+                elif event_type == "content_block_delta":
+                    delta = data.get("delta", {})
+                    if delta.get("type") == "text_delta":
+                        if self.first_token_at is None:
+                            self.first_token_at = time.monotonic()
+                        chunks.append(delta["text"])
+                        yield delta["text"]
+                elif event_type == "message_delta":
+                    self.stop_reason = data.get("delta", {}).get("stop_reason")
+                    self.usage.update(data.get("usage", {}))
+                elif event_type == "error":
+                    error = data.get("error", {})
+                    raise AnthropicAPIError(
+                        f"스트림 오류: {error.get('type')} - {error.get('message')}",
+                        response_text=json.dumps(data, ensure_ascii=False)
+                    )
+                elif event_type == "message_stop":
+                    break
+            self.done = True
+        finally:
+            self.text = "".join(chunks)
+            self._response.close()
+            if self._on_close:
+                self._on_close(self)
+
+
+class AnthropicClient:
+    """연결 풀을 공유하는 스레드 안전 Messages API 클라이언트
+
+    하나의 인스턴스를 여러 세션과 스레드가 함께 사용하도록 만들어졌습니다.
+    keep-alive 연결을 재사용하고, 호출마다 연결/읽기 타임아웃을 적용하며,
+    429/529/5xx 응답에는 retry-after를 존중하는 지수 백오프로 재시도합니다.
+    rate_limiter(RateLimiter)를 지정하면 매 시도 전에 실행 허가를 받고, 끝나면 응답 헤더와
+    사용량을 돌려주어 모든 호출이 하나의 요청 한도를 나눠 쓰게 합니다.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=32, connect_timeout=5.0,
+                 read_timeout=120.0, max_retries=4, backoff_base=1.0, backoff_max=30.0, rate_limiter=None):
+        self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        # 여러 스레드가 공유하므로 쿠키는 저장하지 않음
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        # 재시도는 직접 처리하므로 어댑터 재시도는 끔
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def messages_url(self):
+        return f"{self.base_url}/v1/messages"
+
+    def _headers(self, api_key):
+        return {
+            "x-api-key": api_key,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json"
+        }
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """지터를 적용한 지수 백오프 대기 시간 계산 (retry-after가 있으면 우선)"""
+        if retry_after is not None:
+            # 서버가 지정한 시간은 지키되, 동시에 깨어나지 않도록 약간의 지터 추가
+            return retry_after + random.uniform(0, self.backoff_base)
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _release(self, ticket, *args, **kwargs):
+        if self.rate_limiter and ticket is not None:
+            self.rate_limiter.release(ticket, *args, **kwargs)
+
+    def _post(self, api_key, payload, timeout=None, deadline=None, stream=False, owner=None, metrics=None,
+              priority=None):
+        """재시도와 타임아웃을 적용해 요청을 보내고 (성공한 응답, 요청 제한 허가)를 반환
+
+        metrics(dict)를 넘기면 재시도 횟수(retries)와 응답 헤더까지 걸린 시간(ttfb)을 기록합니다.
+        priority는 요청 제한기의 우선순위입니다 (rate_limiter.BACKGROUND이면 다른 요청에 양보).
+        """
+        if self._closed:
+            raise AnthropicAPIError("클라이언트가 이미 종료되었습니다.")
+
+        timeout = timeout or (self.connect_timeout, self.read_timeout)
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            retry_after = None
+            ticket = None
+            if self.rate_limiter:
+                remaining = deadline - (time.monotonic() - started) if deadline is not None else None
+                ticket = self.rate_limiter.acquire_for(payload, owner=owner, timeout=remaining, priority=priority)
+            try:
+                response = self.session.post(
+                    self.messages_url,
+                    headers=self._headers(api_key),
+                    json=payload,
+                    timeout=timeout,
+                    stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._release(ticket)
+                error = AnthropicAPIError(f"네트워크 오류: {e}")
+            except BaseException as e:
+                # 재시도할 수 없는 요청 오류(잘못된 URL, 리디렉션 초과 등)도 허가는 반드시 돌려줌
+                self._release(ticket)
+                if isinstance(e, requests.RequestException):
+                    raise AnthropicAPIError(f"요청 오류: {e}")
+                raise
+            else:
+                if response.status_code == 200:
+                    if metrics is not None:
+                        metrics["retries"] = attempt
+                        metrics["ttfb"] = response.elapsed.total_seconds()
+                    return response, ticket
+
+                try:
+                    response_text = response.text
+                except requests.RequestException:
+                    # 오류 응답 본문을 읽다가 연결이 끊겨도 허가는 아래에서 돌려줌
+                    response_text = ""
+                error = AnthropicAPIError(
+                    f"API 오류: {response.status_code} - {response_text}",
+                    status_code=response.status_code,
+                    response_text=response_text
+                )
+                response.close()
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                self._release(ticket, response.status_code, response.headers, retry_after=retry_after)
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise error
+
+            if metrics is not None:
+                metrics["retries"] = attempt
+            if attempt >= self.max_retries:
+                raise error
+
+            delay = self._backoff_delay(attempt, retry_after)
+            # 전체 기한을 넘길 재시도는 하지 않음
+            if deadline is not None and time.monotonic() - started + delay > deadline:
+                raise error
+
+            time.sleep(delay)
+            attempt += 1
+
+    def create_message(self, api_key, payload, timeout=None, deadline=None, owner=None, metrics=None,
+                       priority=None):
+        """Messages API를 호출하고 응답 JSON을 반환 (owner는 요청 제한기의 공정 대기열 단위)"""
+        response, ticket = self._post(
+            api_key, payload, timeout=timeout, deadline=deadline, owner=owner, metrics=metrics, priority=priority
+        )
+        try:
+            data = response.json()
+        except BaseException:
+            self._release(ticket, response.status_code, response.headers)
+            raise
+        self._release(ticket, response.status_code, response.headers, usage=data.get("usage"))
+        return data
+
+    def stream_message(self, api_key, payload, timeout=None, deadline=None, owner=None, metrics=None,
+                       priority=None):
+        """스트리밍 모드로 Messages API를 호출하고 MessageStream을 반환
+
+        재시도는 응답 본문을 받기 전(연결 및 상태 코드 확인 단계)에만 적용됩니다.
+        """
+        response, ticket = self._post(
+            api_key, dict(payload, stream=True), timeout=timeout, deadline=deadline, stream=True, owner=owner,
+            metrics=metrics, priority=priority
+        )
+        return MessageStream(
+            response,
+            on_close=lambda stream: self._release(ticket, response.status_code, response.headers, usage=stream.usage)
+        )
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self.session.close()
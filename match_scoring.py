@@ -0,0 +1,248 @@
+# match_scoring.py - API 호출 없이 이력서와 채용 공고의 적합도를 계산하는 로컬 점수 엔진
+import re
+
+import numpy as np
+
+from job_analysis import analysis_keywords, analysis_requirements
+
+# 한국어 단어 끝에서 떼어낼 조사/어미 (긴 것부터 검사)
+_PARTICLES = sorted([
+    "으로서", "으로써", "에서는", "에게서", "이라는", "라는", "으로", "에서", "에게", "까지", "부터", "보다",
+    "처럼", "이며", "이고", "하고", "하여", "하는", "했던", "하며", "이나", "과의", "와의", "및",
+    "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만", "나", "등"
+], key=len, reverse=True)
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by", "from", "as", "is", "are",
+    "be", "we", "you", "our", "your", "will", "can", "etc", "years", "year", "experience"
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*|[가-힣]+")
+_HANGUL = re.compile(r"[가-힣]")
+
+# BM25 매개변수
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _strip_particle(word):
+    for particle in _PARTICLES:
+        if len(word) > len(particle) + 1 and word.endswith(particle):
+            return word[:-len(particle)]
+    return word
+
+
+def tokenize(text):
+    """텍스트를 검색용 토큰 목록으로 변환
+
+    영문/숫자는 소문자 단어로, 한글은 조사를 뗀 뒤 두 글자 단위(바이그램)로 나눕니다.
+    바이그램을 쓰면 '데이터 분석'과 '데이터분석'처럼 띄어쓰기가 달라도 일치합니다.
+    """
+    tokens = []
+    for word in _TOKEN.findall(text.lower()):
+        if _HANGUL.match(word):
+            word = _strip_particle(word)
+            if len(word) == 1:
+                continue
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif word not in _STOPWORDS and len(word) > 1 or word in ("c", "r"):
+            tokens.append(word)
+    return tokens
+
+
+def _analysis_section(analysis_text, heading_pattern):
+    """자유 형식 분석 결과에서 특정 번호 항목(예: '4. 주요 키워드')의 본문 줄들을 꺼냄"""
+    lines = analysis_text.splitlines()
+    collected, inside = [], False
+    for line in lines:
+        stripped = line.strip()
+        is_heading = re.match(r"^(?:#+\s*)?(?:\*\*)?\s*\d+\s*[.)]", stripped) or stripped.startswith("#")
+        if re.search(heading_pattern, stripped):
+            inside = True
+            # 같은 줄에 내용이 이어지는 경우 (예: "4. 주요 키워드: Python, SQL")
+            _, _, rest = stripped.partition(":")
+            if rest.strip(" *[]"):
+                collected.append(rest)
+            continue
+        if inside and is_heading:
+            break
+        if inside and stripped:
+            collected.append(stripped)
+    return collected
+
+
+def _clean_item(item):
+    item = re.sub(r"^[\s\-*•·\d.)]+", "", item).replace("**", "").strip(" []\"'`")
+    # "Python: 설명" 또는 "Python - 설명" 형식이면 앞부분만 사용
+    item = re.split(r"\s*[:：]\s+|\s+[-–—]\s+", item, maxsplit=1)[0]
+    return item.strip(" .")
+
+
+def extract_analysis_keywords(analysis_text):
+    """분석 결과의 주요 키워드 목록 (자유 형식 분석 텍스트는 '주요 키워드' 항목에서 추출)"""
+    if not analysis_text:
+        return []
+    keywords = analysis_keywords(analysis_text)
+    if keywords is not None:
+        return keywords
+    keywords = []
+    for line in _analysis_section(analysis_text, r"주요\s*키워드|key\s*words?"):
+        for item in re.split(r"[,，、/]|\s{2,}", line):
+            item = _clean_item(item)
+            if item and len(item) <= 40 and item not in keywords:
+                keywords.append(item)
+    return keywords
+
+
+def extract_requirements(analysis_text):
+    """분석 결과의 핵심 요구사항 목록 (자유 형식 분석 텍스트는 '핵심 요구사항' 항목에서 추출)"""
+    if not analysis_text:
+        return []
+    requirements = analysis_requirements(analysis_text)
+    if requirements is not None:
+        return requirements
+    requirements = []
+    for line in _analysis_section(analysis_text, r"핵심\s*요구\s*사항|필수\s*요건|requirements?"):
+        item = re.sub(r"^[\s\-*•·\d.)]+", "", line).replace("**", "").strip()
+        if item and item not in requirements:
+            requirements.append(item)
+    return requirements
+
+
+def _literal(text):
+    """공백을 정리한 소문자 문자열 (토큰이 남지 않는 키워드를 그대로 비교할 때 사용)"""
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+class _Vocabulary:
+    def __init__(self):
+        self.index = {}
+
+    def ids(self, tokens):
+        return [self.index.setdefault(token, len(self.index)) for token in tokens]
+
+
+def _count_matrix(token_lists, vocab_size):
+    matrix = np.zeros((len(token_lists), vocab_size), dtype=np.float32)
+    for row, ids in enumerate(token_lists):
+        if ids:
+            np.add.at(matrix[row], ids, 1.0)
+    return matrix
+
+
+def score_matrix(resume_texts, postings):
+    """여러 이력서와 여러 채용 공고의 적합도를 한 번에 계산
+
+    resume_texts: {이력서 이름: 이력서 텍스트}
+    postings: {공고 ID: {"content": 공고 텍스트, "analysis": 분석 결과(dict 또는 자유 형식 텍스트, 없으면 None)}}
+    반환값: {(이력서 이름, 공고 ID): {"score", "keyword_coverage", "similarity", "requirement_coverage",
+             "matched_keywords", "missing_keywords", "missing_requirements"}}
+    """
+    resume_names, posting_ids = list(resume_texts), list(postings)
+    if not resume_names or not posting_ids:
+        return {}
+
+    vocab = _Vocabulary()
+    resume_ids = [vocab.ids(tokenize(resume_texts[name])) for name in resume_names]
+    posting_ids_tokens = [vocab.ids(tokenize(postings[pid]["content"])) for pid in posting_ids]
+
+    keywords = {pid: extract_analysis_keywords(postings[pid].get("analysis")) for pid in posting_ids}
+    requirements = {pid: extract_requirements(postings[pid].get("analysis")) for pid in posting_ids}
+
+    def item_rows(items):
+        """(공고 ID, 항목, 토큰 ID) 행 목록
+
+        'Experience'처럼 불용어만으로 된 항목은 토큰이 남지 않으므로 글자 그대로 비교하고, 비교할 글자도 없으면 제외
+        """
+        rows = []
+        for pid in posting_ids:
+            for item in items[pid]:
+                tokens = set(tokenize(item))
+                if tokens or re.search(r"\w", item):
+                    rows.append((pid, item, vocab.ids(tokens)))
+        return rows
+
+    keyword_rows = item_rows(keywords)
+    requirement_rows = item_rows(requirements)
+
+    size = len(vocab.index)
+    resume_tf = _count_matrix(resume_ids, size)
+    posting_tf = _count_matrix(posting_ids_tokens, size)
+    resume_present = resume_tf > 0
+
+    # BM25: 공고를 질의로, 이력서를 문서로 사용 (IDF는 이력서와 공고 전체에서 계산)
+    corpus_present = np.vstack([resume_present, posting_tf > 0])
+    doc_freq = corpus_present.sum(axis=0)
+    n_docs = corpus_present.shape[0]
+    idf = np.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    doc_len = resume_tf.sum(axis=1, keepdims=True)
+    avg_len = max(float(doc_len.mean()), 1.0)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+    resume_weights = idf * resume_tf * (BM25_K1 + 1) / (resume_tf + norm)
+
+    query = (posting_tf > 0).astype(np.float32)
+    raw_bm25 = query @ resume_weights.T
+    # 질의 단어가 모두 충분히 등장했을 때의 최댓값으로 나눠 0~1로 정규화
+    max_bm25 = np.maximum(query @ (idf * (BM25_K1 + 1)), 1e-9)
+    similarity = raw_bm25 / max_bm25[:, None]
+
+    def coverage(rows):
+        """(공고 ID, 항목, 토큰 ID) 행마다 각 이력서에 담긴 토큰 비율 계산"""
+        if not rows:
+            return np.zeros((0, len(resume_names)), dtype=np.float32)
+        item_matrix = _count_matrix([ids for _, _, ids in rows], size) > 0
+        hits = item_matrix.astype(np.float32) @ resume_present.T.astype(np.float32)
+        totals = np.maximum(item_matrix.sum(axis=1, keepdims=True), 1)
+        result = hits / totals
+        for i, (_, item, ids) in enumerate(rows):
+            if not ids:
+                result[i] = [_literal(item) in text for text in resume_literals]
+        return result
+
+    resume_literals = [_literal(resume_texts[name]) for name in resume_names]
+    keyword_cov = coverage(keyword_rows)
+    requirement_cov = coverage(requirement_rows)
+
+    kw_index, req_index = {pid: [] for pid in posting_ids}, {pid: [] for pid in posting_ids}
+    for i, row in enumerate(keyword_rows):
+        kw_index[row[0]].append(i)
+    for i, row in enumerate(requirement_rows):
+        req_index[row[0]].append(i)
+
+    results = {}
+    for p_idx, pid in enumerate(posting_ids):
+        kw_idx, req_idx = kw_index[pid], req_index[pid]
+        for r_idx, name in enumerate(resume_names):
+            # 키워드의 모든 토큰이 이력서에 있으면 포함된 것으로 판단
+            matched = [keyword_rows[i][1] for i in kw_idx if keyword_cov[i, r_idx] >= 0.999]
+            missing = [keyword_rows[i][1] for i in kw_idx if keyword_cov[i, r_idx] < 0.999]
+            missing_reqs = [requirement_rows[i][1] for i in req_idx if requirement_cov[i, r_idx] < 0.5]
+
+            sim = float(similarity[p_idx, r_idx])
+            kw_score = len(matched) / len(kw_idx) if kw_idx else None
+            req_score = float(requirement_cov[req_idx, r_idx].mean()) if req_idx else None
+
+            # 분석 결과가 없으면 유사도만으로 점수 계산
+            parts = [(sim, 0.3)]
+            if kw_score is not None:
+                parts.append((kw_score, 0.5))
+            if req_score is not None:
+                parts.append((req_score, 0.2))
+            score = 100 * sum(v * w for v, w in parts) / sum(w for _, w in parts)
+
+            results[(name, pid)] = {
+                "score": round(score, 1),
+                "keyword_coverage": kw_score,
+                "similarity": sim,
+                "requirement_coverage": req_score,
+                "matched_keywords": matched,
+                "missing_keywords": missing,
+                "missing_requirements": missing_reqs
+            }
+    return results
+
+
+def score_resume(resume_text, job_content, analysis=None):
+    """이력서 하나와 채용 공고 하나의 적합도 계산"""
+    return score_matrix({"resume": resume_text}, {"job": {"content": job_content, "analysis": analysis}})[("resume", "job")]
@@ -0,0 +1,138 @@
+# model_router.py - 파이프라인 단계별 모델 선택, 검증 실패 시 상위 모델로 다시 시도, 단계별 지연 시간 예산
+import threading
+import time
+from collections import OrderedDict
+
+FAST_MODEL = "claude-3-haiku-20240307"
+
+# 정책에서 모델 대신 쓸 수 있는 이름
+SELECTED = "selected"  # 사용자가 선택한 모델 (사이드바, --model)
+FAST = "fast"          # FAST_MODEL (또는 ModelRouter의 fast_model)
+
+# 단계별 기본 정책: 단계 → (처음 시도할 모델, 지연 시간 예산(초), None이면 클라이언트 기본 시간 제한)
+# 기계적인 작업(분석, 일관성 검토, 섹션 분리/수정, 재구성)은 빠른 모델로 시작하고, 실패하면 선택한 모델로 다시 시도합니다.
+DEFAULT_POLICY = {
+    "analysis": (FAST, 90),
+    "tailoring": (SELECTED, None),
+    "section_tailoring": (SELECTED, None),
+    "consistency": (FAST, 30),
+    "split": (FAST, 30),
+    "section_update": (FAST, 30),
+    "reconstruction": (FAST, 90)
+}
+
+# 남은 예산이 이보다 적으면 상위 모델로 다시 시도하지 않음 (초)
+MIN_ESCALATION_SECONDS = 5
+
+
+def parse_policy(text):
+    """'split=fast:30,analysis=claude-3-haiku-20240307:60,tailoring=selected' 형식의 정책 문자열을
+    {단계: (모델, 예산)}으로 변환 ('all=selected'는 모든 단계에 적용)"""
+    policy = {}
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        stage, _, value = item.partition("=")
+        model, _, budget = value.strip().partition(":")
+        if not stage.strip() or not model:
+            raise Exception(f"모델 정책 항목 '{item.strip()}'의 형식이 올바르지 않습니다. (단계=모델[:예산초])")
+        try:
+            budget = float(budget) if budget else None
+        except ValueError:
+            raise Exception(f"모델 정책 항목 '{item.strip()}'의 예산은 초 단위 숫자여야 합니다.")
+        stages = DEFAULT_POLICY if stage.strip() == "all" else [stage.strip()]
+        for name in stages:
+            policy[name] = (model, budget)
+    return policy
+
+
+class ModelRouter:
+    """단계별 모델 정책에 따라 호출을 실행하고 단계마다 실제로 사용한 모델을 기록
+
+    단계는 정책의 모델로 먼저 실행하고, 응답이 검증에 실패하거나 API 오류가 나면 지연 시간 예산이
+    남아 있는 동안 사용자가 선택한 모델로 한 번 더 시도합니다. 기록은 소유자(세션 등)별로 최근
+    max_owners개만 보관합니다.
+    """
+
+    def __init__(self, policy=None, fast_model=FAST_MODEL, max_owners=1000):
+        self.policy = dict(DEFAULT_POLICY, **(policy or {}))
+        self.fast_model = fast_model
+        self.max_owners = max_owners
+        self._reports = OrderedDict()  # 소유자 → {단계: 보고}
+        self._escalations = {}         # 단계 → 상위 모델로 다시 시도한 횟수
+        self._lock = threading.Lock()
+
+    def _resolve(self, model, selected_model):
+        if model == SELECTED:
+            return selected_model
+        if model == FAST:
+            return self.fast_model
+        return model
+
+    def models(self, stage, selected_model):
+        """단계에서 시도할 모델 순서 (정책의 모델 → 선택한 모델, 같으면 하나)"""
+        first, _ = self.policy.get(stage, (SELECTED, None))
+        return list(dict.fromkeys([self._resolve(first, selected_model), selected_model]))
+
+    def budget(self, stage):
+        return self.policy.get(stage, (SELECTED, None))[1]
+
+    def run(self, stage, selected_model, attempt, on_delta=None, owner=None):
+        """attempt(model, deadline, on_delta)를 모델 순서대로 실행하여 처음 성공한 결과를 반환
+
+        deadline은 단계 예산 중 남은 시간(초, 예산이 없으면 None)입니다. attempt가 예외를 내면
+        (응답 검증 실패 포함) 다음 모델로 넘어가며, 마지막 모델이거나 남은 예산이 부족하거나
+        on_delta로 이미 일부를 내보낸 경우에는 예외를 그대로 전달합니다.
+        """
+        started = time.monotonic()
+        budget = self.budget(stage)
+        models = self.models(stage, selected_model)
+        streamed = [False]
+
+        def tracked(delta):
+            # 내보낸 조각은 되돌릴 수 없으므로, 한 조각이라도 내보냈으면 다른 모델로 다시 시도하지 않음
+            streamed[0] = True
+            on_delta(delta)
+
+        escalated = []
+        for index, model in enumerate(models):
+            remaining = budget - (time.monotonic() - started) if budget else None
+            try:
+                result = attempt(model, remaining, tracked if on_delta else None)
+            except Exception as e:
+                remaining = budget - (time.monotonic() - started) if budget else None
+                if index == len(models) - 1 or streamed[0] or (remaining is not None and remaining < MIN_ESCALATION_SECONDS):
+                    self.record(owner, stage, model, models[0], escalated, time.monotonic() - started, error=e)
+                    raise
+                escalated.append((model, str(e)))
+                with self._lock:
+                    self._escalations[stage] = self._escalations.get(stage, 0) + 1
+                continue
+            self.record(owner, stage, model, models[0], escalated, time.monotonic() - started)
+            return result
+
+    def record(self, owner, stage, model, requested=None, escalated=(), elapsed=0.0, error=None):
+        """단계 실행 결과 기록 (model이 None이면 LLM을 호출하지 않음)"""
+        report = {
+            "model": model,
+            "requested": requested or model,
+            "escalated": list(escalated),
+            "elapsed": elapsed,
+            "error": str(error) if error is not None else None,
+            "at": time.time()
+        }
+        with self._lock:
+            reports = self._reports.setdefault(owner, {})
+            reports[stage] = report
+            self._reports.move_to_end(owner)
+            while len(self._reports) > self.max_owners:
+                self._reports.popitem(last=False)
+
+    def reports(self, owner=None):
+        """소유자의 단계별 최근 실행 보고 {단계: {"model", "requested", "escalated", "elapsed", "error", "at"}}"""
+        with self._lock:
+            return dict(self._reports.get(owner, {}))
+
+    def stats(self):
+        with self._lock:
+            return {"escalations": dict(self._escalations)}
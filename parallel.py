@@ -0,0 +1,24 @@
+# parallel.py - 제한된 동시성으로 여러 작업을 실행하는 도우미
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def run_parallel(tasks, max_workers=8, initializer=None):
+    """(키, 호출 가능 객체) 목록을 제한된 스레드 풀에서 실행
+
+    작업이 끝나는 순서대로 (키, 결과, 오류) 튜플을 내보냅니다.
+    한 작업이 실패해도 나머지 작업은 계속 실행되며, 실패한 작업은 결과 대신 오류가 채워집니다.
+    작업 함수는 스레드에서 실행되므로 st.session_state나 화면 요소에 접근하면 안 됩니다.
+    initializer는 각 작업 스레드가 시작될 때 한 번 호출됩니다.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))), initializer=initializer) as executor:
+        futures = {executor.submit(func): key for key, func in tasks}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                yield key, future.result(), None
+            except Exception as e:
+                yield key, None, e
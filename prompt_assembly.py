@@ -0,0 +1,196 @@
+# prompt_assembly.py - 맞춤화 프롬프트에 넣을 이력서 내용을 중복 제거하고 관련성 순으로 정리
+import hashlib
+import math
+import re
+
+from match_scoring import score_matrix
+from resume_parser import classify_heading
+
+# 기본 이력서 입력 토큰 한도
+DEFAULT_RESUME_TOKEN_BUDGET = 6000
+
+# 이 값 이상 비슷한 문단은 중복으로 간주
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# 정리된 이력서 내용에서 버전이 바뀌는 곳을 표시하는 줄의 머리
+VERSION_MARKER = "### 이력서 버전: "
+
+# 섹션별 맞춤화에서 한 호출에 넣는 섹션 내용의 최대 토큰 수 (넘으면 문단 단위로 나눔)
+DEFAULT_SECTION_TOKEN_LIMIT = 1500
+
+# 첫 섹션 제목 앞의 이름, 연락처 등 머리말
+HEADER_SECTION = "header"
+
+
+def estimate_tokens(text):
+    """입력 토큰 수 추정 (영문은 약 4자당 1토큰, 한글 등은 약 1자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars))
+
+
+def split_paragraphs(text):
+    """빈 줄과 섹션 제목을 기준으로 문단 목록 생성"""
+    paragraphs, current = [], []
+    for line in text.replace("\r\n", "\n").split("\n"):
+        heading = classify_heading(line)
+        if not line.strip() or heading:
+            if current:
+                paragraphs.append("\n".join(current).strip())
+                current = []
+            # 섹션 제목은 따로 한 문단으로 둠
+            if heading:
+                paragraphs.append(line.strip())
+            continue
+        current.append(line.rstrip())
+    if current:
+        paragraphs.append("\n".join(current).strip())
+    return [p for p in paragraphs if p]
+
+
+def _normalize(text):
+    return re.sub(r"[\W_]+", "", text.lower())
+
+
+def _shingles(normalized, size=3):
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def _is_heading_only(paragraph):
+    lines = paragraph.split("\n")
+    return len(lines) == 1 and classify_heading(lines[0]) is not None
+
+
+def assemble_resume_context(resume_versions, job_content, analysis=None, token_budget=DEFAULT_RESUME_TOKEN_BUDGET):
+    """여러 이력서 버전을 하나의 프롬프트용 텍스트로 정리
+
+    1. 버전 사이에서 같거나 거의 같은 문단은 한 번만 남깁니다.
+    2. 남은 문단을 채용 공고(및 분석 결과)와의 로컬 적합도 순으로 정렬합니다.
+    3. 각 버전의 첫 문단(이름/연락처 등)은 항상 포함하고, 나머지는 토큰 한도 안에서 점수 순으로 고릅니다.
+    4. 고른 문단은 원래 순서대로 버전별로 묶어 출력합니다.
+
+    token_budget이 None이면 중복 제거만 합니다.
+    반환값: {"text", "estimated_tokens", "original_tokens", "duplicates_removed", "dropped"}
+    """
+    paragraphs = []  # (버전 이름, 순서, 문단)
+    seen_exact, kept_shingles = set(), []
+    duplicates = 0
+    original_tokens = 0
+
+    for name, text in resume_versions.items():
+        original_tokens += estimate_tokens(text)
+        for order, paragraph in enumerate(split_paragraphs(text)):
+            normalized = _normalize(paragraph)
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+            # 제목만 있는 문단은 버전마다 필요하므로 중복 검사에서 제외
+            if not _is_heading_only(paragraph):
+                if digest in seen_exact:
+                    duplicates += 1
+                    continue
+                shingles = _shingles(normalized)
+                if any(len(shingles & other) / len(shingles | other) >= NEAR_DUPLICATE_THRESHOLD
+                       for other in kept_shingles):
+                    duplicates += 1
+                    continue
+                seen_exact.add(digest)
+                kept_shingles.append(shingles)
+            paragraphs.append((name, order, paragraph))
+
+    selected = set(range(len(paragraphs)))
+    if token_budget is not None:
+        scores = score_matrix(
+            {i: paragraph for i, (_, _, paragraph) in enumerate(paragraphs)},
+            {"job": {"content": job_content, "analysis": analysis}}
+        )
+        pinned = [i for i, (_, order, paragraph) in enumerate(paragraphs) if order == 0 or _is_heading_only(paragraph)]
+        ranked = sorted(
+            (i for i in range(len(paragraphs)) if i not in pinned),
+            key=lambda i: scores[(i, "job")]["score"],
+            reverse=True
+        )
+        selected, used = set(), 0
+        for i in pinned + ranked:
+            cost = estimate_tokens(paragraphs[i][2])
+            if i in pinned or used + cost <= token_budget:
+                selected.add(i)
+                used += cost
+
+    blocks, current_name = [], None
+    for i, (name, _, paragraph) in enumerate(paragraphs):
+        if i not in selected or _is_heading_only(paragraph) and not _section_has_content(paragraphs, selected, i):
+            continue
+        if name != current_name:
+            blocks.append(f"{VERSION_MARKER}{name}")
+            current_name = name
+        blocks.append(paragraph)
+    text = "\n\n".join(blocks)
+
+    return {
+        "text": text,
+        "estimated_tokens": estimate_tokens(text),
+        "original_tokens": original_tokens,
+        "duplicates_removed": duplicates,
+        "dropped": len(paragraphs) - len(selected)
+    }
+
+
+def _section_has_content(paragraphs, selected, heading_index):
+    """제목 문단 뒤에 선택된 본문 문단이 하나라도 있는지 확인 (빈 섹션 제목은 생략)"""
+    name = paragraphs[heading_index][0]
+    for i in range(heading_index + 1, len(paragraphs)):
+        if paragraphs[i][0] != name or _is_heading_only(paragraphs[i][2]):
+            return False
+        if i in selected:
+            return True
+    return False
+
+
+def split_resume_context(text, token_limit=DEFAULT_SECTION_TOKEN_LIMIT):
+    """assemble_resume_context로 정리한 이력서 내용을 섹션별 조각 목록으로 나눔
+
+    여러 버전에 나뉘어 있는 같은 섹션(예: 두 버전의 경력)은 하나로 모으고, 섹션 순서는 처음 나온 순서를 따릅니다.
+    token_limit을 넘는 섹션은 문단 단위로 나누어 조각 하나의 생성 시간이 전체 시간을 좌우하지 않게 합니다.
+    반환값: [{"section", "heading", "text", "part", "parts"}] (heading은 섹션의 첫 조각에만 있고, 머리말은 None)
+    """
+    sections = {}  # 섹션 키 → {"heading", "paragraphs"}
+    current = HEADER_SECTION
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if paragraph.startswith(VERSION_MARKER):
+            # 버전이 바뀌면 다음 제목이 나올 때까지 그 버전의 머리말
+            current = HEADER_SECTION
+            continue
+        if _is_heading_only(paragraph):
+            section, title, _ = classify_heading(paragraph)
+            # 기타 섹션(자격증, 수상 등)은 제목별로 따로 둠
+            current = (section, title.lower() if section == "additional_sections" else "")
+            sections.setdefault(current, {"heading": paragraph, "paragraphs": []})
+            continue
+        sections.setdefault(current, {"heading": None, "paragraphs": []})["paragraphs"].append(paragraph)
+
+    parts = []
+    for key, entry in sections.items():
+        section = key[0] if isinstance(key, tuple) else key
+        if not entry["paragraphs"]:
+            continue
+        chunks, current_chunk, used = [], [], 0
+        for paragraph in entry["paragraphs"]:
+            cost = estimate_tokens(paragraph)
+            if current_chunk and used + cost > token_limit:
+                chunks.append(current_chunk)
+                current_chunk, used = [], 0
+            current_chunk.append(paragraph)
+            used += cost
+        chunks.append(current_chunk)
+        for index, chunk in enumerate(chunks):
+            parts.append({
+                "section": section,
+                "heading": entry["heading"] if index == 0 else None,
+                "text": "\n\n".join(chunk),
+                "part": index + 1,
+                "parts": len(chunks)
+            })
+    return parts
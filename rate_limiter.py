@@ -0,0 +1,300 @@
+# rate_limiter.py - 모든 세션과 스레드가 공유하는 모델별 적응형 요청 제한기
+import datetime
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from prompt_assembly import estimate_tokens
+
+# 요청 우선순위 (백그라운드 요청은 사용자가 기다리는 요청에 양보)
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# 백그라운드 요청이 쓰지 않고 남겨 두는 동시 실행 자리 수
+BACKGROUND_RESERVED_SLOTS = 1
+
+# 응답 헤더 이름 접두부 (예: anthropic-ratelimit-input-tokens-remaining)
+HEADER_PREFIX = "anthropic-ratelimit-"
+
+# 버킷 이름 → 헤더 이름
+BUCKET_HEADERS = {
+    "requests": "requests",
+    "input_tokens": "input-tokens",
+    "output_tokens": "output-tokens"
+}
+
+
+def estimate_request_tokens(payload):
+    """요청 본문의 입력 토큰 수 추정 (시스템 프롬프트 + 메시지)"""
+    texts = []
+    for content in [payload.get("system")] + [m.get("content") for m in payload.get("messages", [])]:
+        if isinstance(content, str):
+            texts.append(content)
+        elif content:
+            texts.extend(block.get("text", "") for block in content)
+    return sum(estimate_tokens(text) for text in texts)
+
+
+def parse_reset(value):
+    """*-reset 헤더(RFC 3339 시각)를 남은 시간(초)으로 변환"""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, reset_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """분당 한도를 초당 속도로 채우는 토큰 버킷 (한도를 모르면 제한하지 않음)"""
+
+    def __init__(self, per_minute=None):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """amount만큼 꺼낼 수 있을 때까지 남은 시간(초)"""
+        self._refill(now)
+        if self.capacity is None:
+            return 0.0
+        # 한도보다 큰 요청은 버킷이 가득 찼을 때 보낼 수 있게 함
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount):
+        if self.capacity is not None:
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        """미리 차감한 양과의 차이를 반영 (음수면 더 차감하며, 남은 양이 음수가 되면 그만큼 다음 요청이 기다림)"""
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, limit, remaining):
+        """응답 헤더의 한도/남은 양으로 버킷 상태를 맞춤"""
+        if limit:
+            if self.capacity is None:
+                self.level = limit
+            self.capacity = limit
+        if remaining is not None and self.capacity is not None:
+            self.level = min(self.level, remaining)
+
+
+class Ticket:
+    """acquire()로 받은 실행 허가 (release()로 반납)"""
+
+    def __init__(self, model, owner, input_tokens, output_tokens, priority=INTERACTIVE):
+        self.model = model
+        self.owner = owner
+        self.priority = priority
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.granted_at = None
+        self.released = False
+
+
+class _ModelState:
+    def __init__(self, limits, concurrency, max_concurrency):
+        self.buckets = {name: TokenBucket(limits.get(name)) for name in BUCKET_HEADERS}
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.successes = 0
+        self.blocked_until = 0.0
+        self.queues = OrderedDict()  # 소유자 → 대기 중인 Ticket들 (소유자 사이에서는 돌아가며 처리)
+        self.background = OrderedDict()  # 백그라운드 요청의 소유자별 대기열
+        self.throttled = 0
+
+
+class RateLimiter:
+    """모델별 요청 수/입력 토큰/출력 토큰 버킷과 동시 실행 수를 관리하는 요청 제한기
+
+    - 요청을 보내기 전에 입력 토큰(추정)과 max_tokens만큼 버킷에서 미리 차감하고,
+      응답의 실제 사용량으로 남은 몫을 돌려받거나 모자란 몫을 더 차감합니다.
+    - anthropic-ratelimit-* 응답 헤더로 한도와 남은 양을 계속 갱신합니다.
+    - 동시 실행 수는 성공하면 조금씩 늘리고 429/529를 받으면 절반으로 줄입니다.
+    - 대기 중인 요청은 소유자(세션)별로 돌아가며 처리하여 한 세션이 독점하지 않게 합니다.
+    - 백그라운드 요청(priority=BACKGROUND)은 일반 요청이 기다리고 있거나 한도에 가까우면 기다리며,
+      동시 실행 자리를 BACKGROUND_RESERVED_SLOTS개 남겨 둡니다.
+    """
+
+    def __init__(self, limits=None, initial_concurrency=4, max_concurrency=16):
+        self.limits = limits or {}
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self._models = {}
+        self._cond = threading.Condition()
+
+    def _state(self, model):
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelState(
+                self.limits, min(self.initial_concurrency, self.max_concurrency), self.max_concurrency
+            )
+        return state
+
+    def acquire(self, model, input_tokens, output_tokens, owner=None, timeout=None, priority=INTERACTIVE):
+        """요청을 보내도 될 때까지 기다렸다가 Ticket을 반환 (timeout 초 안에 못 받으면 예외)"""
+        ticket = Ticket(model, owner, input_tokens, output_tokens, priority)
+        throttled = False
+        amounts = {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens}
+        give_up_at = time.monotonic() + timeout if timeout is not None else None
+
+        with self._cond:
+            state = self._state(model)
+            self._queues_for(state, ticket).setdefault(owner, deque()).append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._is_next(state, ticket, now):
+                        wait = max(
+                            [state.blocked_until - now] +
+                            [bucket.wait_time(amounts[name], now) for name, bucket in state.buckets.items()]
+                        )
+                        if wait <= 0:
+                            for name, bucket in state.buckets.items():
+                                bucket.take(amounts[name])
+                            state.in_flight += 1
+                            ticket.granted_at = now
+                            self._dequeue(state, ticket)
+                            self._cond.notify_all()
+                            return ticket
+                    if not throttled:
+                        throttled = True
+                        state.throttled += 1
+                    if give_up_at is not None:
+                        if now >= give_up_at:
+                            raise Exception("요청 제한 대기 시간을 초과했습니다.")
+                        wait = min(wait if wait is not None else math.inf, give_up_at - now)
+                    self._cond.wait(timeout=min(wait, 1.0) if wait is not None else 1.0)
+            except BaseException:
+                if ticket.granted_at is None:
+                    self._dequeue(state, ticket)
+                    self._cond.notify_all()
+                raise
+
+    def acquire_for(self, payload, owner=None, timeout=None, priority=INTERACTIVE):
+        """Messages API 요청 본문으로 토큰을 추정해 acquire() 호출 (출력은 max_tokens 기준)"""
+        return self.acquire(
+            payload.get("model"), estimate_request_tokens(payload), payload.get("max_tokens", 0),
+            owner=owner, timeout=timeout, priority=priority
+        )
+
+    def _queues_for(self, state, ticket):
+        return state.background if ticket.priority == BACKGROUND else state.queues
+
+    def _is_next(self, state, ticket, now):
+        """지금 실행 자리를 받을 차례인지 확인 (맨 앞 소유자의 가장 오래된 요청, 백그라운드 요청은 양보 조건 확인)"""
+        if ticket.priority != BACKGROUND:
+            queue = next(iter(state.queues.values()))
+            return queue[0] is ticket and state.in_flight < state.concurrency
+        queue = next(iter(state.background.values()))
+        return (
+            queue[0] is ticket and not state.queues
+            and state.in_flight < max(1, state.concurrency - BACKGROUND_RESERVED_SLOTS)
+            and state.blocked_until <= now and not self._near_limit(state, now)
+        )
+
+    def _dequeue(self, state, ticket):
+        queues = self._queues_for(state, ticket)
+        queue = queues.get(ticket.owner)
+        if queue is None or ticket not in queue:
+            return
+        was_head = queue[0] is ticket
+        queue.remove(ticket)
+        if not queue:
+            del queues[ticket.owner]
+        elif was_head:
+            # 처리된 소유자는 맨 뒤로 보내 다른 소유자에게 차례를 넘김
+            queues.move_to_end(ticket.owner)
+
+    def release(self, ticket, status_code=None, headers=None, usage=None, retry_after=None):
+        """요청이 끝나면 호출하여 실제 사용량과 응답 헤더를 반영"""
+        if ticket is None:
+            return
+        with self._cond:
+            # 여러 스레드가 같은 Ticket을 반납해도 한 번만 반영
+            if ticket.released:
+                return
+            ticket.released = True
+            state = self._state(ticket.model)
+            state.in_flight -= 1
+
+            if usage:
+                # 미리 차감한 추정치와 실제 사용량의 차이를 반영 (추정보다 많이 썼으면 더 차감)
+                used_input = sum(usage.get(k, 0) or 0 for k in ("input_tokens", "cache_creation_input_tokens"))
+                state.buckets["input_tokens"].give_back(ticket.input_tokens - used_input)
+                state.buckets["output_tokens"].give_back(ticket.output_tokens - (usage.get("output_tokens") or 0))
+            elif status_code is not None and status_code != 200:
+                # 처리되지 않은 요청의 토큰은 돌려받음 (요청 수는 그대로 차감)
+                state.buckets["input_tokens"].give_back(ticket.input_tokens)
+                state.buckets["output_tokens"].give_back(ticket.output_tokens)
+
+            if headers:
+                self._sync_headers(state, headers)
+
+            if status_code in (429, 529):
+                state.concurrency = max(1, state.concurrency // 2)
+                state.successes = 0
+                if retry_after:
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+            elif status_code == 200:
+                state.successes += 1
+                if state.successes >= state.concurrency and not self._near_limit(state):
+                    state.concurrency = min(state.max_concurrency, state.concurrency + 1)
+                    state.successes = 0
+            self._cond.notify_all()
+
+    def _sync_headers(self, state, headers):
+        for name, header in BUCKET_HEADERS.items():
+            limit = _int_header(headers, f"{HEADER_PREFIX}{header}-limit")
+            remaining = _int_header(headers, f"{HEADER_PREFIX}{header}-remaining")
+            if limit is not None or remaining is not None:
+                state.buckets[name].sync(limit, remaining)
+            # 남은 양이 없으면 서버가 알려준 초기화 시각까지 모두 기다림
+            reset = parse_reset(headers.get(f"{HEADER_PREFIX}{header}-reset"))
+            if remaining == 0 and reset:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + reset)
+
+    def _near_limit(self, state, now=None):
+        """어느 버킷이든 남은 양이 한도의 10% 미만인지 확인 (동시 실행 수를 늘리지 않고 백그라운드 요청을 미룸)"""
+        if now is not None:
+            for bucket in state.buckets.values():
+                bucket._refill(now)
+        return any(
+            bucket.capacity is not None and bucket.level < bucket.capacity * 0.1
+            for bucket in state.buckets.values()
+        )
+
+    def stats(self):
+        with self._cond:
+            return {
+                model: {
+                    "concurrency": state.concurrency,
+                    "in_flight": state.in_flight,
+                    "waiting": sum(len(queue) for queue in state.queues.values()),
+                    "background_waiting": sum(len(queue) for queue in state.background.values()),
+                    "throttled": state.throttled,
+                    "limits": {name: bucket.capacity for name, bucket in state.buckets.items()}
+                }
+                for model, state in self._models.items()
+            }
+
+
+def _int_header(headers, name):
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,423 @@
+# resume_parser.py - 이력서를 섹션별 JSON으로 분리하는 로컬 파서
+import json
+import re
+
+# 섹션 분리 결과 JSON 형식 (LLM 분리 프롬프트와 로컬 파서가 같은 형식을 사용)
+SECTION_KEYS = ("professional_summary", "work_experience", "education", "skills", "projects", "additional_sections")
+
+# 이 값 이상이면 LLM 호출 없이 로컬 파싱 결과를 사용
+# (bench/bench_resume_parser.py --calibrate로 코퍼스의 기준 결과와 비교해 정한 값. 0.7인 문서도 잘못 분리되는 경우가 있음)
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+# 제목 문자열(공백 제거, 소문자) → 섹션 키
+HEADING_KEYWORDS = {
+    "professional_summary": [
+        "요약", "전문요약", "자기소개", "소개", "프로필", "개요", "경력요약", "핵심역량요약",
+        "summary", "professionalsummary", "profile", "about", "aboutme", "objective", "careersummary", "overview"
+    ],
+    "work_experience": [
+        "경력", "경력사항", "경력기술", "경력기술서", "직무경험", "업무경험", "경험", "근무경력", "주요경력", "직장경력",
+        "experience", "workexperience", "professionalexperience", "employment", "employmenthistory", "workhistory",
+        "careerhistory", "career"
+    ],
+    "education": [
+        "학력", "학력사항", "교육", "교육사항", "교육이력", "학력및교육",
+        "education", "educationbackground", "academicbackground"
+    ],
+    "skills": [
+        "기술", "보유기술", "기술스택", "스킬", "역량", "핵심역량", "보유역량", "기술역량", "사용기술",
+        "skills", "technicalskills", "coreskills", "skillset", "techstack", "competencies", "corecompetencies"
+    ],
+    "projects": [
+        "프로젝트", "프로젝트경험", "주요프로젝트", "수행프로젝트", "프로젝트이력",
+        "projects", "project", "personalprojects", "keyprojects", "selectedprojects", "sideprojects"
+    ],
+    "additional_sections": [
+        "자격증", "자격사항", "자격", "수상", "수상경력", "수상내역", "어학", "외국어", "어학능력", "대외활동", "활동",
+        "봉사", "봉사활동", "논문", "발표", "출판", "특허", "병역", "병역사항", "관심분야", "기타",
+        "certifications", "certificates", "licenses", "awards", "honors", "languages", "activities",
+        "publications", "volunteer", "volunteering", "interests", "patents", "leadership", "achievements"
+    ]
+}
+
+_KEYWORD_TO_SECTION = {
+    keyword: section for section, keywords in HEADING_KEYWORDS.items() for keyword in keywords
+}
+
+# 제목 앞뒤 장식 문자
+_HEADING_DECORATION = re.compile(r"^[\s#*\[\]【】<>《》■□●○◆◇▶▷►◼✔︎✓\-=_|:：.\d]+|[\s*\[\]【】<>《》:：=_|\-]+$")
+_MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BULLET = re.compile(r"^\s*(?:[-•*·○▪◦‣∙●■□◆▶►✓✔]|\d{1,2}[.)])\s+")
+
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = (
+    r"(?:(?:19|20)\d{2}(?:\s*[./\-년]\s*\d{1,2}\s*월?)?(?:\s*[./\-]\s*\d{1,2})?"
+    rf"|{_MONTHS}\s+(?:19|20)\d{{2}}"
+    r"|\d{1,2}\s*/\s*(?:19|20)\d{2})"
+)
+_PRESENT = r"(?:현재|재직\s*중|재직중|진행\s*중|present|current|now|today)"
+DATE_RANGE = re.compile(
+    rf"\(?\s*{_DATE}\s*(?:[~\-–—]|to|부터)\s*(?:{_DATE}|{_PRESENT})?\s*(?:까지)?\s*\)?"
+    rf"(?:\s*\(?\s*\d+\s*(?:년|개월|yrs?|years?|mos?|months?)[^)]*\)?)?",
+    re.IGNORECASE
+)
+_SINGLE_DATE = re.compile(rf"\(?\s*{_DATE}\s*(?:졸업|입학|수료|중퇴)?\s*\)?", re.IGNORECASE)
+
+_CONTACT = re.compile(
+    r"@|https?://|www\.|linkedin|github\.com|\b\d{2,3}[-.\s]\d{3,4}[-.\s]\d{4}\b|전화|연락처|이메일|e-?mail|phone|주소|address",
+    re.IGNORECASE
+)
+
+_COMPANY_MARKERS = re.compile(
+    r"주식회사|\(주\)|㈜|회사|그룹|은행|증권|전자|테크|랩스|코리아|스튜디오|연구소|재단|공사|"
+    r"\b(?:inc|corp|corporation|co|ltd|llc|gmbh|labs?|technologies|group|bank|studio|company)\b\.?",
+    re.IGNORECASE
+)
+_TITLE_MARKERS = re.compile(
+    r"개발자|엔지니어|매니저|팀장|파트장|리드|인턴|연구원|디자이너|기획자|마케터|분석가|컨설턴트|대표|이사|사원|주임|대리|과장|차장|부장|책임|선임|수석|"
+    r"\b(?:engineer|developer|manager|intern|designer|analyst|lead|director|scientist|consultant|"
+    r"architect|specialist|associate|head|officer|administrator|researcher|founder|programmer)\b",
+    re.IGNORECASE
+)
+_INSTITUTION_MARKERS = re.compile(
+    r"대학교|대학원|대학|학교|학원|아카데미|부트캠프|\b(?:university|college|institute|school|academy|bootcamp)\b",
+    re.IGNORECASE
+)
+
+_SEPARATORS = re.compile(r"\s+[|｜/·•]\s+|\s+[-–—]\s+|\s*,\s+|\s+@\s+|\s+at\s+")
+
+
+def _normalize_heading(text):
+    return re.sub(r"\s+", "", text).lower()
+
+
+def is_contact_line(line):
+    """줄에 이메일, 전화번호, 링크 같은 연락처 정보가 있으면 True"""
+    return bool(_CONTACT.search(line))
+
+
+def classify_heading(line):
+    """줄이 섹션 제목이면 (섹션 키, 제목 텍스트, 마크다운 수준)을, 아니면 None을 반환"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40 or _BULLET.match(stripped) and not stripped.startswith(("*", "#")):
+        return None
+
+    level = 0
+    match = _MARKDOWN_HEADING.match(stripped)
+    if match:
+        level = len(match.group(1))
+
+    title = _HEADING_DECORATION.sub("", stripped.replace("**", "")).strip()
+    if not title:
+        return None
+    section = _KEYWORD_TO_SECTION.get(_normalize_heading(title))
+    if section is None:
+        return None
+    return section, title, level
+
+
+def _is_bullet(line):
+    return bool(_BULLET.match(line))
+
+
+def _strip_bullet(line):
+    return _BULLET.sub("", line, count=1).strip()
+
+
+def _strip_markup(line):
+    line = _MARKDOWN_HEADING.sub(r"\2", line.strip())
+    return line.replace("**", "").replace("__", "").strip()
+
+
+def _looks_like_entry_header(line):
+    """항목(회사, 학교, 프로젝트) 시작 줄처럼 보이는지 판단"""
+    stripped = line.strip()
+    if _MARKDOWN_HEADING.match(stripped) or (stripped.startswith("**") and stripped.endswith("**")):
+        return True
+    if DATE_RANGE.search(stripped):
+        return True
+    return len(stripped) <= 60 and not stripped.endswith((".", "다.", "요.", "함", "음"))
+
+
+def _split_entries(lines):
+    """항목 목록 섹션을 (머리 줄 목록, 본문 줄 목록) 항목들로 분리"""
+    entries = []
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            if current is not None and current["body"]:
+                current["closed"] = True
+            continue
+
+        # 날짜 범위가 있는 글머리 줄(예: "■ 회사 / 직위 (2020.03 ~ 현재)")은 항목 머리로 취급
+        if _is_bullet(stripped) and DATE_RANGE.search(stripped) and (current is None or current["body"] or current["closed"]):
+            current = {"header": [_strip_markup(_strip_bullet(stripped))], "body": [], "closed": False}
+            entries.append(current)
+            continue
+
+        if _is_bullet(stripped):
+            if current is None:
+                current = {"header": [], "body": [], "closed": False}
+                entries.append(current)
+            current["body"].append(stripped)
+            continue
+
+        header_like = _looks_like_entry_header(stripped)
+        starts_new = current is None or (header_like and (current["body"] or current["closed"]))
+        if starts_new:
+            current = {"header": [], "body": [], "closed": False}
+            entries.append(current)
+
+        if header_like and not current["body"]:
+            current["header"].append(_strip_markup(stripped))
+        else:
+            current["body"].append(stripped)
+    return entries
+
+
+def _extract_dates(header_lines):
+    """머리 줄에서 날짜 범위를 떼어내고 (날짜 목록, 나머지 줄 목록) 반환"""
+    dates, rest = [], []
+    for line in header_lines:
+        found = [m.group(0).strip(" ()") for m in DATE_RANGE.finditer(line)]
+        remaining = DATE_RANGE.sub(" ", line)
+        if not found:
+            found = [m.group(0).strip(" ()") for m in _SINGLE_DATE.finditer(remaining)]
+            remaining = _SINGLE_DATE.sub(" ", remaining)
+        dates.extend(d for d in found if d)
+        remaining = re.sub(r"\(\s*\)", " ", remaining)
+        remaining = re.sub(r"\s{2,}", " ", remaining).strip(" |,-–—·/")
+        if remaining:
+            rest.append(remaining)
+    return dates, rest
+
+
+def _header_parts(header_lines):
+    parts = []
+    for line in header_lines:
+        for part in _SEPARATORS.split(line):
+            part = part.strip(" |,()")
+            if part:
+                parts.append(part)
+    return parts
+
+
+def _assign_pair(parts, first_marker, second_marker):
+    """머리 부분들 중 두 종류(예: 직위/회사)에 해당하는 값을 표지 단어로 골라냄"""
+    first = next((p for p in parts if first_marker.search(p)), None)
+    second = next((p for p in parts if second_marker.search(p) and p != first), None)
+    leftovers = [p for p in parts if p not in (first, second)]
+    if first is None and leftovers:
+        first = leftovers.pop(0)
+    if second is None and leftovers:
+        second = leftovers.pop(0)
+    return first or "", second or ""
+
+
+def _entry_content(dates, body):
+    lines = []
+    if dates:
+        lines.append(" - ".join(dates) if len(dates) == 2 and "~" not in dates[0] else ", ".join(dates))
+    lines.extend(body)
+    return "\n".join(lines)
+
+
+def _parse_experience(lines):
+    entries = []
+    for entry in _split_entries(lines):
+        dates, header = _extract_dates(entry["header"])
+        parts = _header_parts(header)
+        title, company = _assign_pair(parts, _TITLE_MARKERS, _COMPANY_MARKERS)
+        # 회사/직위 표지가 모두 없고 첫 줄이 회사명처럼 보이는 한국어 형식(회사 | 직위)
+        if not _TITLE_MARKERS.search(title) and _TITLE_MARKERS.search(company):
+            title, company = company, title
+        entries.append({"title": title, "company": company, "content": _entry_content(dates, entry["body"])})
+    return entries
+
+
+def _parse_education(lines):
+    entries = []
+    for entry in _split_entries(lines):
+        dates, header = _extract_dates(entry["header"])
+        parts = _header_parts(header)
+        institution, degree = _assign_pair(parts, _INSTITUTION_MARKERS, re.compile(r".+"))
+        entries.append({"degree": degree, "institution": institution, "content": _entry_content(dates, entry["body"])})
+    return entries
+
+
+def _parse_projects(lines):
+    entries = []
+    for entry in _split_entries(lines):
+        dates, header = _extract_dates(entry["header"])
+        name = " - ".join(header) if header else ""
+        entries.append({"name": name, "content": _entry_content(dates, entry["body"])})
+    return entries
+
+
+def _parse_skills(lines):
+    skills = []
+    for line in lines:
+        text = _strip_bullet(line) if _is_bullet(line) else line.strip()
+        text = _strip_markup(text)
+        if not text:
+            continue
+        # "언어: Python, Java" 형식이면 분류 이름은 버림
+        if re.match(r"^[^,:：]{1,25}[:：]", text):
+            text = re.split(r"[:：]", text, maxsplit=1)[1]
+        for item in re.split(r"\s*[,，、|/·•]\s*|\s{2,}", text):
+            item = item.strip(" .-")
+            if item and item not in skills:
+                skills.append(item)
+    return skills
+
+
+def _text(lines):
+    return "\n".join(line.strip() for line in lines).strip()
+
+
+def empty_sections():
+    return {
+        "professional_summary": "",
+        "work_experience": [],
+        "education": [],
+        "skills": [],
+        "projects": [],
+        "additional_sections": []
+    }
+
+
+def parse_resume_sections(resume_text):
+    """이력서 텍스트를 섹션 JSON 형식으로 분리하고 (섹션, 신뢰도 0~1)을 반환
+
+    제목 줄(한국어/영어), 글머리 기호, 날짜 범위를 기준으로 나누며 외부 호출 없이 동작합니다.
+    신뢰도가 낮으면 호출하는 쪽에서 LLM 분리로 대체하는 것을 권장합니다.
+    """
+    lines = resume_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+    # 제목 줄 기준으로 구간 나누기
+    preamble, blocks = [], []
+    current = None
+    for line in lines:
+        heading = classify_heading(line)
+        if heading:
+            section, title, level = heading
+            current = {"section": section, "title": title, "level": level, "lines": []}
+            blocks.append(current)
+        elif current is None:
+            preamble.append(line)
+        else:
+            current["lines"].append(line)
+
+    sections = empty_sections()
+    for block in blocks:
+        section, body = block["section"], block["lines"]
+        if section == "professional_summary":
+            text = _text(body)
+            sections["professional_summary"] = (sections["professional_summary"] + "\n\n" + text).strip()
+        elif section == "work_experience":
+            sections["work_experience"].extend(_parse_experience(body))
+        elif section == "education":
+            sections["education"].extend(_parse_education(body))
+        elif section == "skills":
+            sections["skills"].extend(s for s in _parse_skills(body) if s not in sections["skills"])
+        elif section == "projects":
+            sections["projects"].extend(_parse_projects(body))
+        else:
+            sections["additional_sections"].append({"title": block["title"], "content": _text(body)})
+
+    # 요약 제목이 없으면 머리말의 문장형 단락을 요약으로 사용
+    summary_inferred = False
+    if not sections["professional_summary"]:
+        sentences = [
+            line.strip() for line in preamble
+            if len(line.strip()) >= 40 and not _CONTACT.search(line)
+        ]
+        if sentences:
+            sections["professional_summary"] = "\n".join(sentences)
+            summary_inferred = True
+
+    return sections, _confidence(sections, blocks, preamble, summary_inferred)
+
+
+def _confidence(sections, blocks, preamble, summary_inferred):
+    if not blocks:
+        return 0.0
+
+    score = 0.0
+    distinct = {block["section"] for block in blocks}
+    score += {1: 0.1, 2: 0.25}.get(len(distinct), 0.4)
+
+    experiences = sections["work_experience"]
+    if experiences:
+        named = sum(1 for e in experiences if e["title"] or e["company"])
+        score += 0.3 * named / len(experiences)
+    elif "work_experience" in distinct:
+        score -= 0.2
+
+    if sections["skills"] or sections["education"]:
+        score += 0.15
+
+    body_lines = sum(1 for block in blocks for line in block["lines"] if line.strip())
+    preamble_lines = sum(1 for line in preamble if line.strip())
+    if preamble_lines > 0.4 * (body_lines + preamble_lines):
+        score -= 0.2
+    else:
+        score += 0.15
+
+    if summary_inferred:
+        score -= 0.05
+    return max(0.0, min(1.0, score))
+
+
+# LLM 분리용 프롬프트
+SPLIT_PROMPT_TEMPLATE = """
+            다음 이력서를 주요 섹션으로 분리해주세요:
+
+            {resume_text}
+
+            다음 형식으로 분리된 섹션들을 JSON 형식으로 반환해주세요:
+            {{
+              "professional_summary": "전문 요약 내용...",
+              "work_experience": [
+                {{"title": "직위1", "company": "회사1", "content": "상세 내용..."}},
+                {{"title": "직위2", "company": "회사2", "content": "상세 내용..."}}
+              ],
+              "education": [
+                {{"degree": "학위1", "institution": "학교1", "content": "상세 내용..."}},
+                {{"degree": "학위2", "institution": "학교2", "content": "상세 내용..."}}
+              ],
+              "skills": ["기술1", "기술2", "기술3"],
+              "projects": [
+                {{"name": "프로젝트1", "content": "상세 내용..."}},
+                {{"name": "프로젝트2", "content": "상세 내용..."}}
+              ],
+              "additional_sections": [
+                {{"title": "섹션 제목1", "content": "상세 내용..."}},
+                {{"title": "섹션 제목2", "content": "상세 내용..."}}
+              ]
+            }}
+
+            JSON 형식만 출력해주세요.
+            """
+
+
+def extract_json_object(text):
+    """LLM 응답에서 JSON 객체 부분을 꺼내 변환 (코드 블록이나 앞뒤 설명이 있어도 처리)"""
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end == -1:
+        raise ValueError("응답에서 JSON 객체를 찾을 수 없습니다.")
+    return json.loads(text[start:end + 1])
+
+
+def parse_sections_json(text):
+    """LLM 응답에서 섹션 JSON을 꺼내 dict로 변환 (코드 블록이나 앞뒤 설명이 있어도 처리)"""
+    sections = extract_json_object(text)
+    if not isinstance(sections, dict):
+        raise ValueError("섹션 JSON이 객체 형식이 아닙니다.")
+    result = empty_sections()
+    result.update({key: value for key, value in sections.items() if key in SECTION_KEYS})
+    return result
@@ -0,0 +1,46 @@
+# single_flight.py - 같은 키로 동시에 들어온 요청을 하나의 실행으로 합치는 도구
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 기다림
+
+    결과(또는 예외)는 실행이 끝나는 즉시 기다리던 모든 호출자에게 전달되며,
+    결과를 보관하지는 않으므로 완료 후 같은 키로 호출하면 다시 실행합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, timeout=None):
+        """fn()을 실행하거나 실행 중인 같은 작업을 기다려 (결과, 직접 실행 여부)를 반환"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(timeout=timeout), False
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, True
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
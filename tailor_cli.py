@@ -0,0 +1,199 @@
+# tailor_cli.py - 브라우저 없이 폴더 단위로 채용 공고 분석과 이력서 맞춤화를 실행하는 명령줄 도구
+#
+# 사용법:
+#   python tailor_cli.py analyze --postings postings/ --out out/
+#   python tailor_cli.py tailor --resumes resumes/ --postings postings/ --out out/ --workers 8
+#   python tailor_cli.py tailor --resumes resumes/ --postings postings/ --out out/ --by-section
+#   python tailor_cli.py import --workspace default --postings scraped.jsonl --resumes resumes/
+#
+# 폴더의 .txt/.md 파일 하나가 이력서 또는 채용 공고 하나이며, 파일 이름(확장자 제외)이 이름/제목이 됩니다.
+# 결과는 out/analyses/<공고>.json(분석 결과 JSON)과 .md, out/tailored/<공고>.md에 저장됩니다.
+# API 키는 --api-key 또는 ANTHROPIC_API_KEY, 그 밖의 설정은 앱과 같은 환경 변수를 사용합니다.
+# --model은 맞춤화에 쓰는 모델이며, 나머지 단계의 모델은 MODEL_POLICY 환경 변수의 단계별 정책을 따릅니다.
+# import는 앱의 데이터 저장소(작업 공간)에 폴더/JSONL/CSV의 문서를 가져오며, 같거나 유사한 문서는 합치거나 표시합니다.
+# Streamlit을 import하지 않으므로 작업 노드의 야간 일괄 작업에서도 빠르게 시작합니다.
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from bulk_import import DEFAULT_MAX_DISTANCE, ON_DUPLICATE, import_documents
+from data_store import DataStore
+from job_analysis import format_analysis
+from parallel import run_parallel
+from prompt_assembly import DEFAULT_RESUME_TOKEN_BUDGET
+from tailor_core import TailorCore
+
+DEFAULT_MODEL = "claude-3-5-sonnet-20240620"
+TEXT_EXTENSIONS = (".txt", ".md")
+
+
+def read_documents(directory):
+    """폴더의 텍스트 파일들을 {파일 이름(확장자 제외): 내용}으로 읽음 (이름순)"""
+    documents = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        name, ext = os.path.splitext(os.path.basename(path))
+        if ext.lower() in TEXT_EXTENSIONS and os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            if content.strip():
+                documents[name] = content
+    if not documents:
+        raise Exception(f"'{directory}'에서 읽을 수 있는 .txt/.md 파일을 찾지 못했습니다.")
+    return documents
+
+
+def write_output(out_dir, kind, name, text, ext=".md"):
+    directory = os.path.join(out_dir, kind)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}{ext}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def load_settings(path):
+    """맞춤화 설정 JSON (앱의 맞춤화 설정과 같은 형식: emphasis_skills, deemphasize_skills, tone, length)"""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        settings = json.load(f)
+    if not isinstance(settings, dict):
+        raise Exception("맞춤화 설정 파일은 JSON 객체여야 합니다.")
+    return settings
+
+
+def run(args):
+    api_key = args.api_key or os.environ.get("ANTHROPIC_API_KEY", "")
+    if not api_key:
+        raise Exception("API 키가 설정되지 않았습니다. --api-key 또는 ANTHROPIC_API_KEY를 지정해주세요.")
+
+    core = TailorCore.from_env(cache_dir=args.cache_dir)
+    postings = read_documents(args.postings)
+    resumes = read_documents(args.resumes) if args.command == "tailor" else None
+    settings = load_settings(getattr(args, "settings", None))
+    use_cache = not args.no_cache
+
+    def process(title, content):
+        analysis = core.analyze_job(
+            content, args.model, api_key, use_cache=use_cache, force_refresh=args.force_refresh
+        )
+        outputs = [
+            write_output(args.out, "analyses", title, json.dumps(analysis, ensure_ascii=False, indent=2), ext=".json"),
+            write_output(args.out, "analyses", title, format_analysis(analysis))
+        ]
+        if resumes is not None:
+            tailor = core.tailor_by_section if args.by_section else core.tailor
+            tailored = tailor(
+                title, content, analysis, resumes, settings, args.model, api_key,
+                token_budget=args.token_budget, use_cache=use_cache, force_refresh=args.force_refresh
+            )
+            outputs.append(write_output(args.out, "tailored", title, tailored))
+            failed_sections = (core.last_usage() or {}).get("failed_sections")
+            if failed_sections:
+                print(f"{title}: 맞춤화에 실패해 원래 내용을 그대로 쓴 섹션 - {', '.join(failed_sections)}", file=sys.stderr)
+        return outputs
+
+    tasks = [(title, lambda t=title, c=content: process(t, c)) for title, content in postings.items()]
+    started = time.monotonic()
+    failed = 0
+    for done, (title, outputs, error) in enumerate(run_parallel(tasks, max_workers=args.workers), start=1):
+        if error is None:
+            print(f"[{done}/{len(tasks)}] {title}: {', '.join(outputs)}")
+        else:
+            failed += 1
+            print(f"[{done}/{len(tasks)}] {title}: 실패 - {error}", file=sys.stderr)
+
+    # 단계별 정책에 따라 여러 모델을 쓰므로 모든 모델의 통계를 합침
+    summary = core.telemetry.summary().values()
+    print(
+        f"완료 {len(tasks) - failed}개, 실패 {failed}개, {time.monotonic() - started:.1f}초 "
+        f"(API 호출 {sum(s['api_calls'] for s in summary)}회, 캐시/합치기 {sum(s['cached'] for s in summary)}회, "
+        f"예상 비용 ${sum(s['cost_usd'] for s in summary):.4f})",
+        file=sys.stderr
+    )
+    escalations = core.router.stats()["escalations"]
+    if escalations:
+        print(f"상위 모델로 다시 시도: {escalations}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_import(args):
+    data_dir = args.data_dir or os.environ.get(
+        "RESUME_TAILOR_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    )
+    store = DataStore(os.path.join(data_dir, "resume_tailor.sqlite3"))
+    failed = 0
+    for kind, sources in (("resumes", args.resumes), ("job_postings", args.postings)):
+        if not sources:
+            continue
+        started = time.monotonic()
+        report = import_documents(
+            store, args.workspace, kind, sources, on_duplicate=args.on_duplicate, max_distance=args.max_distance,
+            on_progress=lambda read: print(f"{kind}: {read}개 읽음", file=sys.stderr)
+        )
+        print(
+            f"{kind}: {report['read']}개 중 {report['added']}개 추가, {report['updated']}개 갱신, "
+            f"{len(report['merged'])}개 합침, {len(report['flagged'])}개 유사 문서로 표시, "
+            f"{len(report['errors'])}개 오류 ({time.monotonic() - started:.1f}초)"
+        )
+        for source, title, existing, distance in report['flagged']:
+            print(f"  유사: {source} ({title}) ≈ {existing} (차이 {distance}비트)")
+        for source, error in report['errors']:
+            print(f"  오류: {source}: {error}", file=sys.stderr)
+        failed += len(report['errors'])
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="채용 공고 분석과 이력서 맞춤화 일괄 실행")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--postings", required=True, help="채용 공고 파일 폴더")
+    common.add_argument("--out", required=True, help="결과를 저장할 폴더")
+    common.add_argument("--model", default=DEFAULT_MODEL)
+    common.add_argument("--api-key", default=None, help="지정하지 않으면 ANTHROPIC_API_KEY 사용")
+    common.add_argument("--workers", type=int, default=4, help="동시에 처리할 채용 공고 수")
+    common.add_argument("--cache-dir", default=None, help="응답 캐시와 공유 분석 결과 폴더 (기본값: RESUME_TAILOR_CACHE_DIR 또는 .cache)")
+    common.add_argument("--no-cache", action="store_true", help="응답 캐시를 사용하지 않음")
+    common.add_argument("--force-refresh", action="store_true", help="캐시와 공유 분석 결과를 읽지 않고 새로 생성")
+
+    subparsers.add_parser("analyze", parents=[common], help="채용 공고 분석")
+    tailor = subparsers.add_parser("tailor", parents=[common], help="채용 공고 분석 후 이력서 맞춤화")
+    tailor.add_argument("--resumes", required=True, help="이력서 파일 폴더 (모든 파일을 이력서 버전으로 사용)")
+    tailor.add_argument("--settings", default=None, help="맞춤화 설정 JSON 파일")
+    tailor.add_argument("--token-budget", type=int, default=DEFAULT_RESUME_TOKEN_BUDGET,
+                        help="프롬프트에 넣을 이력서 내용의 최대 토큰 수")
+    tailor.add_argument("--by-section", action="store_true",
+                        help="이력서를 섹션별로 나누어 동시에 맞춤화한 뒤 합침 (긴 이력서의 대기 시간 단축)")
+
+    importer = subparsers.add_parser("import", help="폴더/JSONL/CSV의 문서를 데이터 저장소로 가져오기")
+    importer.add_argument("--postings", nargs="*", default=[], help="채용 공고 폴더 또는 .jsonl/.csv 파일")
+    importer.add_argument("--resumes", nargs="*", default=[], help="이력서 폴더 또는 .jsonl/.csv 파일")
+    importer.add_argument("--workspace", default=os.environ.get("RESUME_TAILOR_WORKSPACE", "default"),
+                          help="가져올 작업 공간 (앱에서 열려면 RESUME_TAILOR_SHARED_WORKSPACES에 포함하거나 "
+                               "RESUME_TAILOR_WORKSPACE로 지정)")
+    importer.add_argument("--data-dir", default=None, help="데이터 저장소 폴더 (기본값: RESUME_TAILOR_DATA_DIR 또는 data)")
+    importer.add_argument("--on-duplicate", choices=ON_DUPLICATE, default="merge",
+                          help="유사 문서 처리: merge(기존 문서로 합침), flag(저장하고 표시)")
+    importer.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE,
+                          help="유사 문서로 볼 SimHash 지문의 최대 차이 (비트)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "import":
+            return run_import(args)
+        return run(args)
+    except Exception as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
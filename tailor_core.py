@@ -0,0 +1,746 @@
+# tailor_core.py - Streamlit 없이 사용할 수 있는 이력서 맞춤화 파이프라인 (LLM 호출 경로와 단계별 실행 함수)
+import hashlib
+import json
+import os
+import threading
+import time
+
+from analysis_store import SharedAnalysisStore, posting_key
+from job_analysis import (ANALYSIS_FIELDS, ANALYSIS_PROMPT_TEMPLATE, ANALYSIS_SYSTEM_PROMPT, dump_analysis,
+                          format_analysis, load_analysis, parse_analysis)
+from llm_client import DEFAULT_BASE_URL, AnthropicClient
+from model_router import FAST_MODEL, ModelRouter, parse_policy
+from parallel import run_parallel
+from prompt_assembly import (DEFAULT_RESUME_TOKEN_BUDGET, DEFAULT_SECTION_TOKEN_LIMIT, HEADER_SECTION,
+                             assemble_resume_context, split_resume_context)
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache, make_cache_key
+from resume_parser import (DEFAULT_MIN_CONFIDENCE, SPLIT_PROMPT_TEMPLATE, classify_heading, extract_json_object,
+                           is_contact_line, parse_resume_sections, parse_sections_json)
+from single_flight import SingleFlight
+from telemetry import DEFAULT_LOG_BACKUPS, DEFAULT_LOG_MAX_BYTES, Telemetry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 맞춤화 톤 설정값 → 프롬프트 표현
+TONE_MAP = {
+    'professional': '전문적/공식적',
+    'creative': '창의적/활기찬',
+    'balanced': '균형잡힌/중립적',
+    'results_driven': '성과 중심적',
+    'collaborative': '협업 중심적'
+}
+
+
+# 이력서 전체를 생성하는 호출(맞춤화, 섹션 맞춤화, 재구성)이 max_tokens에서 잘렸을 때 이어서 생성하는 최대 횟수
+MAX_CONTINUATIONS = 2
+
+# 단계별 프롬프트에 넣는 분석 결과 필드
+TAILORING_FIELDS = tuple(ANALYSIS_FIELDS)
+SECTION_UPDATE_FIELDS = ("summary", "required_skills", "preferred_skills", "keywords")
+RECONSTRUCTION_FIELDS = ("keywords",)
+
+
+# 섹션별 맞춤화에서 섹션 키 → 프롬프트에 쓰는 이름
+SECTION_LABELS = {
+    HEADER_SECTION: "머리말(이름, 연락처)",
+    "professional_summary": "전문 요약",
+    "work_experience": "경력",
+    "education": "학력",
+    "skills": "기술",
+    "projects": "프로젝트",
+    "additional_sections": "기타"
+}
+
+# 섹션별 맞춤화의 동시 호출 수 (공유 세마포어와 요청 제한기의 한도를 함께 따름)
+DEFAULT_SECTION_WORKERS = 6
+
+# 일관성 검토에서 적용하는 최대 수정 수
+MAX_CONSISTENCY_EDITS = 20
+# 일관성 검토의 수정 한 건이 바꿀 수 있는 원래 문구의 최대 길이 (문자)
+MAX_CONSISTENCY_EDIT_CHARS = 300
+# 바꿀 문구의 길이는 원래 문구 길이의 이 비율 범위 안이어야 함 (내용을 지우거나 새로 써 넣는 수정은 적용하지 않음)
+CONSISTENCY_LENGTH_RATIO = (0.5, 2.0)
+
+CONSISTENCY_PROMPT_TEMPLATE = """
+        다음은 섹션별로 따로 맞춤화한 뒤 합친 이력서입니다. 섹션 사이의 불일치만 찾아주세요.
+        - 섹션마다 다르게 적힌 같은 사실 (직위, 회사명, 기간, 수치)
+        - 여러 섹션에 그대로 반복된 문장
+        - 다른 섹션과 어긋나는 용어 표기나 어조
+
+        ## 이력서:
+        {document}
+
+        고칠 곳만 다음 형식의 JSON 객체 하나로 출력해주세요. 고칠 곳이 없으면 빈 목록을 출력하세요.
+        {{"replacements": [{{"before": "이력서에 있는 그대로의 원래 문구", "after": "바꿀 문구"}}]}}
+        섹션 제목과 이름, 연락처는 고치지 말고, 문장을 통째로 지우거나 새로 쓰지 말고 어긋난 문구만 바꾸세요.
+        """
+
+
+def build_job_context(job_title, job_content, analysis=None, fields=TAILORING_FIELDS):
+    """맞춤화, 섹션 수정, 재구성 호출의 채용 공고 + 분석 결과 블록 (분석 결과는 fields만 포함)
+
+    같은 공고와 fields에 대해서는 항상 바이트 단위로 같은 문자열을 만들어야 프롬프트 캐시가 적중합니다.
+    """
+    return (
+        "다음은 구직자가 지원하려는 채용 공고와 그 분석 결과입니다.\n\n"
+        f"## 채용 공고: {job_title}\n{job_content.strip()}\n\n"
+        f"## 채용 공고 분석 결과:\n{(format_analysis(analysis, fields) or '아직 분석되지 않았습니다.').strip()}"
+    )
+
+
+def resolve_settings(custom_settings):
+    """맞춤화 설정 → (강조할 기술, 약화할 기술, 톤 표현, 길이 표현)"""
+    emphasis = custom_settings.get('emphasis_skills', '')
+    deemphasis = custom_settings.get('deemphasize_skills', '')
+
+    tone = TONE_MAP.get(custom_settings.get('tone', 'professional'), '전문적/공식적')
+    length_val = custom_settings.get('length', 2)
+    length_desc = ['간결한', '표준', '상세한'][length_val-1]
+    return emphasis, deemphasis, tone, length_desc
+
+
+def api_key_scope(api_key):
+    """진행 중 요청 합치기를 API 키별로 나누는 데 쓰는 키의 해시 (키 자체는 보관하지 않음)"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def merge_usage(total, usage):
+    """두 호출의 토큰 사용량을 합침 (숫자 항목만 더함)"""
+    merged = dict(total)
+    for key, value in (usage or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def require_text(text):
+    """빈 응답은 검증 실패로 처리 (빠른 모델이 빈 응답을 내면 선택한 모델로 다시 시도)"""
+    if not text or not text.strip():
+        raise ValueError("응답이 비어 있습니다.")
+
+
+def parse_replacements(text):
+    """일관성 검토 응답에서 [(원래 문구, 바꿀 문구)] 목록을 꺼냄 (형식이 맞지 않으면 ValueError)"""
+    data = extract_json_object(text)
+    replacements = data.get("replacements") if isinstance(data, dict) else None
+    if not isinstance(replacements, list):
+        raise ValueError("일관성 검토 응답에 replacements 목록이 없습니다.")
+    return [
+        (str(item["before"]), str(item.get("after") or ""))
+        for item in replacements if isinstance(item, dict) and item.get("before")
+    ]
+
+
+def check_replacement(document, before, after):
+    """일관성 검토의 수정 한 건을 적용해도 되면 None을, 아니면 건너뛰는 이유를 반환
+
+    빈 문구나 원래보다 훨씬 짧거나 긴 문구로 바꾸는 수정, 너무 긴 문구의 수정,
+    머리말(첫 섹션 제목 앞)이나 섹션 제목, 연락처가 있는 줄에 걸친 수정은 적용하지 않습니다.
+    """
+    low, high = CONSISTENCY_LENGTH_RATIO
+    if not after.strip():
+        return "빈 문구로 바꾸는 수정"
+    if len(before) > MAX_CONSISTENCY_EDIT_CHARS:
+        return "너무 긴 문구의 수정"
+    if not low * len(before) <= len(after) <= high * len(before):
+        return "길이가 크게 달라지는 수정"
+    index = document.find(before)
+    if index < 0:
+        return "이력서에 없는 문구"
+    # 첫 섹션 제목 앞의 머리말(이름, 연락처)은 고치지 않음
+    offset = 0
+    for line in document.splitlines(keepends=True):
+        if line.lstrip().startswith("#") or classify_heading(line) is not None:
+            break
+        offset += len(line)
+    if index < offset:
+        return "머리말(이름, 연락처)에 걸친 수정"
+    # 수정이 걸친 줄 전체를 검사 (제목, 연락처는 원본 그대로 둠)
+    start = document.rfind("\n", 0, index) + 1
+    end = document.find("\n", index + len(before))
+    for line in document[start:end if end >= 0 else len(document)].splitlines():
+        if line.lstrip().startswith("#") or classify_heading(line) is not None:
+            return "섹션 제목에 걸친 수정"
+        if is_contact_line(line):
+            return "연락처에 걸친 수정"
+    return None
+
+
+def strip_section_heading(text, section):
+    """모델이 섹션 제목을 다시 적었으면 첫 줄의 제목을 떼어냄 (제목은 원본 것을 씀)"""
+    first, _, rest = text.strip().partition("\n")
+    heading = classify_heading(first)
+    if heading and heading[0] == section:
+        return rest.strip()
+    return text.strip()
+
+
+class TailorCore:
+    """이력서 맞춤화 파이프라인과 그 공유 자원
+
+    API 클라이언트(요청 제한기 포함), 응답 캐시, 공유 분석 저장소, 진행 중 요청 합치기, 호출 통계,
+    단계별 모델 선택을 하나로 묶습니다. 단계 함수의 model은 사용자가 선택한 모델이며, 실제 호출 모델은
+    router의 단계별 정책이 정합니다. 세션 상태에 접근하지 않으므로 Streamlit 앱, 작업 스레드, 명령줄 도구, 벤치마크에서
+    같은 인스턴스를 함께 쓸 수 있습니다.
+    """
+
+    def __init__(self, client, response_cache=None, shared_analyses=None, single_flight=None, telemetry=None,
+                 max_concurrency=16, router=None):
+        self.client = client
+        self.response_cache = response_cache
+        self.shared_analyses = shared_analyses or SharedAnalysisStore()
+        self.single_flight = single_flight or SingleFlight()
+        self.telemetry = telemetry or Telemetry()
+        self.router = router or ModelRouter()
+        # 프로세스 전체의 동시 API 호출 수 제한 (모든 세션과 작업 스레드가 공유)
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls, cache_dir=None):
+        """환경 변수 설정으로 공유 자원을 만들어 TailorCore 생성 (cache_dir를 지정하면 환경 변수보다 우선)"""
+        cache_dir = cache_dir or os.environ.get("RESUME_TAILOR_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+        max_concurrency = int(os.environ.get("ANTHROPIC_MAX_CONCURRENCY", 16))
+
+        # 모델별 요청 제한기 (한도는 응답 헤더로 학습하며, 미리 알고 있으면 환경 변수로 지정)
+        limits = {
+            name: int(os.environ[env]) for name, env in (
+                ("requests", "ANTHROPIC_RPM"),
+                ("input_tokens", "ANTHROPIC_INPUT_TPM"),
+                ("output_tokens", "ANTHROPIC_OUTPUT_TPM")
+            ) if os.environ.get(env)
+        }
+        rate_limiter = RateLimiter(
+            limits,
+            initial_concurrency=int(os.environ.get("ANTHROPIC_INITIAL_CONCURRENCY", 4)),
+            max_concurrency=max_concurrency
+        )
+        client = AnthropicClient(
+            base_url=os.environ.get("ANTHROPIC_BASE_URL", DEFAULT_BASE_URL),
+            connect_timeout=float(os.environ.get("ANTHROPIC_CONNECT_TIMEOUT", 5)),
+            read_timeout=float(os.environ.get("ANTHROPIC_READ_TIMEOUT", 120)),
+            max_retries=int(os.environ.get("ANTHROPIC_MAX_RETRIES", 4)),
+            rate_limiter=rate_limiter
+        )
+
+        # 응답 캐시 (로컬 디스크에 저장되어 서버 재시작 후에도 유지)
+        response_cache = ResponseCache(
+            os.path.join(cache_dir, "responses.sqlite3"),
+            max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 5000)),
+            max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_MB", 200)) * 1024 * 1024,
+            ttl=int(os.environ.get("RESPONSE_CACHE_TTL_HOURS", 168)) * 3600
+        )
+
+        # 세션 사이에서 공유하는 채용 공고 분석 결과 (같은 공고는 한 번만 분석)
+        backend = None
+        if os.environ.get("SHARED_ANALYSIS_PERSIST", "1") != "0":
+            backend = ResponseCache(os.path.join(cache_dir, "analyses.sqlite3"), ttl=0)
+        shared_analyses = SharedAnalysisStore(
+            max_entries=int(os.environ.get("SHARED_ANALYSIS_MAX_ENTRIES", 500)),
+            backend=backend
+        )
+
+        # LLM 호출 통계 (TELEMETRY_LOG를 지정하면 JSONL 로그, 선택적으로 Prometheus /metrics 엔드포인트)
+        # 로그 파일은 TELEMETRY_LOG_MAX_MB마다 교체하고 이전 파일은 TELEMETRY_LOG_BACKUPS개까지 보관 (기본 최대 40MB)
+        telemetry = Telemetry(
+            log_path=os.environ.get("TELEMETRY_LOG") or None,
+            log_max_bytes=int(float(os.environ.get("TELEMETRY_LOG_MAX_MB", DEFAULT_LOG_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+            log_backups=int(os.environ.get("TELEMETRY_LOG_BACKUPS", DEFAULT_LOG_BACKUPS))
+        )
+        if os.environ.get("TELEMETRY_PROMETHEUS_PORT"):
+            telemetry.serve_prometheus(int(os.environ["TELEMETRY_PROMETHEUS_PORT"]))
+
+        # 단계별 모델 정책 (예: MODEL_POLICY="split=fast:30,tailoring=selected", 모든 단계에 선택한 모델을 쓰려면 "all=selected")
+        router = ModelRouter(
+            parse_policy(os.environ.get("MODEL_POLICY")),
+            fast_model=os.environ.get("FAST_MODEL", FAST_MODEL)
+        )
+
+        return cls(client, response_cache, shared_analyses, SingleFlight(), telemetry, max_concurrency, router)
+
+    @property
+    def rate_limiter(self):
+        return self.client.rate_limiter
+
+    def last_usage(self):
+        """현재 스레드에서 마지막으로 실행한 호출의 토큰 사용량
+
+        응답 캐시를 사용했으면 {"cached": True}, 진행 중이던 동일 요청의 결과를 받았으면 {"coalesced": True}입니다.
+        """
+        return getattr(self._local, "usage", None)
+
+    def stage_model(self, stage, model):
+        """선택한 모델이 model일 때 단계에서 처음 시도하는 모델"""
+        return self.router.models(stage, model)[0]
+
+    def call(self, prompt, model, api_key, max_tokens=4000, temperature=0.3, system="", timeout=None,
+             deadline=None, use_cache=True, force_refresh=False, on_delta=None, cached_prefix="", caller="",
+             owner=None, validate=None, priority=None, max_continuations=0):
+        """API 호출 (동일한 요청은 응답 캐시에서 반환)
+
+        temperature 0.0 호출은 항상 캐시하고, 그 외 호출은 use_cache에 따릅니다.
+        force_refresh=True이면 캐시를 읽지 않고 새로 생성한 결과로 캐시를 갱신합니다.
+        on_delta를 지정하면 스트리밍 모드로 호출하여 생성되는 텍스트 조각마다 on_delta(조각)를 호출합니다.
+        cached_prefix는 시스템 프롬프트 맨 앞에 두고 cache_control로 표시하여, 같은 접두부를 쓰는
+        호출들이 Anthropic 프롬프트 캐시를 공유하게 합니다.
+        caller는 호출 통계에서 호출 종류(analysis, tailoring 등)를 구분하는 이름이고,
+        owner는 요청 제한기가 대기 중인 요청을 돌아가며 처리하는 단위(세션 등)입니다.
+        validate(text)를 지정하면 새로 받은 응답을 캐시에 넣기 전에 검사하며, 예외를 내면 캐시하지 않습니다.
+        priority=rate_limiter.BACKGROUND이면 요청 제한기에서 사용자가 기다리는 요청에 양보합니다.
+        max_continuations를 지정하면 응답이 max_tokens에서 잘렸을 때(stop_reason이 max_tokens) 그 횟수까지
+        이어서 생성하여 합친 텍스트를 반환합니다. 이어 쓴 횟수는 사용량의 continuations에 기록되며,
+        그래도 잘린 응답은 사용량에 truncated를 표시하고 캐시하지 않습니다.
+        """
+        started = time.monotonic()
+        if not api_key:
+            raise Exception("API 키가 설정되지 않았습니다.")
+
+        cacheable = self.response_cache is not None and (temperature == 0.0 or use_cache)
+        cache_key = make_cache_key(model, system, prompt, temperature, max_tokens, prefix=cached_prefix) if cacheable else None
+
+        if cache_key and not force_refresh:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if on_delta:
+                    on_delta(cached)
+                self._local.usage = {"cached": True}
+                self.telemetry.record(caller, model, "cache", time.monotonic() - started)
+                return cached
+
+        data = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+
+        if cached_prefix:
+            # 공유 접두부 → 호출별 지시 순서로 두어야 접두부 캐시가 여러 종류의 호출에서 재사용됨
+            data["system"] = [{"type": "text", "text": cached_prefix, "cache_control": {"type": "ephemeral"}}]
+            if system:
+                data["system"].append({"type": "text", "text": system})
+        elif system:
+            data["system"] = system
+
+        def request():
+            text, usage = "", {}
+            for continuation in range(max_continuations + 1):
+                payload = data
+                if text:
+                    # 잘린 응답을 assistant 메시지로 넘겨 그 뒤부터 이어서 생성 (API는 끝 공백을 허용하지 않음)
+                    text = text.rstrip()
+                    payload = dict(data, messages=data["messages"] + [{"role": "assistant", "content": text}])
+                remaining = deadline - (time.monotonic() - started) if deadline is not None else None
+                if text and remaining is not None and remaining <= 0:
+                    # 예산을 다 쓰면 잘린 응답 그대로 반환
+                    usage["truncated"] = True
+                    break
+                call_started = time.monotonic()
+                metrics = {}
+                try:
+                    with self.semaphore:
+                        if on_delta:
+                            stream = self.client.stream_message(
+                                api_key, payload, timeout=timeout, deadline=remaining, owner=owner, metrics=metrics,
+                                priority=priority
+                            )
+                            for delta in stream:
+                                on_delta(delta)
+                            part, part_usage, stop_reason = stream.text, stream.usage, stream.stop_reason
+                            # 스트리밍 호출은 첫 텍스트 조각까지의 시간을 기록
+                            if stream.first_token_at is not None:
+                                metrics["ttfb"] = stream.first_token_at - call_started
+                        else:
+                            response = self.client.create_message(
+                                api_key, payload, timeout=timeout, deadline=remaining, owner=owner, metrics=metrics,
+                                priority=priority
+                            )
+                            part, part_usage, stop_reason = response["content"][0]["text"], response.get("usage", {}), response.get("stop_reason")
+                except Exception as e:
+                    self.telemetry.record(
+                        caller, model, "api", time.monotonic() - call_started, retries=metrics.get("retries", 0), error=e
+                    )
+                    raise Exception(f"API 호출 오류: {str(e)}")
+
+                self.telemetry.record(
+                    caller, model, "api", time.monotonic() - call_started, usage=part_usage, ttfb=metrics.get("ttfb"),
+                    stop_reason=stop_reason, retries=metrics.get("retries", 0)
+                )
+                text += part
+                usage = merge_usage(usage, part_usage)
+                if stop_reason != "max_tokens":
+                    break
+                if continuation == max_continuations:
+                    usage["truncated"] = True
+                else:
+                    usage["continuations"] = continuation + 1
+
+            if validate:
+                validate(text)
+            if cache_key and not usage.get("truncated"):
+                self.response_cache.set(cache_key, text, model=model)
+            return text, usage
+
+        # 같은 API 키의 같은 요청이 이미 진행 중이면 (더블 클릭, 재실행, 같은 키를 쓰는 다른 세션) 새로 호출하지 않고
+        # 그 결과를 기다림 (다른 키의 요청은 인증/한도 오류와 사용량이 키마다 다르므로 합치지 않음, 응답 캐시는 키와 무관)
+        flight_key = api_key_scope(api_key) + ":" + (
+            cache_key or make_cache_key(model, system, prompt, temperature, max_tokens, prefix=cached_prefix)
+        )
+        (text, usage), leader = self.single_flight.do(flight_key, request)
+        if not leader:
+            if on_delta:
+                on_delta(text)
+            usage = {"coalesced": True}
+            self.telemetry.record(caller, model, "coalesced", time.monotonic() - started)
+
+        self._local.usage = usage
+        return text
+
+    def shared_analysis(self, job_content, model):
+        """다른 세션에서 이미 분석한 공고의 분석 결과 dict (없거나 이전 자유 형식 분석이면 None)"""
+        analysis = load_analysis(self.shared_analyses.get(job_content, self.stage_model("analysis", model)))
+        return analysis if isinstance(analysis, dict) else None
+
+    def analyze_job(self, job_content, model, api_key, use_cache=True, force_refresh=False, on_delta=None,
+                    owner=None, priority=None):
+        """채용 공고 내용을 분석한 결과를 dict(job_analysis.ANALYSIS_FIELDS 형식)로 반환
+
+        다른 세션에서 이미 분석한 공고(공백이나 서식만 다른 경우 포함)는 공유 저장소의 결과를 바로 반환합니다.
+        공유 저장소의 결과는 단계에서 처음 시도하는 모델 기준으로 저장됩니다.
+        응답 JSON은 검증에 실패하면 선택한 모델로 다시 생성해야 하므로 스트리밍하지 않으며,
+        on_delta에는 완성된 분석 결과를 텍스트로 한 번 전달합니다.
+        priority는 TailorCore.call 참고 (저장할 때 미리 분석하는 경우 BACKGROUND).
+        """
+        stage_model = self.stage_model("analysis", model)
+        if not force_refresh:
+            started = time.monotonic()
+            shared = self.shared_analysis(job_content, model)
+            if shared is not None:
+                if on_delta:
+                    on_delta(format_analysis(shared))
+                self._local.usage = {"cached": True}
+                self.telemetry.record("analysis", stage_model, "cache", time.monotonic() - started)
+                self.router.record(owner, "analysis", stage_model, elapsed=time.monotonic() - started)
+                return shared
+
+        # 프롬프트 구성
+        prompt = ANALYSIS_PROMPT_TEMPLATE.format(job_content=job_content)
+
+        def analyze():
+            analysis = self.router.run("analysis", model, lambda stage_model, deadline, on_delta: parse_analysis(self.call(
+                prompt=prompt,
+                model=stage_model,
+                api_key=api_key,
+                max_tokens=4000,
+                temperature=0.3,
+                system=ANALYSIS_SYSTEM_PROMPT,
+                deadline=deadline,
+                use_cache=use_cache,
+                force_refresh=force_refresh,
+                caller="analysis",
+                owner=owner,
+                validate=parse_analysis,
+                priority=priority
+            )), owner=owner)
+            self.shared_analyses.set(job_content, stage_model, dump_analysis(analysis))
+            return analysis
+
+        if force_refresh:
+            analysis = analyze()
+        else:
+            # 서식만 다른 같은 공고를 동시에 분석하는 경우도 한 번의 API 호출로 합침
+            analysis, leader = self.single_flight.do(
+                f"analysis:{api_key_scope(api_key)}:" + posting_key(job_content, stage_model), analyze
+            )
+            if not leader:
+                self._local.usage = {"coalesced": True}
+        if on_delta:
+            on_delta(format_analysis(analysis))
+        return analysis
+
+    def tailor(self, job_title, job_content, analysis, resume_versions, custom_settings, model, api_key,
+               token_budget=DEFAULT_RESUME_TOKEN_BUDGET, use_cache=True, force_refresh=False, on_delta=None,
+               owner=None):
+        """채용 공고, 분석 결과, 맞춤화 설정을 적용하여 맞춤화된 이력서 텍스트를 반환
+
+        resume_versions({이름: 내용})는 중복 문단을 없애고 공고와 관련성 높은 내용 위주로
+        token_budget 안에서 정리한 뒤 프롬프트에 넣습니다.
+        """
+        resume_context = assemble_resume_context(resume_versions, job_content, analysis, token_budget)["text"]
+        emphasis, deemphasis, tone, length_desc = resolve_settings(custom_settings)
+
+        # 프롬프트 구성
+        prompt = f"""
+        당신은 전문 이력서 맞춤화 전문가입니다. 다음 이력서 버전들을 참고하여 
+        앞서 제공된 채용 공고에 최적화된 새로운 이력서를 작성해 주세요.
+        
+        ## 이력서 버전들:
+        {resume_context}
+        
+        ## 맞춤화 설정:
+        - 강조할 기술/경험: {emphasis}
+        - 약화할 기술/경험: {deemphasis}
+        - 이력서 톤: {tone}
+        - 이력서 길이: {length_desc}
+        
+        다음 지침에 따라 이력서를 맞춤화해주세요:
+        1. 채용 공고의 요구사항과 일치하는 기술, 경험, 성과를 강조하세요.
+        2. 관련성이 낮은 내용은 줄이거나 제외하세요.
+        3. 위에서 지정한 '강조할 기술/경험'을 특별히 부각시키세요.
+        4. '약화할 기술/경험'은 최소화하거나 더 관련성 있는 다른 기술로 대체하세요.
+        5. 지정된 톤({tone})에 맞게 문체를 조정하세요.
+        6. 이력서 길이는 {length_desc} 수준으로 조정하세요.
+        7. 이력서 형식과 구조는 원본 이력서를 따라주세요.
+        8. 채용 공고 분석 결과의 주요 키워드와 핵심 요구사항을 반영하세요.
+        
+        최종 이력서는 구직자가 이 특정 채용 공고에 가장 적합한 후보자로 보이도록 맞춤화되어야 합니다.
+        """
+
+        # API 호출
+        return self.router.run("tailoring", model, lambda stage_model, deadline, on_delta: self.call(
+            prompt=prompt,
+            model=stage_model,
+            api_key=api_key,
+            max_tokens=4000,
+            temperature=0.3,
+            system="당신은 전문 이력서 맞춤화 전문가입니다. 채용 공고에 가장 적합한 이력서를 작성해 주세요.",
+            cached_prefix=build_job_context(job_title, job_content, analysis),
+            deadline=deadline,
+            use_cache=use_cache,
+            force_refresh=force_refresh,
+            on_delta=on_delta,
+            caller="tailoring",
+            owner=owner,
+            validate=require_text,
+            max_continuations=MAX_CONTINUATIONS
+        ), on_delta=on_delta, owner=owner)
+
+    def tailor_by_section(self, job_title, job_content, analysis, resume_versions, custom_settings, model, api_key,
+                          token_budget=DEFAULT_RESUME_TOKEN_BUDGET, use_cache=True, force_refresh=False,
+                          on_delta=None, owner=None, max_workers=DEFAULT_SECTION_WORKERS,
+                          section_token_limit=DEFAULT_SECTION_TOKEN_LIMIT):
+        """tailor와 같은 결과를 섹션별 동시 호출로 만들어 전체 시간이 가장 긴 섹션의 생성 시간을 따르게 함
+
+        1. tailor와 같이 정리한 이력서 내용을 섹션별 조각으로 나눕니다 (prompt_assembly.split_resume_context).
+        2. 조각마다 같은 채용 공고 접두부로 동시에 맞춤화합니다 (잘린 응답은 이어서 생성).
+        3. 원래 섹션 제목과 순서로 합치고, 섹션 사이에 그대로 반복된 문단은 하나만 남깁니다.
+        4. 빠른 모델로 섹션 사이의 불일치(사실, 반복, 용어)를 찾아 그 문구만 고칩니다. 실패하면 3의 결과를 씁니다.
+
+        섹션 제목을 찾지 못한 이력서는 tailor로 한 번에 생성합니다.
+        일부 섹션의 맞춤화가 실패하면 그 섹션은 원래 내용을 그대로 쓰고 last_usage()의 failed_sections에 섹션 이름을 남깁니다
+        (모든 섹션이 실패하면 예외를 발생시킴).
+        on_delta에는 앞 섹션부터 완성되는 순서대로 섹션 텍스트를 전달하며, 반환값은 일관성 검토까지 반영한 최종 텍스트입니다.
+        """
+        resume_context = assemble_resume_context(resume_versions, job_content, analysis, token_budget)["text"]
+        parts = split_resume_context(resume_context, section_token_limit)
+        if len(parts) < 2:
+            return self.tailor(
+                job_title, job_content, analysis, resume_versions, custom_settings, model, api_key,
+                token_budget=token_budget, use_cache=use_cache, force_refresh=force_refresh, on_delta=on_delta,
+                owner=owner
+            )
+
+        emphasis, deemphasis, tone, length_desc = resolve_settings(custom_settings)
+        job_context = build_job_context(job_title, job_content, analysis)
+
+        def tailor_part(part):
+            label = SECTION_LABELS.get(part["section"], part["section"])
+            if part["parts"] > 1:
+                label += f" ({part['parts']}개 중 {part['part']}번째 부분, 나머지 부분은 따로 작성됨)"
+            extra = "이름과 연락처 같은 사실 정보는 바꾸지 말고, 여러 버전의 머리말을 하나로 정리하세요." \
+                if part["section"] == HEADER_SECTION else "여러 버전에 같은 항목이 있으면 하나로 합치세요."
+            prompt = f"""
+        당신은 전문 이력서 맞춤화 전문가입니다. 다음은 여러 이력서 버전에서 모은 이력서의 '{label}' 섹션입니다.
+        앞서 제공된 채용 공고에 최적화되도록 이 섹션만 다시 작성해 주세요.
+        
+        ## 섹션 내용:
+        {part["text"]}
+        
+        ## 맞춤화 설정:
+        - 강조할 기술/경험: {emphasis}
+        - 약화할 기술/경험: {deemphasis}
+        - 이력서 톤: {tone}
+        - 이력서 길이: {length_desc}
+        
+        다음 지침에 따라 섹션을 맞춤화해주세요:
+        1. 섹션 제목, 다른 섹션의 내용, 설명은 쓰지 말고 이 섹션의 본문만 출력하세요.
+        2. 채용 공고의 요구사항과 일치하는 기술, 경험, 성과를 강조하고 관련성이 낮은 내용은 줄이세요.
+        3. '강조할 기술/경험'은 부각시키고 '약화할 기술/경험'은 최소화하세요.
+        4. 지정된 톤({tone})과 길이({length_desc})에 맞게 조정하세요.
+        5. 원본의 형식(글머리 기호, 날짜 표기)을 따르고, 원본에 없는 회사, 날짜, 수치는 만들지 마세요.
+        6. {extra}
+        """
+            text = self.router.run("section_tailoring", model, lambda stage_model, deadline, on_delta: self.call(
+                prompt=prompt,
+                model=stage_model,
+                api_key=api_key,
+                max_tokens=4000,
+                temperature=0.3,
+                system="당신은 전문 이력서 맞춤화 전문가입니다. 요청한 이력서 섹션만 채용 공고에 맞게 작성해 주세요.",
+                cached_prefix=job_context,
+                deadline=deadline,
+                use_cache=use_cache,
+                force_refresh=force_refresh,
+                caller="section_tailoring",
+                owner=owner,
+                validate=require_text,
+                max_continuations=MAX_CONTINUATIONS
+            ), owner=owner)
+            return strip_section_heading(text, part["section"]), self.last_usage()
+
+        # 섹션별 동시 맞춤화 (완성된 섹션은 문서 순서대로 on_delta에 전달)
+        results, usage, emitted = {}, {}, 0
+        blocks, failed = [], []
+        tasks = [(index, lambda p=part: tailor_part(p)) for index, part in enumerate(parts)]
+        for index, output, error in run_parallel(tasks, max_workers=max_workers):
+            if error is not None:
+                # 실패한 섹션은 원래 내용을 그대로 쓰고 나머지 섹션의 결과는 살림
+                part = parts[index]
+                label = SECTION_LABELS.get(part["section"], part["section"])
+                if len(failed) + 1 == len(parts):
+                    raise Exception(f"모든 섹션의 맞춤화가 실패했습니다. 마지막 오류 ('{label}' 섹션): {error}")
+                failed.append(label if part["parts"] == 1 else f"{label} {part['part']}/{part['parts']}")
+                output = (part["text"], {})
+            results[index] = output[0]
+            usage = merge_usage(usage, output[1])
+            while emitted in results:
+                part = parts[emitted]
+                block = "\n\n".join(filter(None, [part["heading"], results[emitted]]))
+                if on_delta:
+                    on_delta(("\n\n" if blocks else "") + block)
+                blocks.append(block)
+                emitted += 1
+
+        # 섹션 사이에 그대로 반복된 문단은 처음 나온 것만 남김
+        seen, paragraphs = set(), []
+        for paragraph in "\n\n".join(blocks).split("\n\n"):
+            normalized = " ".join(paragraph.split())
+            if not normalized or normalized in seen and classify_heading(paragraph) is None:
+                continue
+            seen.add(normalized)
+            paragraphs.append(paragraph)
+        document = "\n\n".join(paragraphs)
+
+        self._local.usage = dict(usage, sections=len(parts))
+        if failed:
+            self._local.usage["failed_sections"] = failed
+        return self.review_consistency(document, model, api_key, force_refresh=force_refresh, owner=owner)
+
+    def review_consistency(self, document, model, api_key, force_refresh=False, owner=None):
+        """합친 이력서에서 섹션 사이의 불일치를 찾아 해당 문구만 고친 텍스트를 반환
+
+        문서 전체를 다시 생성하지 않고 고칠 문구 목록(JSON)만 받으므로 출력이 짧습니다.
+        검토가 실패하거나 응답 형식이 맞지 않으면 문서를 그대로 반환합니다.
+        check_replacement를 통과하지 못한 수정은 적용하지 않고 그 수를 last_usage()의 consistency_skipped에 남깁니다.
+        """
+        usage = self.last_usage()
+        try:
+            replacements = self.router.run("consistency", model, lambda stage_model, deadline, on_delta: parse_replacements(self.call(
+                prompt=CONSISTENCY_PROMPT_TEMPLATE.format(document=document),
+                model=stage_model,
+                api_key=api_key,
+                max_tokens=1000,
+                temperature=0.0,
+                deadline=deadline,
+                force_refresh=force_refresh,
+                caller="consistency",
+                owner=owner,
+                validate=parse_replacements
+            )), owner=owner)
+        except Exception:
+            self._local.usage = usage
+            return document
+
+        skipped = 0
+        for before, after in replacements[:MAX_CONSISTENCY_EDITS]:
+            if check_replacement(document, before, after) is not None:
+                skipped += 1
+                continue
+            document = document.replace(before, after, 1)
+        self._local.usage = merge_usage(usage or {}, self.last_usage())
+        if skipped:
+            self._local.usage["consistency_skipped"] = skipped
+        return document
+
+    def split_sections(self, resume_text, model, api_key, min_confidence=DEFAULT_MIN_CONFIDENCE, owner=None):
+        """이력서를 섹션별로 분리 (로컬 파서의 신뢰도가 낮을 때만 LLM 사용)
+
+        빠른 모델의 응답이 올바른 섹션 JSON이 아니면 선택한 모델로 다시 시도합니다.
+        """
+        started = time.monotonic()
+        sections, confidence = parse_resume_sections(resume_text)
+        if confidence >= min_confidence:
+            self._local.usage = None
+            self.router.record(owner, "split", None, elapsed=time.monotonic() - started)
+            return sections
+
+        # JSON 문자열에서 실제 JSON 객체로 변환 (변환할 수 없는 응답은 캐시하지 않음)
+        return self.router.run("split", model, lambda stage_model, deadline, on_delta: parse_sections_json(self.call(
+            prompt=SPLIT_PROMPT_TEMPLATE.format(resume_text=resume_text),
+            model=stage_model,
+            api_key=api_key,
+            temperature=0.0,
+            deadline=deadline,
+            caller="split",
+            owner=owner,
+            validate=parse_sections_json
+        )), owner=owner)
+
+    def update_section(self, section_type, section_content, feedback, job_context, model, api_key,
+                       use_cache=True, owner=None):
+        """사용자 피드백을 반영해 다시 작성한 섹션 텍스트를 반환
+
+        job_context는 build_job_context(..., fields=SECTION_UPDATE_FIELDS) 결과입니다.
+        """
+        return self.router.run("section_update", model, lambda stage_model, deadline, on_delta: self.call(
+            prompt=f"""
+            다음은 이력서의 '{section_type}' 섹션입니다:
+            
+            {section_content}
+            
+            사용자가 이 섹션에 대해 다음과 같은 피드백을 제공했습니다:
+            
+            {feedback}
+            
+            사용자의 피드백을 반영하여 이 섹션을 다시 작성해주세요. 
+            원래 섹션의 핵심 정보는 유지하되, 피드백에 따라 내용, 표현, 강조점을 조정해주세요.
+            피드백에 언급된 사항만 수정하고, 그 외 부분은 가능한 유지해주세요.
+            """,
+            model=stage_model,
+            api_key=api_key,
+            temperature=0.3,
+            cached_prefix=job_context,
+            deadline=deadline,
+            use_cache=use_cache,
+            caller="section_update",
+            owner=owner,
+            validate=require_text
+        ), owner=owner)
+
+    def reconstruct(self, resume_sections, job_context, model, api_key, use_cache=True, on_delta=None,
+                    owner=None):
+        """수정된 섹션들을 합쳐 완성된 이력서 텍스트를 반환
+
+        job_context는 build_job_context(..., fields=RECONSTRUCTION_FIELDS) 결과입니다.
+        """
+        return self.router.run("reconstruction", model, lambda stage_model, deadline, on_delta: self.call(
+            prompt=f"""
+                    다음은 이력서의 각 섹션입니다. 이 섹션들을 자연스럽게 통합하여 완성된 이력서를 만들어주세요.
+    
+                    {json.dumps(resume_sections, indent=2, ensure_ascii=False)}
+    
+                    원래 이력서의 형식과 구조를 최대한 유지하면서, 수정된 내용을 반영해주세요.
+                    """,
+            model=stage_model,
+            api_key=api_key,
+            temperature=0.2,
+            cached_prefix=job_context,
+            deadline=deadline,
+            on_delta=on_delta,
+            use_cache=use_cache,
+            caller="reconstruction",
+            owner=owner,
+            validate=require_text,
+            max_continuations=MAX_CONTINUATIONS
+        ), on_delta=on_delta, owner=owner)
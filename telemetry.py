@@ -0,0 +1,225 @@
+# telemetry.py - LLM 호출별 지연 시간, 토큰 사용량, 비용 기록과 로컬 내보내기 (JSONL / Prometheus)
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 모델별 백만 토큰당 가격 (USD, 입력/출력)
+MODEL_PRICES = {
+    "claude-3-7-sonnet-20250219": (3.0, 15.0),
+    "claude-3-5-sonnet-20240620": (3.0, 15.0),
+    "claude-3-opus-20240229": (15.0, 75.0),
+    "claude-3-haiku-20240307": (0.25, 1.25)
+}
+
+# 프롬프트 캐시 쓰기/읽기 토큰의 입력 가격 대비 배율
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Prometheus 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+# JSONL 로그 파일 하나의 최대 크기와 보관할 이전 파일 수
+# (기본값이면 디스크에 telemetry.jsonl과 .1~.3까지 최대 4 × 10MB = 40MB를 씀)
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 3
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def estimate_cost(model, usage):
+    """사용량(usage)으로 호출 비용(USD) 계산 (가격을 모르는 모델은 0)"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (
+        (usage.get("input_tokens") or 0) * input_price
+        + (usage.get("cache_creation_input_tokens") or 0) * input_price * CACHE_WRITE_MULTIPLIER
+        + (usage.get("cache_read_input_tokens") or 0) * input_price * CACHE_READ_MULTIPLIER
+        + (usage.get("output_tokens") or 0) * output_price
+    ) / 1_000_000
+
+
+def percentile(values, q):
+    """정렬된 값 목록의 q 분위수 (0~1, 선형 보간)"""
+    if not values:
+        return None
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Telemetry:
+    """LLM 호출 기록을 모아 요약하고 JSONL 파일과 Prometheus 텍스트 형식으로 내보냄
+
+    최근 max_records개는 메모리에 두고 요약에 사용하며, 누적 카운터는 프로세스가 끝날 때까지 유지됩니다.
+    log_path를 주면 호출마다 한 줄씩 JSONL로 남깁니다. 파일 쓰기는 백그라운드 스레드가 처리하므로 호출 경로를 막지 않고,
+    파일이 log_max_bytes를 넘으면 이름을 .1, .2, ...로 바꿔 log_backups개까지만 보관합니다
+    (디스크 사용량은 최대 (log_backups + 1) × log_max_bytes).
+    """
+
+    def __init__(self, log_path=None, max_records=5000, log_max_bytes=DEFAULT_LOG_MAX_BYTES,
+                 log_backups=DEFAULT_LOG_BACKUPS):
+        self.log_path = log_path
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._counters = {}   # (model, caller, source, status) → 호출 수
+        self._tokens = {}     # (model, caller, 토큰 종류) → 토큰 수
+        self._cost = {}       # (model, caller) → 비용
+        self._latency = {}    # model → [구간별 개수..., 합계, 개수]
+        self._server = None
+        self._log = None
+        self._log_listener = None
+        if log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            file_handler = RotatingFileHandler(
+                log_path, maxBytes=log_max_bytes, backupCount=log_backups, encoding="utf-8", delay=True
+            )
+            file_handler.setFormatter(logging.Formatter("%(message)s"))
+            # 인스턴스마다 따로 둔 로거 (루트 로거와 다른 처리기로 전파하지 않음)
+            records = queue.SimpleQueue()
+            self._log = logging.Logger(f"telemetry:{log_path}")
+            self._log.addHandler(QueueHandler(records))
+            self._log_listener = QueueListener(records, file_handler)
+            self._log_listener.start()
+            atexit.register(self.close)
+
+    def record(self, caller, model, source, wall_time, usage=None, ttfb=None, stop_reason=None,
+               retries=0, error=None):
+        """호출 하나를 기록
+
+        source: "api"(실제 호출), "cache"(응답 캐시), "coalesced"(진행 중이던 동일 요청 결과 공유)
+        """
+        usage = usage or {}
+        record = {
+            "ts": time.time(),
+            "caller": caller or "other",
+            "model": model,
+            "source": source,
+            "status": "error" if error else "ok",
+            "wall_time": round(wall_time, 4),
+            "ttfb": round(ttfb, 4) if ttfb is not None else None,
+            "stop_reason": stop_reason,
+            "retries": retries,
+            "cost_usd": round(estimate_cost(model, usage), 6) if source == "api" else 0.0,
+            "error": str(error) if error else None
+        }
+        for field in TOKEN_FIELDS:
+            record[field] = usage.get(field) or 0
+
+        with self._lock:
+            self._records.append(record)
+            labels = (model, record["caller"], source, record["status"])
+            self._counters[labels] = self._counters.get(labels, 0) + 1
+            if source == "api":
+                for field in TOKEN_FIELDS:
+                    key = (model, record["caller"], field)
+                    self._tokens[key] = self._tokens.get(key, 0) + record[field]
+                self._cost[(model, record["caller"])] = self._cost.get((model, record["caller"]), 0.0) + record["cost_usd"]
+                histogram = self._latency.setdefault(model, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+                for i, bound in enumerate(LATENCY_BUCKETS):
+                    if wall_time <= bound:
+                        histogram[i] += 1
+                histogram[-2] += wall_time
+                histogram[-1] += 1
+        if self._log is not None:
+            # 큐에 넣기만 하고 파일 쓰기와 교체는 백그라운드 스레드가 처리 (잠금 밖)
+            self._log.info(json.dumps(record, ensure_ascii=False))
+        return record
+
+    def close(self):
+        """남은 로그를 파일에 쓰고 로그 스레드를 멈춤 (프로세스 종료 시 자동 호출)"""
+        listener, self._log_listener = self._log_listener, None
+        if listener is not None:
+            self._log = None
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def summary(self):
+        """최근 기록의 모델별 요약 {모델: {calls, cached, errors, p50, p95, ttfb_p50, cost_usd, 토큰...}}"""
+        by_model = {}
+        for record in self.records():
+            by_model.setdefault(record["model"], []).append(record)
+
+        summary = {}
+        for model, records in by_model.items():
+            api = [r for r in records if r["source"] == "api" and r["status"] == "ok"]
+            latencies = sorted(r["wall_time"] for r in api)
+            ttfbs = sorted(r["ttfb"] for r in api if r["ttfb"] is not None)
+            summary[model] = {
+                "calls": len(records),
+                "api_calls": len(api),
+                "cached": sum(1 for r in records if r["source"] != "api"),
+                "errors": sum(1 for r in records if r["status"] == "error"),
+                "p50": percentile(latencies, 0.5),
+                "p95": percentile(latencies, 0.95),
+                "ttfb_p50": percentile(ttfbs, 0.5),
+                "cost_usd": sum(r["cost_usd"] for r in records)
+            }
+            for field in TOKEN_FIELDS:
+                summary[model][field] = sum(r[field] for r in api)
+        return summary
+
+    def prometheus_text(self):
+        """Prometheus 텍스트 노출 형식의 누적 지표"""
+        def labels(**values):
+            return "{" + ",".join(f'{k}="{v}"' for k, v in values.items()) + "}"
+
+        lines = [
+            "# HELP llm_calls_total LLM calls by model, caller, source and status.",
+            "# TYPE llm_calls_total counter"
+        ]
+        with self._lock:
+            for (model, caller, source, status), count in sorted(self._counters.items()):
+                lines.append(f"llm_calls_total{labels(model=model, caller=caller, source=source, status=status)} {count}")
+            lines += ["# HELP llm_tokens_total Tokens used by API calls.", "# TYPE llm_tokens_total counter"]
+            for (model, caller, kind), count in sorted(self._tokens.items()):
+                lines.append(f"llm_tokens_total{labels(model=model, caller=caller, type=kind)} {count}")
+            lines += ["# HELP llm_cost_usd_total Estimated spend of API calls in USD.", "# TYPE llm_cost_usd_total counter"]
+            for (model, caller), cost in sorted(self._cost.items()):
+                lines.append(f"llm_cost_usd_total{labels(model=model, caller=caller)} {cost:.6f}")
+            lines += ["# HELP llm_request_duration_seconds Wall time of API calls.",
+                      "# TYPE llm_request_duration_seconds histogram"]
+            for model, histogram in sorted(self._latency.items()):
+                for bound, count in zip(LATENCY_BUCKETS, histogram):
+                    lines.append(f"llm_request_duration_seconds_bucket{labels(model=model, le=bound)} {count}")
+                lines.append(f"llm_request_duration_seconds_bucket{labels(model=model, le='+Inf')} {histogram[-1]}")
+                lines.append(f"llm_request_duration_seconds_sum{labels(model=model)} {histogram[-2]:.4f}")
+                lines.append(f"llm_request_duration_seconds_count{labels(model=model)} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port, host="127.0.0.1"):
+        """백그라운드 스레드에서 /metrics 엔드포인트 시작 (이미 시작했으면 무시)"""
+        if self._server is not None:
+            return self._server
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("content-type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
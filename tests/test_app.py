@@ -0,0 +1,80 @@
+# test_app.py - Streamlit 앱 재실행 확인 (streamlit.testing의 AppTest 사용, API 호출 없음)
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    """앱의 공유 자원은 프로세스에 한 번 만들어지므로 이 모듈의 테스트는 같은 데이터 폴더를 씀"""
+    base = tmp_path_factory.mktemp("app")
+    patch = pytest.MonkeyPatch()
+    patch.setenv("RESUME_TAILOR_DATA_DIR", str(base / "data"))
+    patch.setenv("RESUME_TAILOR_CACHE_DIR", str(base / "cache"))
+    yield base / "data"
+    patch.undo()
+
+
+def run_app(monkeypatch, workspace, api_key="test-key"):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.setenv("RESUME_TAILOR_WORKSPACE", workspace)
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.run()
+    at.session_state.api_key = api_key
+    at.run()
+    return at
+
+
+def job_options(at):
+    return next(s for s in at.selectbox if s.label == "분석할 채용 공고 선택").options
+
+
+def cli_import(data_dir, workspace, tmp_path, postings):
+    path = tmp_path / "postings.jsonl"
+    path.write_text("\n".join(json.dumps(p, ensure_ascii=False) for p in postings), encoding="utf-8")
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "tailor_cli.py"), "import", "--workspace", workspace,
+         "--data-dir", str(data_dir), "--postings", str(path)],
+        check=True, capture_output=True
+    )
+
+
+def test_posting_imported_by_cli_appears_after_rerun(data_dir, tmp_path, monkeypatch):
+    cli_import(data_dir, "cli-import", tmp_path, [{"title": "첫 공고", "content": "Python 백엔드 개발자 " * 30}])
+    at = run_app(monkeypatch, "cli-import")
+    assert job_options(at) == ["첫 공고"]
+
+    # 앱이 실행 중일 때 다른 프로세스가 같은 저장소에 공고를 추가
+    cli_import(data_dir, "cli-import", tmp_path, [{"title": "둘째 공고", "content": "React 프론트엔드 개발자 " * 30}])
+    at.run()
+    assert not at.exception
+    assert sorted(job_options(at)) == ["둘째 공고", "첫 공고"]
+
+
+def test_rerun_with_no_postings(data_dir, monkeypatch):
+    at = run_app(monkeypatch, "empty")
+    assert not at.exception
+    at.run()
+    assert not at.exception
+    assert not any(s.label == "분석할 채용 공고 선택" for s in at.selectbox)
+
+
+def test_section_feedback_for_result_of_deleted_posting(data_dir, monkeypatch):
+    at = run_app(monkeypatch, "deleted-posting")
+    # 맞춤화에 쓴 공고가 그 뒤 삭제된 상태
+    at.session_state.tailored_result = "요약\n\n경력\n\nABC 개발자"
+    at.session_state.tailored_job_id = "deleted-job"
+    at.session_state.resume_sections = {
+        "professional_summary": "요약", "work_experience": [{"title": "개발자", "company": "ABC", "content": "개발"}],
+        "education": [], "skills": [], "projects": [], "additional_sections": []
+    }
+    at.run()
+    assert not at.exception
+    assert any("삭제" in caption.value for caption in at.caption)
@@ -0,0 +1,96 @@
+# test_bulk_import.py - 중복·유사 문서 판정과 같은 ID 문서의 수정 처리
+import random
+
+import pytest
+
+from bulk_import import BulkImporter, DuplicateIndex, DuplicateIndexCache, content_digest, simhash
+from data_store import DataStore
+
+WORDS = [f"단어{i}" for i in range(2000)]
+
+
+def posting(seed, length=150):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def near_copy(text):
+    """마지막 단어 하나만 바꾼 유사 문서"""
+    words = text.split()
+    return " ".join(words[:-1] + ["바뀐단어"])
+
+
+@pytest.fixture
+def store():
+    return DataStore(":memory:")
+
+
+def test_exact_and_near_duplicates_are_merged(store):
+    importer = BulkImporter(store, "ws", "job_postings")
+    status, key, _ = importer.add({"source": "a", "title": "백엔드", "content": posting(1)})
+    assert status == "added"
+
+    # 서식만 다른 같은 공고
+    status, existing, _ = importer.add({"source": "b", "title": "백엔드", "content": "\n\n".join(posting(1).split(" "))})
+    assert (status, existing) == ("merged", key)
+
+    status, existing, _ = importer.add({"source": "c", "title": "백엔드", "content": near_copy(posting(1))})
+    assert (status, existing) == ("merged", key)
+    assert len(store.table("job_postings", "ws")) == 1
+
+
+def test_flagged_duplicate_reuses_analysis(store):
+    importer = BulkImporter(store, "ws", "job_postings", on_duplicate="flag")
+    _, key, _ = importer.add({"source": "a", "title": "백엔드", "content": posting(1)})
+    store.table("job_analyses", "ws")[key] = {"summary": "분석"}
+
+    status, new_key, existing = importer.add({"source": "b", "title": "백엔드 2", "content": near_copy(posting(1))})
+    assert (status, existing) == ("flagged", key)
+    assert store.table("job_analyses", "ws")[new_key] == {"summary": "분석"}
+
+
+def test_update_then_import_old_content(store):
+    importer = BulkImporter(store, "ws", "job_postings")
+    assert importer.add({"source": "a", "title": "공고", "content": posting(1), "id": "job-1"})[0] == "added"
+    store.table("job_analyses", "ws")["job-1"] = {"summary": "이전 분석"}
+
+    # 같은 ID의 새 버전은 이전 분석 결과를 지우고 수정으로 처리
+    assert importer.add({"source": "b", "title": "공고", "content": posting(2), "id": "job-1"})[:2] == ("updated", "job-1")
+    assert "job-1" not in store.table("job_analyses", "ws")
+
+    # 수정 전 내용은 더 이상 job-1의 중복이 아님
+    status, key, _ = importer.add({"source": "c", "title": "옛 공고", "content": posting(1)})
+    assert status == "added" and key != "job-1"
+    # 수정 후 내용은 여전히 job-1의 중복
+    assert importer.add({"source": "d", "title": "공고", "content": posting(2)})[:2] == ("merged", "job-1")
+
+
+def test_update_with_small_change_is_not_merged_into_itself(store):
+    importer = BulkImporter(store, "ws", "job_postings")
+    importer.add({"source": "a", "title": "공고", "content": posting(1), "id": "job-1"})
+    assert importer.add({"source": "b", "title": "공고", "content": near_copy(posting(1)), "id": "job-1"})[0] == "updated"
+    assert store.table("job_postings", "ws")["job-1"]["content"] == near_copy(posting(1))
+
+
+def test_index_cache_forgets_old_content_after_update(store):
+    cache = DuplicateIndexCache()
+    cache.add(store, "ws", "job_postings", {"source": "a", "title": "공고", "content": posting(1), "id": "job-1"})
+    cache.add(store, "ws", "job_postings", {"source": "b", "title": "공고", "content": posting(2), "id": "job-1"})
+    assert cache.add(store, "ws", "job_postings", {"source": "c", "title": "옛 공고", "content": posting(1)})[0] == "added"
+
+
+def test_index_cache_rebuilds_after_delete(store):
+    cache = DuplicateIndexCache()
+    _, key, _ = cache.add(store, "ws", "job_postings", {"source": "a", "title": "공고", "content": posting(1)})
+    del store.table("job_postings", "ws")[key]
+    assert cache.add(store, "ws", "job_postings", {"source": "b", "title": "공고", "content": posting(1)})[0] == "added"
+
+
+def test_duplicate_index_remove():
+    index = DuplicateIndex()
+    text = posting(1)
+    index.add("a", content_digest(text), simhash(text))
+    assert index.find(content_digest(text), simhash(text)) == ("a", 0)
+    index.remove("a")
+    assert index.find(content_digest(text), simhash(text)) is None
+    assert len(index) == 0
@@ -0,0 +1,59 @@
+# test_llm_client.py - 요청이 예외로 끝나도 요청 제한 허가를 돌려주는지 확인 (네트워크 없음)
+import datetime
+
+import pytest
+import requests
+
+from llm_client import AnthropicAPIError, AnthropicClient
+from rate_limiter import RateLimiter
+
+PAYLOAD = {"model": "m", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+
+
+def make_client(post, max_retries=0):
+    limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+    client = AnthropicClient(base_url="http://127.0.0.1:9", rate_limiter=limiter, max_retries=max_retries,
+                             backoff_base=0.0)
+    client.session.post = post
+    return client, limiter
+
+
+def test_request_error_releases_ticket():
+    def post(*args, **kwargs):
+        raise requests.exceptions.TooManyRedirects("redirects")
+
+    client, limiter = make_client(post)
+    # 동시 실행 자리가 하나뿐이므로 허가를 돌려주지 않으면 두 번째 호출부터 기다리다 시간 초과
+    for _ in range(3):
+        with pytest.raises(AnthropicAPIError):
+            client.create_message("key", PAYLOAD, deadline=1)
+    assert limiter.stats()["m"]["in_flight"] == 0
+
+
+def test_network_error_releases_ticket_on_each_retry():
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(1)
+        raise requests.exceptions.ConnectionError("refused")
+
+    client, limiter = make_client(post, max_retries=2)
+    with pytest.raises(AnthropicAPIError):
+        client.create_message("key", PAYLOAD, deadline=5)
+    assert len(calls) == 3
+    assert limiter.stats()["m"]["in_flight"] == 0
+
+
+def test_invalid_json_body_releases_ticket():
+    class Response:
+        status_code = 200
+        headers = {}
+        elapsed = datetime.timedelta(0)
+
+        def json(self):
+            raise ValueError("not json")
+
+    client, limiter = make_client(lambda *args, **kwargs: Response())
+    with pytest.raises(ValueError):
+        client.create_message("key", PAYLOAD, deadline=1)
+    assert limiter.stats()["m"]["in_flight"] == 0
@@ -0,0 +1,26 @@
+# test_match_scoring.py - 로컬 적합도 점수의 키워드 일치 판정
+from match_scoring import score_resume, tokenize
+
+JOB = "Python 백엔드 개발자를 찾습니다. 관련 경력 3년 이상."
+
+
+def analysis(*keywords):
+    return "4. 주요 키워드: " + ", ".join(keywords)
+
+
+def test_stopword_only_keyword_is_matched_literally():
+    assert tokenize("Experience") == []
+    result = score_resume("Work Experience\nPython developer at Acme", JOB, analysis("Python", "Experience"))
+    assert result["matched_keywords"] == ["Python", "Experience"]
+    assert result["missing_keywords"] == []
+
+
+def test_stopword_only_keyword_missing_from_resume():
+    result = score_resume("Python developer at Acme", JOB, analysis("Python", "Experience"))
+    assert result["missing_keywords"] == ["Experience"]
+
+
+def test_keyword_without_text_is_ignored():
+    result = score_resume("Python developer", JOB, analysis("Python", "&"))
+    assert result["matched_keywords"] == ["Python"]
+    assert result["keyword_coverage"] == 1.0
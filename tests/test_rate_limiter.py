@@ -0,0 +1,47 @@
+# test_rate_limiter.py - 실제 사용량 반영과 Ticket 반납
+import threading
+
+import pytest
+
+from rate_limiter import RateLimiter
+
+
+def input_bucket(limiter, model="m"):
+    return limiter._models[model].buckets["input_tokens"]
+
+
+def test_usage_above_estimate_is_debited():
+    limiter = RateLimiter(limits={"input_tokens": 6000})
+    ticket = limiter.acquire("m", 100, 10)
+    limiter.release(ticket, 200, usage={"input_tokens": 400, "output_tokens": 10})
+    assert input_bucket(limiter).level == pytest.approx(5600, abs=5)
+
+
+def test_overrun_delays_next_request():
+    limiter = RateLimiter(limits={"input_tokens": 600})
+    ticket = limiter.acquire("m", 500, 10)
+    limiter.release(ticket, 200, usage={"input_tokens": 1200, "output_tokens": 10})
+    # 1200을 썼으므로 버킷이 음수가 되어 다음 요청은 바로 보낼 수 없음
+    assert input_bucket(limiter).level < 0
+    with pytest.raises(Exception):
+        limiter.acquire("m", 10, 10, timeout=0.05)
+
+
+def test_usage_below_estimate_is_returned():
+    limiter = RateLimiter(limits={"input_tokens": 6000})
+    ticket = limiter.acquire("m", 1000, 10)
+    limiter.release(ticket, 200, usage={"input_tokens": 100, "output_tokens": 10})
+    assert input_bucket(limiter).level == pytest.approx(5900, abs=5)
+
+
+def test_concurrent_double_release_counts_once():
+    limiter = RateLimiter(limits={"input_tokens": 6000})
+    ticket = limiter.acquire("m", 1000, 10)
+    limiter.acquire("m", 1000, 10)
+    threads = [threading.Thread(target=limiter.release, args=(ticket, 500)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert limiter.stats()["m"]["in_flight"] == 1
+    assert input_bucket(limiter).level == pytest.approx(5000, abs=5)
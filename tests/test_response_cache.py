@@ -0,0 +1,35 @@
+# test_response_cache.py - 응답 캐시 조회 시 사용 시각 기록과 LRU 정리
+from response_cache import ResponseCache
+
+
+def last_access(cache, key):
+    return cache._conn.execute("SELECT last_access FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_recent_hit_does_not_write():
+    cache = ResponseCache(":memory:")
+    cache.set("a", "응답")
+    changes = cache._conn.total_changes
+    for _ in range(10):
+        assert cache.get("a") == "응답"
+    assert cache._conn.total_changes == changes
+
+
+def test_stale_access_time_is_updated():
+    cache = ResponseCache(":memory:")
+    cache.set("a", "응답")
+    cache._conn.execute("UPDATE responses SET last_access = last_access - 120")
+    before = last_access(cache, "a")
+    assert cache.get("a") == "응답"
+    assert last_access(cache, "a") > before + 100
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(":memory:", max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache._conn.execute("UPDATE responses SET last_access = last_access - 120")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
@@ -0,0 +1,151 @@
+# test_tailor_core.py - 파이프라인 핵심 동작 (API 대신 가짜 클라이언트 사용)
+import threading
+
+import pytest
+
+from job_analysis import parse_analysis
+from response_cache import ResponseCache
+from tailor_core import CONSISTENCY_PROMPT_TEMPLATE, TailorCore, check_replacement, parse_replacements
+
+MODEL = "claude-3-5-sonnet-20240620"
+
+RESUME = """홍길동
+hong@example.com
+
+## 경력
+
+ABC 회사 백엔드 개발자로 5년 근무
+
+## 기술
+
+실패표시 Python, SQL"""
+
+
+class FakeClient:
+    """reply(api_key, payload)가 돌려준 (텍스트, stop_reason)으로 Messages API 응답을 흉내 냄"""
+
+    rate_limiter = None
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.payloads = []
+        self._lock = threading.Lock()
+
+    def create_message(self, api_key, payload, **kwargs):
+        with self._lock:
+            self.payloads.append(payload)
+        text, stop_reason = self.reply(api_key, payload)
+        return {"content": [{"text": text}], "usage": {"input_tokens": 1, "output_tokens": 1}, "stop_reason": stop_reason}
+
+
+def prompt_of(payload):
+    return payload["messages"][0]["content"]
+
+
+def section_reply(fail_marker):
+    """섹션 맞춤화는 본문 앞에 표시를 붙이고, fail_marker가 있는 섹션은 실패시킴"""
+    def reply(api_key, payload):
+        prompt = prompt_of(payload)
+        if CONSISTENCY_PROMPT_TEMPLATE.strip().splitlines()[0] in prompt:
+            return '{"replacements": []}', "end_turn"
+        section = prompt.split("## 섹션 내용:")[1].split("## 맞춤화 설정")[0].strip()
+        if fail_marker in section:
+            raise Exception("섹션 생성 실패")
+        return "맞춤화됨: " + section, "end_turn"
+    return reply
+
+
+def test_tailor_by_section_keeps_original_text_of_failed_section():
+    core = TailorCore(FakeClient(section_reply("실패표시")))
+    text = core.tailor_by_section("백엔드 개발자", "Python 백엔드 개발자 채용", None, {"v1": RESUME}, {}, MODEL, "key",
+                                  use_cache=False)
+    assert "맞춤화됨: ABC 회사 백엔드 개발자로 5년 근무" in text
+    assert "실패표시 Python, SQL" in text
+    assert "맞춤화됨: 실패표시" not in text
+    assert len(core.last_usage()["failed_sections"]) == 1
+
+
+def test_tailor_by_section_raises_when_every_section_fails():
+    core = TailorCore(FakeClient(section_reply("")))
+    with pytest.raises(Exception, match="모든 섹션"):
+        core.tailor_by_section("백엔드 개발자", "Python 백엔드 개발자 채용", None, {"v1": RESUME}, {}, MODEL, "key",
+                               use_cache=False)
+
+
+def test_truncated_response_is_continued():
+    def reply(api_key, payload):
+        if len(payload["messages"]) == 1:
+            return "앞부분 ", "max_tokens"
+        assert payload["messages"][-1] == {"role": "assistant", "content": "앞부분"}
+        return " 뒷부분", "end_turn"
+
+    core = TailorCore(FakeClient(reply))
+    assert core.call("프롬프트", MODEL, "key", max_continuations=2) == "앞부분 뒷부분"
+    assert core.last_usage()["continuations"] == 1
+
+
+def test_response_still_truncated_is_not_cached():
+    cache = ResponseCache(":memory:")
+    core = TailorCore(FakeClient(lambda api_key, payload: ("잘림", "max_tokens")), response_cache=cache)
+    core.call("프롬프트", MODEL, "key", max_continuations=1)
+    assert core.last_usage()["truncated"] is True
+    assert cache.stats()["entries"] == 0
+
+
+def test_same_request_with_different_api_keys_is_not_coalesced():
+    # 두 요청이 모두 클라이언트까지 와야 통과하는 장벽 (합쳐지면 시간 초과로 실패)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def reply(api_key, payload):
+        barrier.wait()
+        return f"{api_key}의 응답", "end_turn"
+
+    core = TailorCore(FakeClient(reply))
+    results = {}
+    threads = [
+        threading.Thread(target=lambda key=key: results.setdefault(key, core.call("프롬프트", MODEL, key, use_cache=False)))
+        for key in ("key-a", "key-b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"key-a": "key-a의 응답", "key-b": "key-b의 응답"}
+
+
+DOCUMENT = """홍길동
+hong@example.com
+
+## 경력
+
+Python 백엔드 개발자로 5년 근무
+연락처 010-1234-5678"""
+
+
+@pytest.mark.parametrize("before, after, reason", [
+    ("Python 백엔드", "", "빈 문구로 바꾸는 수정"),
+    ("Python 백엔드", "Python 백엔드 및 프론트엔드 풀스택 개발 전반", "길이가 크게 달라지는 수정"),
+    ("Java 백엔드", "Java 서버", "이력서에 없는 문구"),
+    ("홍길동", "김철수", "머리말(이름, 연락처)에 걸친 수정"),
+    ("## 경력", "## 경험", "섹션 제목에 걸친 수정"),
+    ("010-1234-5678", "010-9999-8888", "연락처에 걸친 수정"),
+    ("Python 백엔드", "Python 서버", None)
+])
+def test_check_replacement(before, after, reason):
+    assert check_replacement(DOCUMENT, before, after) == reason
+
+
+def test_parse_replacements_ignores_items_without_before():
+    text = '```json\n{"replacements": [{"before": "5년", "after": "6년"}, {"after": "x"}, "y"]}\n```'
+    assert parse_replacements(text) == [("5년", "6년")]
+    with pytest.raises(ValueError):
+        parse_replacements('{"edits": []}')
+
+
+def test_parse_analysis_validates_required_fields():
+    analysis = parse_analysis('{"summary": "백엔드", "required_skills": ["Python"], "keywords": ["Python", "SQL"]}')
+    assert analysis["keywords"] == ["Python", "SQL"]
+    with pytest.raises(ValueError):
+        parse_analysis('{"summary": "백엔드", "required_skills": ["Python"]}')
+    with pytest.raises(ValueError):
+        parse_analysis("[1, 2]")